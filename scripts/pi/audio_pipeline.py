@@ -9,11 +9,13 @@
 """
 
 import asyncio
+import dataclasses
 import logging
 import json
+import threading
 import time
-from typing import Optional, Callable
-from dataclasses import dataclass
+from typing import Optional, Callable, Dict, List, Tuple
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import numpy as np
@@ -23,6 +25,14 @@
 import paho.mqtt.client as mqtt
 from scipy import signal
 
+from bender_codec import TopicCodec, now_ns
+from bender_metrics import MetricsRegistry
+from bender_trace import TraceContext
+from audio_transport import (
+    AudioTransport, MQTTAudioTransport, TCPAudioTransport,
+    KIND_AUDIO, KIND_SEGMENT_START, KIND_SEGMENT_END, SEGMENT_END, END_REASONS
+)
+
 # Configuration
 @dataclass
 class AudioConfig:
@@ -36,7 +46,17 @@ class AudioConfig:
     
     # Paramètres traitement
     chunk_size: int = 1024        # Taille buffer (21ms @ 48kHz)
+    resampler: str = "polyphase"  # "polyphase" (FIR décimateur) ou "iir" (sosfilt + [::3])
+    capture_mode: str = "ringbuffer"  # "ringbuffer" (callback minimal) ou "direct"
+    ring_buffer_chunks: int = 32  # Capacité ring buffer (~680ms @ 48kHz)
     vad_aggressiveness: int = 2   # VAD 0-3 (2=équilibré)
+    vad_frame_ms: int = 20        # Trame VAD exacte : 10, 20 ou 30 ms
+    
+    # Segmentation parole (après VAD)
+    segment_preroll_ms: int = 300     # Audio conservé avant la 1re trame voisée
+    segment_hangover_ms: int = 400    # Silence toléré avant fin de segment
+    segment_min_speech_ms: int = 200  # Parole minimale, sinon segment annulé
+    segment_max_ms: int = 15000       # Durée maximale d'un segment
     aec_enabled: bool = True      # AEC WebRTC
     
     # Paramètres EQ/Limiter
@@ -44,37 +64,433 @@ class AudioConfig:
     limiter_enabled: bool = True
     limiter_threshold: float = 0.8
     
-    # MQTT
+    # MQTT (désactivé : pipeline seul, sans métriques ni commandes de configuration)
+    mqtt_enabled: bool = True
     mqtt_broker: str = "192.168.1.138"
     mqtt_port: int = 1883
     mqtt_topic_partial: str = "bender/asr/partial"
     mqtt_topic_final: str = "bender/asr/final"
     mqtt_topic_metrics: str = "bender/sys/metrics"
+    mqtt_topic_audio: str = "bender/audio/stream"
+    mqtt_topic_config: str = "bender/audio/config"  # Reconfiguration à chaud (commandes)
+    mqtt_topic_config_result: str = "bender/audio/config/result"
+    # Formats par topic (bender_codec) : JSON seul par défaut, binaire sur <topic>/<format>
+    mqtt_formats: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    
+    # Transport PCM 16kHz vers l'hôte ASR : "none", "mqtt" ou "tcp"
+    audio_transport: str = "none"
+    transport_host: str = "192.168.1.100"  # T630
+    transport_port: int = 10301
+
+# Reconfiguration à chaud : paramètres basculés à une frontière de chunk,
+# paramètres imposant la réouverture du flux ; les autres exigent un redémarrage
+LIVE_PARAMS = frozenset({
+    "chunk_size", "resampler", "vad_aggressiveness",
+    "eq_enabled", "limiter_enabled", "limiter_threshold",
+    "segment_preroll_ms", "segment_hangover_ms", "segment_min_speech_ms", "segment_max_ms"
+})
+STREAM_PARAMS = frozenset({"device_name", "sample_rate_in", "channels"})
+# Paramètres sans effet dans le pipeline actuel : toujours refusés
+UNSUPPORTED_PARAMS = frozenset({"aec_enabled"})
+
+class AudioRingBuffer:
+    """Ring buffer NumPy préalloué, sans verrou (1 producteur / 1 consommateur)
+
+    Le callback PortAudio est le seul écrivain et le worker le seul lecteur :
+    chacun ne modifie que son propre index, le GIL garantit l'atomicité des
+    affectations d'entiers.
+    """
+
+    def __init__(self, capacity: int, channels: int, dtype: str):
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, channels), dtype=dtype)
+        self.write_index = 0  # Total frames écrites (monotone)
+        self.read_index = 0   # Total frames lues (monotone)
+        self.overruns = 0     # Blocs perdus car buffer plein
+
+    def available(self) -> int:
+        """Nombre de frames disponibles en lecture"""
+        return self.write_index - self.read_index
+
+    def write(self, data: np.ndarray) -> bool:
+        """Écriture d'un bloc (appelé depuis le callback audio)"""
+        frames = len(data)
+        if self.capacity - self.available() < frames:
+            self.overruns += 1
+            return False
+
+        start = self.write_index % self.capacity
+        first = min(frames, self.capacity - start)
+        self.buffer[start:start + first] = data[:first]
+        if first < frames:
+            self.buffer[:frames - first] = data[first:]
+
+        self.write_index += frames
+        return True
+
+    def read_into(self, out: np.ndarray) -> bool:
+        """Lecture d'exactement len(out) frames, False si pas assez de données"""
+        frames = len(out)
+        if self.available() < frames:
+            return False
+
+        start = self.read_index % self.capacity
+        first = min(frames, self.capacity - start)
+        out[:first] = self.buffer[start:start + first]
+        if first < frames:
+            out[first:] = self.buffer[:frames - first]
+
+        self.read_index += frames
+        return True
+
+
+class StreamingSOSFilter:
+    """Filtre IIR (sections biquad) avec état conservé entre les chunks
+
+    L'état `zi` (n_sections, 2, canaux) est initialisé au régime permanent
+    (`sosfilt_zi`) sur le premier échantillon reçu puis propagé d'un chunk
+    au suivant : pas de transitoire à chaque bloc. Tout est en float32.
+    L'état est préalloué et mis à jour sur place ; la sortie, elle, est un
+    tableau neuf alloué par `sosfilt` à chaque chunk.
+    """
+
+    def __init__(self, sos: np.ndarray, channels: int):
+        self.sos = np.asarray(sos, dtype=np.float32)
+        self.channels = channels
+        self._zi_unit = signal.sosfilt_zi(sos).astype(np.float32)[:, :, np.newaxis]
+        self.zi = np.zeros((len(self.sos), 2, channels), dtype=np.float32)
+        self._primed = False
+
+    def reset(self):
+        """Réinitialise l'état (prochain chunk = régime permanent)"""
+        self.zi.fill(0.0)
+        self._primed = False
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Filtre un chunk float32 (frames, canaux) et met à jour l'état"""
+        if not self._primed:
+            np.multiply(self._zi_unit, x[0], out=self.zi)
+            self._primed = True
+
+        y, zf = signal.sosfilt(self.sos, x, axis=0, zi=self.zi)
+        self.zi[...] = zf
+        return y
+
+    def copy_state(self, other: "StreamingSOSFilter"):
+        """Reprend l'état d'un filtre de même structure (bascule sans transitoire)"""
+        self.zi[...] = other.zi
+        self._primed = other._primed
+
+
+class PolyphaseDecimator:
+    """Décimateur FIR streaming (facteur entier) équivalent polyphase
+
+    Seuls les échantillons conservés sont calculés : chaque sortie est le
+    produit scalaire d'une fenêtre de `taps` entrées avec le FIR, pris tous
+    les `factor` échantillons. L'historique (taps - 1 échantillons) et la
+    phase de décimation sont conservés d'un chunk au suivant. Le FIR suit
+    la conception de `scipy.signal.resample_poly` (fenêtre Kaiser β=5).
+    """
+
+    def __init__(self, factor: int, channels: int, chunk_size: int, half_len: int = 10):
+        self.factor = factor
+        self.channels = channels
+        taps = 2 * half_len * factor + 1
+        fir = signal.firwin(taps, 1.0 / factor, window=('kaiser', 5.0))
+        # Coefficients inversés : la fenêtre glissante est en ordre chronologique
+        self.fir = fir[::-1].astype(np.float32)
+        self.history = taps - 1
+        self.buffer = np.zeros((self.history + chunk_size, channels), dtype=np.float32)
+        self.phase = 0  # Index (dans le chunk suivant) du prochain échantillon conservé
+
+    def reset(self):
+        """Réinitialise historique et phase"""
+        self.buffer.fill(0.0)
+        self.phase = 0
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Décime un chunk float32 (frames, canaux)"""
+        frames = len(x)
+        total = self.history + frames
+        if len(self.buffer) < total:
+            grown = np.zeros((total, self.channels), dtype=np.float32)
+            grown[:self.history] = self.buffer[:self.history]
+            self.buffer = grown
+
+        buf = self.buffer[:total]
+        buf[self.history:] = x
+
+        windows = np.lib.stride_tricks.sliding_window_view(
+            buf, self.history + 1, axis=0
+        )[self.phase::self.factor]
+        y = windows @ self.fir
+
+        # Historique et phase pour le chunk suivant
+        self.phase = self.phase + len(y) * self.factor - frames
+        buf[:self.history] = buf[frames:]
+        return y
+
+    def copy_state(self, other: "PolyphaseDecimator"):
+        """Reprend historique et phase d'un décimateur de même FIR"""
+        self.buffer[:self.history] = other.buffer[:other.history]
+        self.phase = other.phase
+
+
+class SegmentSink:
+    """Destination des segments de parole (à surcharger)
+
+    Les trames reçues par `on_frame` sont des vues int16 16kHz mono valides
+    uniquement pendant l'appel : copier si elles doivent être conservées.
+    """
+
+    def on_segment_start(self, segment_id: int, trace: TraceContext):
+        """Début de segment (première trame voisée, pré-roll inclus ensuite)
+
+        `trace` porte l'identifiant de corrélation bout en bout du segment.
+        """
+
+    def on_frame(self, segment_id: int, frame: np.ndarray):
+        """Trame PCM du segment en cours"""
+
+    def on_segment_end(self, segment_id: int, reason: str, duration_ms: int, discarded: bool):
+        """Fin de segment (reason : silence, max_length ou stop)"""
+
+
+class TransportSegmentSink(SegmentSink):
+    """Sink diffusant les segments via un transport binaire (payload sans copie)"""
+
+    def __init__(self, transport: AudioTransport):
+        self.transport = transport
+        self.end_payload = bytearray(SEGMENT_END.size)
+
+    def on_segment_start(self, segment_id: int, trace: TraceContext):
+        # Payload de début : contexte de trace JSON (une fois par segment)
+        self.transport.send(
+            KIND_SEGMENT_START, segment_id, json.dumps(trace.to_dict()).encode()
+        )
+
+    def on_frame(self, segment_id: int, frame: np.ndarray):
+        self.transport.send(KIND_AUDIO, segment_id, frame)
+
+    def on_segment_end(self, segment_id: int, reason: str, duration_ms: int, discarded: bool):
+        SEGMENT_END.pack_into(
+            self.end_payload, 0, END_REASONS.get(reason, 0), discarded, duration_ms
+        )
+        self.transport.send(KIND_SEGMENT_END, segment_id, self.end_payload)
+
+
+class SpeechSegmenter:
+    """Machine à états de segmentation parole après VAD
+
+    IDLE : les trames alimentent le pré-roll ; une trame voisée ouvre un
+    segment, le pré-roll puis la trame sont transmis immédiatement au sink.
+    SPEECH : toutes les trames sont transmises ; le segment se ferme après
+    `hangover` de silence ou à la durée maximale. Un segment avec moins de
+    `min_speech` de parole est signalé comme annulé (discarded).
+    """
+
+    def __init__(self, frame_size: int, frame_ms: int, preroll_ms: int,
+                 hangover_ms: int, min_speech_ms: int, max_segment_ms: int,
+                 sink: SegmentSink):
+        self.frame_ms = frame_ms
+        self.preroll_frames = preroll_ms // frame_ms
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.min_speech_frames = min_speech_ms // frame_ms
+        self.max_frames = max_segment_ms // frame_ms
+        self.sink = sink
+        
+        # Pré-roll : ring de trames préalloué
+        self.preroll = np.zeros((max(1, self.preroll_frames), frame_size), dtype=np.int16)
+        self.preroll_count = 0
+        self.preroll_pos = 0
+        
+        self.in_speech = False
+        self.segment_id = 0
+        self.trace: Optional[TraceContext] = None
+        self.segment_frames = 0
+        self.speech_frames = 0
+        self.silence_frames = 0
+        
+        self.stats = {"segments": 0, "segments_discarded": 0}
+
+    def push(self, frame: np.ndarray, is_speech: bool):
+        """Traite une trame VAD et sa décision"""
+        if not self.in_speech:
+            if is_speech:
+                self._open_segment()
+                self._emit(frame, is_speech)
+            elif self.preroll_frames:
+                self.preroll[self.preroll_pos] = frame
+                self.preroll_pos = (self.preroll_pos + 1) % self.preroll_frames
+                self.preroll_count = min(self.preroll_count + 1, self.preroll_frames)
+            return
+            
+        self._emit(frame, is_speech)
+        
+        if self.silence_frames >= self.hangover_frames:
+            self._close_segment("silence")
+        elif self.segment_frames >= self.max_frames:
+            self._close_segment("max_length")
+
+    def prepare(self, preroll_ms: int, hangover_ms: int, min_speech_ms: int,
+                max_segment_ms: int) -> Dict:
+        """Nouveaux paramètres et pré-roll préalloué (hors thread DSP)"""
+        preroll_frames = preroll_ms // self.frame_ms
+        return {
+            "preroll_frames": preroll_frames,
+            "hangover_frames": max(1, hangover_ms // self.frame_ms),
+            "min_speech_frames": min_speech_ms // self.frame_ms,
+            "max_frames": max_segment_ms // self.frame_ms,
+            "preroll": np.zeros((max(1, preroll_frames), self.preroll.shape[1]), dtype=np.int16)
+        }
+
+    def apply(self, prepared: Dict):
+        """Bascule entre deux trames : segment en cours et pré-roll récent conservés"""
+        keep = min(self.preroll_count, prepared["preroll_frames"])
+        first = (self.preroll_pos - keep) % max(1, self.preroll_frames)
+        preroll = prepared["preroll"]
+        for i in range(keep):
+            preroll[i] = self.preroll[(first + i) % self.preroll_frames]
+        self.preroll = preroll
+        self.preroll_count = keep
+        self.preroll_pos = keep % max(1, prepared["preroll_frames"])
+        self.preroll_frames = prepared["preroll_frames"]
+        self.hangover_frames = prepared["hangover_frames"]
+        self.min_speech_frames = prepared["min_speech_frames"]
+        self.max_frames = prepared["max_frames"]
+
+    def flush(self):
+        """Ferme le segment en cours (arrêt du pipeline)"""
+        if self.in_speech:
+            self._close_segment("stop")
+
+    def _open_segment(self):
+        self.in_speech = True
+        self.segment_id += 1
+        self.segment_frames = 0
+        self.speech_frames = 0
+        self.silence_frames = 0
+        self.trace = TraceContext.start("speech_start")
+        self.sink.on_segment_start(self.segment_id, self.trace)
+        
+        # Pré-roll dans l'ordre chronologique
+        first = (self.preroll_pos - self.preroll_count) % max(1, self.preroll_frames)
+        for i in range(self.preroll_count):
+            self.sink.on_frame(self.segment_id, self.preroll[(first + i) % self.preroll_frames])
+            self.segment_frames += 1
+        self.preroll_count = 0
+
+    def _emit(self, frame: np.ndarray, is_speech: bool):
+        self.sink.on_frame(self.segment_id, frame)
+        self.segment_frames += 1
+        if is_speech:
+            self.speech_frames += 1
+            self.silence_frames = 0
+        else:
+            self.silence_frames += 1
+
+    def _close_segment(self, reason: str):
+        discarded = self.speech_frames < self.min_speech_frames
+        self.in_speech = False
+        self.stats["segments"] += 1
+        if discarded:
+            self.stats["segments_discarded"] += 1
+        self.sink.on_segment_end(
+            self.segment_id, reason, self.segment_frames * self.frame_ms, discarded
+        )
+
+
+@dataclass
+class PendingConfig:
+    """Configuration préparée hors du thread DSP, basculée à une frontière de chunk
+
+    Les objets repris tels quels de la configuration courante gardent leur
+    état ; ceux reconstruits avec `carry` reprennent l'état des actuels au
+    moment de la bascule (copie de quelques échantillons, sans allocation).
+    """
+    config: AudioConfig
+    highpass_filter: StreamingSOSFilter
+    antialias_filter: StreamingSOSFilter
+    decimator: Optional[PolyphaseDecimator]
+    decimation_factor: int
+    float_buffer: np.ndarray
+    audio_buffer: np.ndarray
+    segmenter: Optional[Dict] = None           # SpeechSegmenter.prepare()
+    carry_decimator: bool = False
+    new_stream: bool = False                   # Phase de décimation repartant de 0
+    ring_buffer: Optional[AudioRingBuffer] = None  # Nouveau flux (mode ring buffer)
+    applied: threading.Event = field(default_factory=threading.Event)
+
 
 class AudioPipeline:
     """Pipeline audio temps réel Bender"""
     
-    def __init__(self, config: AudioConfig):
+    def __init__(self, config: AudioConfig, segment_sink: Optional[SegmentSink] = None):
         self.config = config
         self.logger = self._setup_logging()
         
         # État pipeline
         self.is_running = False
-        self.audio_buffer = np.array([], dtype=np.int32)
         self.vad = webrtcvad.Vad(config.vad_aggressiveness)
         
+        # Accumulateur 16kHz mono : trames VAD exactes, reliquat conservé
+        if config.vad_frame_ms not in (10, 20, 30):
+            raise ValueError(f"vad_frame_ms invalide: {config.vad_frame_ms} (10, 20 ou 30)")
+        self.vad_frame_size = config.sample_rate_out * config.vad_frame_ms // 1000
+        max_chunk_16k = -(-config.chunk_size * config.sample_rate_out // config.sample_rate_in)
+        self.audio_buffer = np.zeros(self.vad_frame_size + max_chunk_16k, dtype=np.int16)
+        self.audio_buffered = 0
+        
+        # Capture découplée : callback → ring buffer → worker
+        self.ring_buffer: Optional[AudioRingBuffer] = None
+        self.worker_thread: Optional[threading.Thread] = None
+        self.stream: Optional[sd.InputStream] = None
+        
+        # Reconfiguration à chaud : bascule au prochain chunk par le thread DSP
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Optional[PendingConfig] = None
+        self._reconfigure_lock = asyncio.Lock()
+        
         # Métriques
         self.metrics = {
             "chunks_processed": 0,
             "voice_detected": 0,
-            "avg_latency_ms": 0.0,
+            "vad_frames": 0,
+            "voice_frames": 0,
+            "segments": 0,
+            "segments_discarded": 0,
+            "ring_overruns": 0,
+            "ring_underruns": 0,
+            "input_overflows": 0,
+            "input_underflows": 0,
+            "callback_max_ms": 0.0,
             "last_update": time.time()
         }
         
+        # Latences par étape (histogrammes, percentiles publiés)
+        self.latency = MetricsRegistry()
+        
         # MQTT
         self.mqtt_client = None
+        self.codec = TopicCodec(config.mqtt_formats)
         self._setup_mqtt()
         
+        # Transport binaire des trames vers l'hôte ASR
+        self.transport: Optional[AudioTransport] = None
+        if segment_sink is None:
+            segment_sink = self._setup_transport()
+            
+        # Segmentation parole → sink (streaming ASR dès la 1re trame voisée)
+        self.segmenter = SpeechSegmenter(
+            self.vad_frame_size,
+            config.vad_frame_ms,
+            config.segment_preroll_ms,
+            config.segment_hangover_ms,
+            config.segment_min_speech_ms,
+            config.segment_max_ms,
+            segment_sink
+        )
+        
         # Filtres audio
         self._setup_audio_filters()
         
@@ -98,25 +514,49 @@ def _setup_mqtt(self):
         self.mqtt_client = mqtt.Client()
         self.mqtt_client.on_connect = self._on_mqtt_connect
         self.mqtt_client.on_disconnect = self._on_mqtt_disconnect
+        self.mqtt_client.on_message = self._on_mqtt_message
         # Désactiver l'authentification pour les tests initiaux
         # self.mqtt_client.username_pw_set("username", "password")
         
-        # Mode test sans MQTT pour validation pipeline audio
-        self.mqtt_enabled = False
+        self.mqtt_enabled = self.config.mqtt_enabled
         if self.mqtt_enabled:
-            try:
-                self.mqtt_client.connect(self.config.mqtt_broker, self.config.mqtt_port, 60)
-                self.mqtt_client.loop_start()
-                self.logger.info(f"MQTT connecté à {self.config.mqtt_broker}:{self.config.mqtt_port}")
-            except Exception as e:
-                self.logger.error(f"Erreur connexion MQTT: {e}")
+            # Connexion en arrière-plan : reconnexion automatique paho si broker absent
+            self.mqtt_client.connect_async(self.config.mqtt_broker, self.config.mqtt_port, 60)
+            self.mqtt_client.loop_start()
+            self.logger.info(f"Connexion MQTT à {self.config.mqtt_broker}:{self.config.mqtt_port}")
         else:
             self.logger.info("Mode test: MQTT désactivé pour validation pipeline audio")
             
+    def _setup_transport(self) -> SegmentSink:
+        """Configuration du transport audio (none, mqtt ou tcp)"""
+        mode = self.config.audio_transport
+        if mode == "mqtt":
+            if not self.mqtt_enabled:
+                # Client jamais connecté : tous les segments seraient perdus sans bruit
+                raise ValueError("audio_transport=mqtt exige mqtt_enabled")
+            self.transport = MQTTAudioTransport(
+                self.mqtt_client, self.config.mqtt_topic_audio,
+                sample_rate=self.config.sample_rate_out
+            )
+        elif mode == "tcp":
+            self.transport = TCPAudioTransport(
+                self.config.transport_host, self.config.transport_port,
+                sample_rate=self.config.sample_rate_out
+            )
+        elif mode != "none":
+            raise ValueError(f"audio_transport invalide: {mode}")
+            
+        if self.transport is None:
+            return SegmentSink()
+            
+        self.logger.info(f"Transport audio: {mode}")
+        return TransportSegmentSink(self.transport)
+        
     def _on_mqtt_connect(self, client, userdata, flags, rc):
         """Callback connexion MQTT"""
         if rc == 0:
             self.logger.info("MQTT connecté avec succès")
+            client.subscribe(self.config.mqtt_topic_config)
         else:
             self.logger.error(f"Échec connexion MQTT: {rc}")
             
@@ -124,60 +564,202 @@ def _on_mqtt_disconnect(self, client, userdata, rc):
         """Callback déconnexion MQTT"""
         self.logger.warning(f"MQTT déconnecté: {rc}")
         
+    def _on_mqtt_message(self, client, userdata, msg):
+        """Commande de reconfiguration {"request_id", "changes"} → boucle asyncio"""
+        try:
+            command = json.loads(msg.payload)
+            changes = command["changes"]
+            if not isinstance(changes, dict):
+                raise ValueError("changes doit être un objet")
+        except (ValueError, KeyError, TypeError) as e:
+            self.logger.error(f"Commande de configuration invalide: {e}")
+            return
+        if self.loop is not None:
+            asyncio.run_coroutine_threadsafe(
+                self.reconfigure(changes, command.get("request_id")), self.loop
+            )
+        
     def _setup_audio_filters(self):
         """Configuration filtres audio (EQ, limiter)"""
-        # Filtre passe-haut pour éliminer bruit basse fréquence
-        nyquist = self.config.sample_rate_in // 2
-        self.highpass_sos = signal.butter(
-            4, 80 / nyquist, btype='high', output='sos'
-        )
+        self._pending = self._prepare_config(self.config, new_stream=True)
+        self._apply_pending()
+        self.logger.info("Filtres audio configurés")
+        
+    def _prepare_config(self, config: AudioConfig, new_stream: bool) -> PendingConfig:
+        """Filtres et buffers pour `config`, construits hors du chemin critique
+
+        Même flux (`new_stream=False`) : fréquence et canaux inchangés, les
+        filtres dont la structure ne change pas sont conservés avec leur état.
+        """
+        if config.sample_rate_in % config.sample_rate_out:
+            raise ValueError(
+                f"Ratio {config.sample_rate_in}/{config.sample_rate_out} non entier"
+            )
+        decimation_factor = config.sample_rate_in // config.sample_rate_out
+        current = None if new_stream else self.config
+        
+        if current is None:
+            # Filtre passe-haut pour éliminer bruit basse fréquence
+            nyquist = config.sample_rate_in // 2
+            highpass_sos = signal.butter(4, 80 / nyquist, btype='high', output='sos')
+            # Filtre anti-aliasing pour downsampling
+            antialias_sos = signal.butter(
+                6, (config.sample_rate_out // 2) / nyquist, btype='low', output='sos'
+            )
+            # Filtres streaming (état conservé entre chunks)
+            highpass_filter = StreamingSOSFilter(highpass_sos, config.channels)
+            antialias_filter = StreamingSOSFilter(antialias_sos, config.channels)
+        else:
+            # Filtre réactivé : état périmé, repartira du régime permanent
+            highpass_filter = self.highpass_filter
+            if config.eq_enabled and not current.eq_enabled:
+                highpass_filter = StreamingSOSFilter(highpass_filter.sos, config.channels)
+            antialias_filter = self.antialias_filter
+            if config.resampler != "polyphase" and current.resampler == "polyphase":
+                antialias_filter = StreamingSOSFilter(antialias_filter.sos, config.channels)
         
-        # Filtre anti-aliasing pour downsampling
-        self.antialias_sos = signal.butter(
-            6, (self.config.sample_rate_out // 2) / nyquist, 
-            btype='low', output='sos'
+        # Décimation 48kHz → 16kHz
+        decimator = None
+        carry_decimator = False
+        if config.resampler == "polyphase":
+            if current is not None and self.decimator is not None:
+                decimator = self.decimator
+                # Chunk plus grand : buffer agrandi ici plutôt que dans le thread DSP
+                if config.chunk_size > current.chunk_size:
+                    decimator = PolyphaseDecimator(
+                        decimation_factor, config.channels, config.chunk_size
+                    )
+                    carry_decimator = True
+            else:
+                decimator = PolyphaseDecimator(
+                    decimation_factor, config.channels, config.chunk_size
+                )
+        
+        # Buffer de conversion int32 → float32 (réutilisé à chaque chunk)
+        float_buffer = np.empty((config.chunk_size, config.channels), dtype=np.float32)
+        max_chunk_16k = -(-config.chunk_size * config.sample_rate_out // config.sample_rate_in)
+        audio_buffer = np.zeros(self.vad_frame_size + max_chunk_16k, dtype=np.int16)
+        
+        # Segmenteur conservé d'un flux à l'autre : comparé à la configuration active
+        segmenter = None
+        segment_params = ("segment_preroll_ms", "segment_hangover_ms",
+                          "segment_min_speech_ms", "segment_max_ms")
+        if any(getattr(config, name) != getattr(self.config, name) for name in segment_params):
+            segmenter = self.segmenter.prepare(*(getattr(config, name) for name in segment_params))
+        
+        return PendingConfig(
+            config=config,
+            highpass_filter=highpass_filter,
+            antialias_filter=antialias_filter,
+            decimator=decimator,
+            decimation_factor=decimation_factor,
+            float_buffer=float_buffer,
+            audio_buffer=audio_buffer,
+            segmenter=segmenter,
+            carry_decimator=carry_decimator,
+            new_stream=new_stream
         )
         
-        self.logger.info("Filtres audio configurés")
+    def _apply_pending(self):
+        """Bascule vers la configuration préparée (thread DSP, entre deux chunks)"""
+        pending, self._pending = self._pending, None
+        # Phase de décimation conservée à travers la bascule (IIR ↔ polyphase compris)
+        if pending.new_stream:
+            phase = 0
+        elif self.decimator is not None:
+            phase = self.decimator.phase
+        else:
+            phase = self.decimation_phase
+        if pending.carry_decimator:
+            pending.decimator.copy_state(self.decimator)
+        elif pending.decimator is not None:
+            pending.decimator.phase = phase
+        self.decimation_phase = phase
+        self.highpass_filter = pending.highpass_filter
+        self.antialias_filter = pending.antialias_filter
+        self.decimator = pending.decimator
+        self.decimation_factor = pending.decimation_factor
+        self._float_buffer = pending.float_buffer
+        
+        # Reliquat < 1 trame VAD repris dans le nouveau buffer
+        pending.audio_buffer[:self.audio_buffered] = self.audio_buffer[:self.audio_buffered]
+        self.audio_buffer = pending.audio_buffer
+        
+        if pending.config.vad_aggressiveness != self.config.vad_aggressiveness:
+            # Même instance : estimations de bruit du VAD conservées
+            self.vad.set_mode(pending.config.vad_aggressiveness)
+        if pending.segmenter is not None:
+            self.segmenter.apply(pending.segmenter)
+        if pending.ring_buffer is not None:
+            self.ring_buffer = pending.ring_buffer
+        self.config = pending.config
+        pending.applied.set()
         
     def _apply_eq_limiter(self, audio_data: np.ndarray) -> np.ndarray:
-        """Application EQ et limiter"""
-        if not self.config.eq_enabled and not self.config.limiter_enabled:
-            return audio_data
-            
-        # Conversion en float pour traitement
-        audio_float = audio_data.astype(np.float32) / (2**31)
+        """Application EQ et limiter (sortie float32 normalisée [-1, 1])"""
+        # Conversion en float32 pour traitement, sans allocation
+        if self._float_buffer.shape != audio_data.shape:
+            self._float_buffer = np.empty(audio_data.shape, dtype=np.float32)
+        audio_float = self._float_buffer
+        np.multiply(audio_data, 1.0 / (2**31), out=audio_float, casting='unsafe')
         
         # EQ : filtre passe-haut
         if self.config.eq_enabled:
-            audio_float = signal.sosfilt(self.highpass_sos, audio_float, axis=0)
+            audio_float = self.highpass_filter.process(audio_float)
             
-        # Limiter simple
+        # Limiter simple (en place)
         if self.config.limiter_enabled:
-            audio_float = np.clip(
+            np.clip(
                 audio_float, 
                 -self.config.limiter_threshold, 
-                self.config.limiter_threshold
+                self.config.limiter_threshold,
+                out=audio_float
             )
             
-        # Retour en int32
-        return (audio_float * (2**31)).astype(np.int32)
+        return audio_float
         
     def _downsample_audio(self, audio_data: np.ndarray) -> np.ndarray:
         """Conversion 48kHz → 16kHz avec anti-aliasing"""
-        # Anti-aliasing
-        audio_filtered = signal.sosfilt(self.antialias_sos, audio_data, axis=0)
+        if self.decimator is not None:
+            # Décimateur polyphase : seuls les échantillons conservés sont calculés
+            audio_16k = self.decimator.process(audio_data)
+        else:
+            # Anti-aliasing IIR (état conservé entre chunks) puis décimation ;
+            # phase reportée au chunk suivant (chunk non multiple du facteur)
+            audio_filtered = self.antialias_filter.process(audio_data)
+            audio_16k = audio_filtered[self.decimation_phase::self.decimation_factor]
+            self.decimation_phase = (self.decimation_phase - len(audio_filtered)) % self.decimation_factor
+        np.clip(audio_16k, -1.0, 1.0, out=audio_16k)
         
-        # Downsampling par facteur 3 (48000/16000)
-        audio_16k = audio_filtered[::3]
+        return (audio_16k * 32767).astype(np.int16)  # VAD nécessite int16
         
-        return audio_16k.astype(np.int16)  # VAD nécessite int16
+    def _accumulate_frames(self, samples: np.ndarray):
+        """Ajoute des échantillons 16kHz mono et produit les trames VAD complètes
+
+        Les trames sont des vues sur `audio_buffer`, valides jusqu'à l'appel
+        suivant ; le reliquat (< 1 trame) est ramené en tête du buffer.
+        """
+        end = self.audio_buffered + len(samples)
+        if end > len(self.audio_buffer):
+            grown = np.zeros(end, dtype=np.int16)
+            grown[:self.audio_buffered] = self.audio_buffer[:self.audio_buffered]
+            self.audio_buffer = grown
+        self.audio_buffer[self.audio_buffered:end] = samples
         
-    def _detect_voice(self, audio_chunk: np.ndarray) -> bool:
-        """Détection activité vocale avec WebRTC VAD"""
+        start = 0
+        while end - start >= self.vad_frame_size:
+            yield self.audio_buffer[start:start + self.vad_frame_size]
+            start += self.vad_frame_size
+            
+        remaining = end - start
+        self.audio_buffer[:remaining] = self.audio_buffer[start:end]
+        self.audio_buffered = remaining
+        
+    def _detect_voice(self, audio_chunk: np.ndarray) -> List[bool]:
+        """Détection activité vocale avec WebRTC VAD, une décision par trame"""
         try:
-            # VAD nécessite 10ms, 20ms ou 30ms à 16kHz
-            # 1024 samples @ 48kHz = 21.33ms → 341 samples @ 16kHz ≈ 20ms
+            # VAD nécessite des trames exactes de 10, 20 ou 30ms à 16kHz
+            t0 = time.perf_counter_ns()
             chunk_16k = self._downsample_audio(audio_chunk)
             
             # Mono pour VAD (moyenne des canaux)
@@ -186,18 +768,24 @@ def _detect_voice(self, audio_chunk: np.ndarray) -> bool:
             else:
                 chunk_mono = chunk_16k
                 
-            # Ajuster à 320 samples (20ms @ 16kHz)
-            if len(chunk_mono) > 320:
-                chunk_mono = chunk_mono[:320]
-            elif len(chunk_mono) < 320:
-                chunk_mono = np.pad(chunk_mono, (0, 320 - len(chunk_mono)))
+            t1 = time.perf_counter_ns()
+            self.latency.record("resample", t1 - t0)
                 
-            # VAD
-            return self.vad.is_speech(chunk_mono.tobytes(), 16000)
+            # VAD sur chaque trame complète, puis segmentation/publication
+            decisions = []
+            for frame in self._accumulate_frames(chunk_mono):
+                t0 = time.perf_counter_ns()
+                is_speech = self.vad.is_speech(frame.tobytes(), self.config.sample_rate_out)
+                t1 = time.perf_counter_ns()
+                self.segmenter.push(frame, is_speech)
+                self.latency.record("vad", t1 - t0)
+                self.latency.record("publish", time.perf_counter_ns() - t1)
+                decisions.append(is_speech)
+            return decisions
             
         except Exception as e:
             self.logger.error(f"Erreur VAD: {e}")
-            return False
+            return []
             
     def _publish_metrics(self):
         """Publication métriques MQTT"""
@@ -205,54 +793,297 @@ def _publish_metrics(self):
         
         if self.mqtt_enabled and self.mqtt_client and self.mqtt_client.is_connected():
             try:
-                payload = json.dumps(self.metrics)
-                self.mqtt_client.publish(self.config.mqtt_topic_metrics, payload)
+                self.codec.publish(self.mqtt_client, self.config.mqtt_topic_metrics, {
+                    **self.metrics,
+                    "ts_ns": now_ns(),
+                    "component": "audio_pipeline",
+                    "latency": self.latency.snapshot()
+                })
             except Exception as e:
                 self.logger.error(f"Erreur publication métriques: {e}")
         else:
-            self.logger.debug(f"Métriques: {self.metrics['chunks_processed']} chunks, {self.metrics['voice_detected']} voix, {self.metrics['avg_latency_ms']:.1f}ms latence")
+            self.logger.debug(f"Métriques: {self.metrics['chunks_processed']} chunks, {self.metrics['voice_detected']} voix, {self.latency.histogram('chunk').percentile(95):.1f}ms latence p95")
                 
+    def _process_chunk(self, audio_chunk: np.ndarray, start_ns: int):
+        """Traitement d'un chunk : EQ/limiter → VAD → métriques"""
+        # Application filtres
+        t0 = time.perf_counter_ns()
+        audio_processed = self._apply_eq_limiter(audio_chunk)
+        self.latency.record("filter", time.perf_counter_ns() - t0)
+        
+        # Détection voix (décision par trame VAD)
+        vad_decisions = self._detect_voice(audio_processed)
+        
+        # Mise à jour métriques
+        self.metrics["chunks_processed"] += 1
+        self.metrics["vad_frames"] += len(vad_decisions)
+        voice_frames = sum(vad_decisions)
+        if voice_frames:
+            self.metrics["voice_detected"] += 1
+            self.metrics["voice_frames"] += voice_frames
+        self.metrics.update(self.segmenter.stats)
+        if self.transport is not None:
+            self.metrics.update(self.transport.stats)
+            
+        # Latence totale de traitement du chunk
+        self.latency.record("chunk", time.perf_counter_ns() - start_ns)
+        
+        # Publication périodique métriques
+        if self.metrics["chunks_processed"] % 100 == 0:
+            self._publish_metrics()
+            
+        # Log périodique
+        if self.metrics["chunks_processed"] % 500 == 0:
+            voice_ratio = (self.metrics["voice_detected"] / 
+                         self.metrics["chunks_processed"]) * 100
+            self.logger.info(
+                f"Pipeline: {self.metrics['chunks_processed']} chunks, "
+                f"{voice_ratio:.1f}% voix, "
+                f"{self.latency.histogram('chunk').percentile(95):.1f}ms latence p95, "
+                f"overruns={self.metrics['ring_overruns']}, "
+                f"underruns={self.metrics['ring_underruns']}, "
+                f"callback max={self.metrics['callback_max_ms']:.2f}ms"
+            )
+            
     def _audio_callback(self, indata, frames, time_info, status):
-        """Callback capture audio temps réel"""
+        """Callback capture audio temps réel (mode direct)"""
         if status:
             self.logger.warning(f"Status audio: {status}")
             
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
+        # Bascule de configuration entre deux blocs
+        if self._pending is not None:
+            self._apply_pending()
+            
         try:
-            # Application filtres
-            audio_processed = self._apply_eq_limiter(indata.copy())
+            self._process_chunk(indata.copy(), start_ns)
+        except Exception as e:
+            self.logger.error(f"Erreur callback audio: {e}")
             
-            # Détection voix
-            voice_detected = self._detect_voice(audio_processed)
+    def _ring_callback(self, indata, frames, time_info, status):
+        """Callback capture audio temps réel (mode ring buffer)
+
+        Aucun log, aucune allocation : copie dans le ring buffer et compteurs.
+        """
+        start = time.perf_counter()
+        
+        if status:
+            if status.input_overflow:
+                self.metrics["input_overflows"] += 1
+            if status.input_underflow:
+                self.metrics["input_underflows"] += 1
+                
+        self.ring_buffer.write(indata)
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms > self.metrics["callback_max_ms"]:
+            self.metrics["callback_max_ms"] = elapsed_ms
             
-            # Mise à jour métriques
-            self.metrics["chunks_processed"] += 1
-            if voice_detected:
-                self.metrics["voice_detected"] += 1
+    def _processing_loop(self):
+        """Worker : vide le ring buffer et exécute le traitement DSP/VAD"""
+        chunk = np.empty(
+            (self.config.chunk_size, self.config.channels), dtype=self.config.dtype
+        )
+        chunk_period = self.config.chunk_size / self.config.sample_rate_in
+        poll_interval = chunk_period / 2
+        last_data = time.monotonic()
+        
+        while self.is_running:
+            # Bascule de configuration entre deux chunks
+            if self._pending is not None:
+                self._apply_pending()
+                if chunk.shape != (self.config.chunk_size, self.config.channels):
+                    chunk = np.empty(
+                        (self.config.chunk_size, self.config.channels), dtype=self.config.dtype
+                    )
+                    chunk_period = self.config.chunk_size / self.config.sample_rate_in
+                    poll_interval = chunk_period / 2
+                    
+            if not self.ring_buffer.read_into(chunk):
+                # Famine : aucun chunk complet depuis plus de 2 périodes
+                if time.monotonic() - last_data > 2 * chunk_period:
+                    self.metrics["ring_underruns"] += 1
+                    last_data = time.monotonic()
+                time.sleep(poll_interval)
+                continue
                 
-            # Calcul latence
-            latency_ms = (time.time() - start_time) * 1000
-            self.metrics["avg_latency_ms"] = (
-                self.metrics["avg_latency_ms"] * 0.9 + latency_ms * 0.1
-            )
+            last_data = time.monotonic()
+            self.metrics["ring_overruns"] = self.ring_buffer.overruns
             
-            # Publication périodique métriques
-            if self.metrics["chunks_processed"] % 100 == 0:
-                self._publish_metrics()
+            try:
+                self._process_chunk(chunk, time.perf_counter_ns())
+            except Exception as e:
+                self.logger.error(f"Erreur traitement audio: {e}")
                 
-            # Log périodique
-            if self.metrics["chunks_processed"] % 500 == 0:
-                voice_ratio = (self.metrics["voice_detected"] / 
-                             self.metrics["chunks_processed"]) * 100
+    @staticmethod
+    def _new_ring_buffer(config: AudioConfig) -> AudioRingBuffer:
+        return AudioRingBuffer(
+            config.chunk_size * config.ring_buffer_chunks, config.channels, config.dtype
+        )
+        
+    def _open_stream(self, config: AudioConfig) -> sd.InputStream:
+        """Flux de capture (callback selon le mode)"""
+        return sd.InputStream(
+            device=config.device_name,
+            channels=config.channels,
+            samplerate=config.sample_rate_in,
+            dtype=config.dtype,
+            blocksize=config.chunk_size,
+            callback=self._ring_callback if config.capture_mode == "ringbuffer" else self._audio_callback
+        )
+        
+    def _validate_changes(self, changes: Dict) -> Tuple[Dict, Dict]:
+        """(changements effectifs typés, refusés avec motif)"""
+        fields = {f.name for f in dataclasses.fields(AudioConfig)}
+        applied, rejected = {}, {}
+        for name, value in changes.items():
+            if name in UNSUPPORTED_PARAMS:
+                rejected[name] = "non pris en charge"
+                continue
+            if name not in LIVE_PARAMS and name not in STREAM_PARAMS:
+                rejected[name] = "redémarrage requis" if name in fields else "paramètre inconnu"
+                continue
+            current = getattr(self.config, name)
+            if isinstance(current, bool) != isinstance(value, bool):
+                rejected[name] = f"type invalide (attendu {type(current).__name__})"
+                continue
+            try:
+                typed = type(current)(value)
+            except (TypeError, ValueError):
+                rejected[name] = f"type invalide (attendu {type(current).__name__})"
+                continue
+            if isinstance(current, (int, float)) and typed != value:
+                rejected[name] = f"type invalide (attendu {type(current).__name__})"
+                continue
+            if typed != current:
+                applied[name] = typed
+        
+        # Bornes des paramètres modifiables à chaud
+        limits = {
+            "chunk_size": lambda v: 64 <= v <= 8192,
+            "resampler": lambda v: v in ("polyphase", "iir"),
+            "vad_aggressiveness": lambda v: 0 <= v <= 3,
+            "limiter_threshold": lambda v: 0.0 < v <= 1.0,
+            "channels": lambda v: v >= 1,
+            "sample_rate_in": lambda v: v > 0 and v % self.config.sample_rate_out == 0,
+            "segment_preroll_ms": lambda v: v >= 0,
+            "segment_hangover_ms": lambda v: v >= 0,
+            "segment_min_speech_ms": lambda v: v >= 0,
+            "segment_max_ms": lambda v: v >= self.config.vad_frame_ms
+        }
+        for name in list(applied):
+            if name in limits and not limits[name](applied[name]):
+                rejected[name] = f"valeur hors bornes: {applied.pop(name)}"
+        return applied, rejected
+        
+    def _needs_new_stream(self, config: AudioConfig) -> bool:
+        """Réouverture seulement si le flux lui-même change"""
+        if any(getattr(config, name) != getattr(self.config, name) for name in STREAM_PARAMS):
+            return True
+        if config.chunk_size != self.config.chunk_size:
+            # Mode direct : chunk = bloc PortAudio ; ring buffer : capacité suffisante
+            if self.ring_buffer is None:
+                return True
+            return 2 * config.chunk_size > self.ring_buffer.capacity
+        return False
+        
+    async def _wait_applied(self, pending: PendingConfig, timeout: float = 2.0) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(None, pending.applied.wait, timeout)
+        
+    async def _switch_stream(self, pending: PendingConfig):
+        """Fermeture du flux, bascule de configuration, ouverture du nouveau flux"""
+        config = pending.config
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+        
+        if self.worker_thread is not None:
+            pending.ring_buffer = self._new_ring_buffer(config)
+            self._pending = pending
+            if not await self._wait_applied(pending):
+                raise RuntimeError("thread DSP sans réponse")
+        else:
+            # Mode direct : plus aucun callback, bascule immédiate
+            self._pending = pending
+            self._apply_pending()
+            
+        stream = self._open_stream(config)
+        try:
+            stream.start()
+        except Exception:
+            stream.close()
+            raise
+        self.stream = stream
+        
+    async def reconfigure(self, changes: Dict, request_id: Optional[str] = None) -> Dict:
+        """Applique des paramètres AudioConfig sans redémarrer le pipeline
+
+        Paramètres de LIVE_PARAMS : filtres préparés ici puis basculés par le
+        thread DSP entre deux chunks, sans coupure. STREAM_PARAMS : flux
+        rouvert (quelques dizaines de ms). Résultat publié sur
+        mqtt_topic_config_result.
+        """
+        async with self._reconfigure_lock:
+            applied, rejected = self._validate_changes(changes)
+            reopened = False
+            previous = self.config
+            if applied:
+                config = dataclasses.replace(self.config, **applied)
+                try:
+                    reopened = self.is_running and self._needs_new_stream(config)
+                    pending = self._prepare_config(config, new_stream=reopened)
+                    if reopened:
+                        await self._switch_stream(pending)
+                    elif self.is_running:
+                        self._pending = pending
+                        if not await self._wait_applied(pending):
+                            raise RuntimeError("thread DSP sans réponse")
+                    else:
+                        self._pending = pending
+                        self._apply_pending()
+                except Exception as e:
+                    self.logger.error(f"Reconfiguration audio impossible: {e}")
+                    rejected.update({name: str(e) for name in applied})
+                    applied = {}
+                    if reopened and self.stream is None:
+                        await self._rollback_stream(previous)
+                    
+            result = {
+                "request_id": request_id,
+                "applied": applied,
+                "rejected": rejected,
+                "stream_reopened": reopened and bool(applied),
+                "stream_down": self.is_running and self.stream is None,
+                "ts_ns": now_ns()
+            }
+            if applied:
                 self.logger.info(
-                    f"Pipeline: {self.metrics['chunks_processed']} chunks, "
-                    f"{voice_ratio:.1f}% voix, {self.metrics['avg_latency_ms']:.1f}ms latence"
+                    f"Configuration audio appliquée: {applied}"
+                    f"{' (flux rouvert)' if result['stream_reopened'] else ''}"
                 )
-                
+            if rejected:
+                self.logger.warning(f"Paramètres audio refusés: {rejected}")
+            self._publish_config_result(result)
+            return result
+            
+    async def _rollback_stream(self, previous: AudioConfig):
+        """Retour à la configuration précédente (filtres, segmenteur, VAD) et à son flux"""
+        self._pending = None
+        try:
+            await self._switch_stream(self._prepare_config(previous, new_stream=True))
         except Exception as e:
-            self.logger.error(f"Erreur callback audio: {e}")
+            # Périphérique disparu : configuration restaurée, flux fermé (signalé par stream_down)
+            self.logger.error(f"Réouverture du flux précédent impossible, capture arrêtée: {e}")
             
+    def _publish_config_result(self, result: Dict):
+        if self.mqtt_enabled and self.mqtt_client and self.mqtt_client.is_connected():
+            try:
+                self.codec.publish(self.mqtt_client, self.config.mqtt_topic_config_result, result)
+            except Exception as e:
+                self.logger.error(f"Erreur publication résultat configuration: {e}")
+                
     async def start(self):
         """Démarrage pipeline audio"""
         if self.is_running:
@@ -266,23 +1097,26 @@ async def start(self):
             device_info = sd.query_devices(self.config.device_name)
             self.logger.info(f"Périphérique: {device_info['name']}")
             
+            # Mode de capture : callback minimal + worker, ou traitement direct
+            if self.config.capture_mode == "ringbuffer":
+                self.ring_buffer = self._new_ring_buffer(self.config)
+            
             # Démarrage stream audio
-            self.stream = sd.InputStream(
-                device=self.config.device_name,
-                channels=self.config.channels,
-                samplerate=self.config.sample_rate_in,
-                dtype=self.config.dtype,
-                blocksize=self.config.chunk_size,
-                callback=self._audio_callback
-            )
+            self.stream = self._open_stream(self.config)
+            self.loop = asyncio.get_running_loop()
             
-            self.stream.start()
             self.is_running = True
+            if self.ring_buffer is not None:
+                self.worker_thread = threading.Thread(
+                    target=self._processing_loop, name="bender-audio-dsp", daemon=True
+                )
+                self.worker_thread.start()
+            self.stream.start()
             
             self.logger.info(
                 f"Pipeline démarré: {self.config.sample_rate_in}Hz, "
                 f"{self.config.channels}ch, {self.config.dtype}, "
-                f"chunk={self.config.chunk_size}"
+                f"chunk={self.config.chunk_size}, mode={self.config.capture_mode}"
             )
             
             # Boucle principale
@@ -300,9 +1134,18 @@ async def stop(self):
         
         self.is_running = False
         
-        if hasattr(self, 'stream'):
+        if self.stream is not None:
             self.stream.stop()
             self.stream.close()
+            self.stream = None
+            
+        if self.worker_thread is not None:
+            self.worker_thread.join(timeout=2)
+            self.worker_thread = None
+            
+        self.segmenter.flush()
+        if self.transport is not None:
+            self.transport.close()
             
         if self.mqtt_client:
             self.mqtt_client.loop_stop()
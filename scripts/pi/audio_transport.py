@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Bender Audio Transport - Raspberry Pi 5 → hôte ASR (T630)
+Transport binaire des trames PCM 16kHz : en-tête compact + payload brut
+
+Backends : MQTT (un message par trame) et TCP (flux d'en-têtes + payloads).
+Un récepteur loopback permet de valider le transport et de mesurer
+latence bout en bout et pertes (trous de séquence).
+
+Format d'une trame (little-endian, 26 octets d'en-tête) :
+    version u8 | kind u8 | format u8 | channels u8 | sample_rate u16 |
+    segment_id u32 | seq u32 | timestamp_ns u64 | payload_len u32
+
+Payloads de contrôle : début de segment = contexte de trace JSON
+(voir bender_trace.py), fin de segment = SEGMENT_END.
+"""
+
+import abc
+import logging
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Optional
+
+HEADER = struct.Struct("<BBBBHIIQI")
+PROTOCOL_VERSION = 1
+
+# Types de trame
+KIND_AUDIO = 0
+KIND_SEGMENT_START = 1
+KIND_SEGMENT_END = 2
+
+# Formats d'échantillons
+FORMAT_S16LE = 1
+FORMAT_F32LE = 2
+
+# Payload de fin de segment : code raison | annulé | durée ms
+SEGMENT_END = struct.Struct("<BBI")
+END_REASONS = {"silence": 0, "max_length": 1, "stop": 2}
+
+
+class AudioTransport(abc.ABC):
+    """Émetteur de trames binaires (à spécialiser par backend)"""
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1,
+                 sample_format: int = FORMAT_S16LE):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_format = sample_format
+        self.logger = logging.getLogger("bender.audio.transport")
+        self.seq = 0
+        self.header = bytearray(HEADER.size)
+        self.stats = {
+            "frames_sent": 0,
+            "frames_dropped": 0,
+            "bytes_sent": 0
+        }
+
+    def send(self, kind: int, segment_id: int, payload) -> bool:
+        """Envoie une trame ; payload = objet buffer (memoryview, ndarray, bytes)"""
+        view = memoryview(payload).cast("B")
+        HEADER.pack_into(
+            self.header, 0, PROTOCOL_VERSION, kind, self.sample_format,
+            self.channels, self.sample_rate, segment_id, self.seq,
+            time.time_ns(), len(view)
+        )
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+
+        if self._send(self.header, view):
+            self.stats["frames_sent"] += 1
+            self.stats["bytes_sent"] += HEADER.size + len(view)
+            return True
+
+        self.stats["frames_dropped"] += 1
+        return False
+
+    @abc.abstractmethod
+    def _send(self, header: bytearray, payload: memoryview) -> bool:
+        """Émission backend ; False si la trame n'a pas pu partir"""
+
+    def close(self):
+        """Libère les ressources du backend"""
+
+
+class MQTTAudioTransport(AudioTransport):
+    """Backend MQTT : un message binaire (en-tête + PCM) par trame, QoS 0"""
+
+    def __init__(self, mqtt_client, topic: str, **kwargs):
+        super().__init__(**kwargs)
+        self.mqtt_client = mqtt_client
+        self.topic = topic
+        self.packet = bytearray(HEADER.size)
+
+    def _send(self, header: bytearray, payload: memoryview) -> bool:
+        if not self.mqtt_client.is_connected():
+            return False
+
+        # paho exige un payload contigu : une seule copie dans un buffer réutilisé
+        size = HEADER.size + len(payload)
+        if len(self.packet) != size:
+            self.packet = bytearray(size)
+        self.packet[:HEADER.size] = header
+        self.packet[HEADER.size:] = payload
+
+        result = self.mqtt_client.publish(self.topic, self.packet, qos=0)
+        return result.rc == 0
+
+
+class TCPAudioTransport(AudioTransport):
+    """Backend TCP : flux continu en-tête + payload, envoi scatter-gather
+
+    Socket non bloquant : l'appelant (worker DSP) n'attend jamais le réseau.
+    Résolution DNS et connexion se font dans un thread dédié ; les trames
+    émises pendant la connexion sont comptées comme perdues.
+    Un reliquat d'envoi partiel est conservé et vidé en priorité ; tant
+    qu'il ne part pas, les nouvelles trames sont comptées comme perdues.
+    """
+
+    RECONNECT_DELAY = 1.0
+    CONNECT_TIMEOUT = 2.0
+
+    def __init__(self, host: str, port: int, **kwargs):
+        super().__init__(**kwargs)
+        self.host = host
+        self.port = port
+        self.sock: Optional[socket.socket] = None
+        self.pending = b""
+        self.last_attempt = 0.0
+        self.connecting = False
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        """Lance une tentative de connexion en arrière-plan (au plus une par RECONNECT_DELAY)"""
+        now = time.monotonic()
+        if self.connecting or now - self.last_attempt < self.RECONNECT_DELAY:
+            return
+        self.last_attempt = now
+        self.connecting = True
+        threading.Thread(target=self._connect_worker, name="bender-audio-connect",
+                         daemon=True).start()
+
+    def _connect_worker(self):
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.CONNECT_TIMEOUT)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setblocking(False)
+        except OSError as e:
+            self.logger.warning(f"Connexion transport audio impossible: {e}")
+            self.connecting = False
+            return
+
+        with self.lock:
+            if self.closed:
+                sock.close()
+            else:
+                self.pending = b""
+                self.sock = sock
+                self.logger.info(f"Transport audio TCP connecté à {self.host}:{self.port}")
+        self.connecting = False
+
+    def _send(self, header: bytearray, payload: memoryview) -> bool:
+        sock = self.sock
+        if sock is None:
+            if not self.closed:
+                self._connect()
+            return False
+
+        try:
+            if self.pending:
+                sent = sock.send(self.pending)
+                self.pending = self.pending[sent:]
+                if self.pending:
+                    return False
+
+            total = HEADER.size + len(payload)
+            sent = sock.sendmsg([header, payload])
+            if sent < total:
+                # Envoi partiel : conserver la fin pour garder le flux cohérent
+                self.pending = (bytes(header) + payload.tobytes())[sent:]
+            return True
+
+        except BlockingIOError:
+            return False
+        except OSError as e:
+            self.logger.warning(f"Transport audio TCP interrompu: {e}")
+            self._disconnect()
+            return False
+
+    def _disconnect(self):
+        with self.lock:
+            sock, self.sock = self.sock, None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def close(self):
+        self.closed = True
+        self._disconnect()
+
+
+class AudioFrameReceiver:
+    """Récepteur de trames : décodage, pertes et latence bout en bout
+
+    `feed()` accepte un message complet (backend MQTT) ; `serve_tcp()`
+    démarre un serveur TCP local (loopback par défaut) pour le backend TCP.
+    La latence utilise l'horloge murale : hôtes synchronisés (NTP) requis
+    hors loopback.
+    """
+
+    def __init__(self, on_frame: Optional[Callable] = None):
+        self.on_frame = on_frame
+        self.logger = logging.getLogger("bender.audio.receiver")
+        self.expected_seq: Optional[int] = None
+        self.server: Optional[socket.socket] = None
+        self.running = False
+        self.stats = {
+            "frames_received": 0,
+            "frames_lost": 0,
+            "bytes_received": 0,
+            "latency_avg_ms": 0.0,
+            "latency_max_ms": 0.0
+        }
+
+    def feed(self, packet) -> bool:
+        """Décode un message complet (en-tête + payload)"""
+        view = memoryview(packet)
+        if len(view) < HEADER.size:
+            return False
+        header = HEADER.unpack_from(view)
+        payload_len = header[8]
+        if len(view) < HEADER.size + payload_len:
+            return False
+        self._handle(header, view[HEADER.size:HEADER.size + payload_len])
+        return True
+
+    def _handle(self, header: tuple, payload: memoryview):
+        version, kind, sample_format, channels, rate, segment_id, seq, ts_ns, _ = header
+        if version != PROTOCOL_VERSION:
+            self.logger.warning(f"Version de protocole inconnue: {version}")
+            return
+
+        if self.expected_seq is not None and seq != self.expected_seq:
+            self.stats["frames_lost"] += (seq - self.expected_seq) & 0xFFFFFFFF
+        self.expected_seq = (seq + 1) & 0xFFFFFFFF
+
+        latency_ms = (time.time_ns() - ts_ns) / 1e6
+        count = self.stats["frames_received"] + 1
+        self.stats["frames_received"] = count
+        self.stats["bytes_received"] += HEADER.size + len(payload)
+        self.stats["latency_avg_ms"] += (latency_ms - self.stats["latency_avg_ms"]) / count
+        if latency_ms > self.stats["latency_max_ms"]:
+            self.stats["latency_max_ms"] = latency_ms
+
+        if self.on_frame:
+            self.on_frame(kind, segment_id, seq, ts_ns, payload)
+
+    def serve_tcp(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Démarre le serveur TCP en arrière-plan, retourne le port effectif"""
+        self.server = socket.create_server((host, port))
+        self.running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self.server.getsockname()[1]
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, addr = self.server.accept()
+            except OSError:
+                break
+            self.logger.info(f"Émetteur audio connecté: {addr}")
+            threading.Thread(target=self._read_loop, args=(conn,), daemon=True).start()
+
+    def _read_loop(self, conn: socket.socket):
+        header_buf = bytearray(HEADER.size)
+        payload_buf = bytearray(4096)
+        with conn:
+            while self.running:
+                if not self._recv_exact(conn, memoryview(header_buf)):
+                    break
+                header = HEADER.unpack(header_buf)
+                payload_len = header[8]
+                if payload_len > len(payload_buf):
+                    payload_buf = bytearray(payload_len)
+                payload = memoryview(payload_buf)[:payload_len]
+                if not self._recv_exact(conn, payload):
+                    break
+                self._handle(header, payload)
+
+    @staticmethod
+    def _recv_exact(conn: socket.socket, view: memoryview) -> bool:
+        received = 0
+        while received < len(view):
+            n = conn.recv_into(view[received:])
+            if n == 0:
+                return False
+            received += n
+        return True
+
+    def stop(self):
+        """Arrêt du serveur TCP"""
+        self.running = False
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+
+if __name__ == "__main__":
+    # Auto-test loopback : 10 s de trames 20ms silencieuses via TCP
+    logging.basicConfig(level=logging.INFO)
+    receiver = AudioFrameReceiver()
+    port = receiver.serve_tcp()
+
+    transport = TCPAudioTransport("127.0.0.1", port)
+    frame = bytes(640)  # 320 échantillons s16le
+    for i in range(500):
+        transport.send(KIND_AUDIO, 1, frame)
+        time.sleep(0.02)
+    time.sleep(0.2)
+
+    print(f"Émetteur: {transport.stats}")
+    print(f"Récepteur: {receiver.stats}")
+    transport.close()
+    receiver.stop()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark sérialisation MQTT : JSON actuel (ISO timestamp) vs bender_codec
+(JSON compact, msgpack, CBOR selon modules installés)
+Taille du payload et coût encodage/décodage par type de message
+
+Usage : python3 bench_codec.py [--repeat 2000]
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+
+from bender_codec import available_formats, decode, encode, now_ns
+from bender_metrics import MetricsRegistry
+from bender_trace import TraceCollector, TraceContext
+
+
+def sample_trace() -> TraceContext:
+    trace = TraceContext.start("speech_start")
+    start = trace.hops[0][1]
+    for i, hop in enumerate(("speech_end", "asr_final", "router_rx", "dispatched", "tts_sent")):
+        trace.mark(hop, start + (i + 1) * random.randint(20, 300) * 1_000_000)
+    return trace
+
+
+def sample_latency(stages) -> dict:
+    registry = MetricsRegistry()
+    for stage in stages:
+        for _ in range(500):
+            registry.record(stage, random.randint(50_000, 20_000_000))
+    return registry.snapshot()
+
+
+def sample_messages() -> dict:
+    collector = TraceCollector()
+    for _ in range(50):
+        collector.record(sample_trace())
+
+    return {
+        "tts_say": {
+            "text": "J'allume la lumière du salon",
+            "ts_ns": now_ns(),
+            "source": "intent_router",
+            "cache": {"key": "4bc3232811e9d5e40575", "hit": True, "voice": "fr_FR-siwis-medium"},
+            "trace": sample_trace().to_dict()
+        },
+        "sys_log": {
+            "message": "ASR: allume la lumière du salon (0.93)",
+            "level": "info",
+            "ts_ns": now_ns(),
+            "component": "intent_router"
+        },
+        "router_metrics": {
+            "intents_processed": 1234, "ha_commands_sent": 1100, "errors": 3,
+            "fast_path_hits": 900, "fast_path_misses": 334, "start_time": time.time(),
+            "ts_ns": now_ns(), "ha_connected": True, "mqtt_connected": True,
+            "component": "intent_router",
+            "latency": sample_latency(("intent", "ha_call", "fast_nlu", "tts_publish", "dispatch_wait")),
+            "traces": collector.snapshot(),
+            "dispatch": {"dispatched": 1234, "shed": 0, "queue_depth_max": 3, "queue_depth": 0}
+        },
+        "audio_metrics": {
+            "chunks_processed": 360000, "voice_detected": 4200, "vad_frames": 1800000,
+            "voice_frames": 21000, "segments": 120, "segments_discarded": 14,
+            "ring_overruns": 0, "ring_underruns": 2, "input_overflows": 0,
+            "last_update": time.time(), "ts_ns": now_ns(), "component": "audio_pipeline",
+            "latency": sample_latency(("filter", "resample", "vad", "publish", "chunk"))
+        }
+    }
+
+
+def legacy_json(message: dict) -> bytes:
+    """Encodage actuel : json.dumps et horodatage ISO"""
+    message = {k: v for k, v in message.items() if k != "ts_ns"}
+    message["timestamp"] = datetime.now().isoformat()
+    return json.dumps(message).encode("utf-8")
+
+
+def measure(fn, repeat: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter_ns() - start) / repeat / 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sérialisation MQTT")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    formats = available_formats()
+    print(f"Formats disponibles : {', '.join(formats)}")
+    print(f"{'message':<15} {'format':<12} {'octets':>8} {'encode µs':>10} {'decode µs':>10}")
+
+    for name, message in sample_messages().items():
+        payload = legacy_json(message)
+        encode_us = measure(lambda: legacy_json(message), args.repeat)
+        decode_us = measure(lambda: json.loads(payload), args.repeat)
+        print(f"{name:<15} {'json actuel':<12} {len(payload):>8} {encode_us:>10.1f} {decode_us:>10.1f}")
+
+        for fmt in formats:
+            payload = encode(message, fmt)
+            assert decode(payload)["component" if "component" in message else "text"] \
+                == message.get("component", message.get("text"))
+            encode_us = measure(lambda: encode(message, fmt), args.repeat)
+            decode_us = measure(lambda: decode(payload), args.repeat)
+            print(f"{'':<15} {fmt:<12} {len(payload):>8} {encode_us:>10.1f} {decode_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
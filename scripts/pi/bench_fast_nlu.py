@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark NLU locale (fast_nlu.py) sur un corpus de phrases annotées
+Rapporte taux de reconnaissance, erreurs d'intent/slots et latence par phrase
+
+Usage : python3 bench_fast_nlu.py [--repeat 1000] [--verbose]
+"""
+
+import argparse
+import time
+
+from bender_metrics import LatencyHistogram
+from fast_nlu import FastIntentMatcher, fold
+
+# Pièces connues (registre HA du router) pour les gabarits sans objet
+ROOMS = frozenset({"salon", "sejour", "cuisine", "chambre", "salle de bain", "bureau"})
+
+# (phrase ASR, intent attendu ou None si réservée au LLM, slots attendus)
+CORPUS = [
+    ("Allume la lumière du salon", "turn_on_light", {"room": "salon"}),
+    ("allume la lumière", "turn_on_light", {}),
+    ("Bender, allume la cuisine s'il te plaît", "turn_on_light", {"room": "cuisine"}),
+    ("allume les lumières de la salle de bain", "turn_on_light", {"room": "salle de bain"}),
+    ("Tu peux allumer la lampe de la chambre ?", "turn_on_light", {"room": "chambre"}),
+    ("allume le séjour", "turn_on_light", {"room": "séjour"}),
+    ("Éteins la lumière de la cuisine", "turn_off_light", {"room": "cuisine"}),
+    ("éteins le salon", "turn_off_light", {"room": "salon"}),
+    ("coupe la lumière dans la chambre", "turn_off_light", {"room": "chambre"}),
+    ("Peux-tu éteindre l'éclairage du bureau", "turn_off_light", {"room": "bureau"}),
+    ("mets la lumière du salon à 30%", "set_brightness", {"room": "salon", "brightness": 30}),
+    ("règle la luminosité de la chambre à 50 pour cent", "set_brightness",
+     {"room": "chambre", "brightness": 50}),
+    ("luminosité à vingt", "set_brightness", {"brightness": 20}),
+    ("baisse la lumière de la cuisine à 10 %", "set_brightness",
+     {"room": "cuisine", "brightness": 10}),
+    ("mets le volume à 40", "set_volume", {"volume": 40}),
+    ("règle le son à 25 %", "set_volume", {"volume": 25}),
+    ("volume à cinquante", "set_volume", {"volume": 50}),
+    ("lance la musique", "play_music", {}),
+    ("Bender, mets de la musique", "play_music", {}),
+    ("joue une chanson", "play_music", {}),
+    ("arrête la musique", "stop_music", {}),
+    ("stop", "stop_music", {}),
+    ("coupe la musique s'il te plaît", "stop_music", {}),
+    ("Quelle est la température du salon ?", "get_temperature", {"room": "salon"}),
+    ("quelle température fait-il dans la chambre", "get_temperature", {"room": "chambre"}),
+    ("il fait combien dans la cuisine", "get_temperature", {"room": "cuisine"}),
+    ("température", "get_temperature", {}),
+    ("quel est le statut du système", "get_status", {}),
+    ("comment tu vas ?", "get_status", {}),
+    # Réservées au LLM
+    ("raconte-moi une blague", None, {}),
+    ("quel temps fera-t-il demain à Lyon", None, {}),
+    ("allume la lumière du salon et éteins celle de la cuisine", None, {}),
+    ("rappelle-moi d'acheter du pain", None, {}),
+    ("qui a gagné le match hier soir", None, {}),
+    ("mets-moi une ambiance tamisée pour le film", None, {}),
+    ("c'est quoi la capitale de l'Australie", None, {}),
+    # Nom seul qui n'est pas une pièce : pas une lumière
+    ("allume le chauffage", None, {}),
+    ("éteins la clim", None, {}),
+    ("allume le ventilateur de la chambre", None, {}),
+    ("ça va", None, {}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NLU locale")
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    matcher = FastIntentMatcher(known_room=lambda room: fold(room.lower()) in ROOMS)
+    matched = correct = false_positives = 0
+    expected_hits = sum(1 for _, intent, _ in CORPUS if intent)
+
+    for text, intent, slots in CORPUS:
+        result = matcher.match(text)
+        got = result["intent"] if result else None
+        entities = result["entities"] if result else {}
+        if result:
+            matched += 1
+        if intent is None and result:
+            false_positives += 1
+        ok = got == intent and entities == slots
+        correct += ok
+        if args.verbose or not ok:
+            status = "OK " if ok else "ERR"
+            print(f"{status} {text!r:<60} → {got} {entities}")
+
+    histogram = LatencyHistogram()
+    for _ in range(args.repeat):
+        for text, _, _ in CORPUS:
+            t0 = time.perf_counter_ns()
+            matcher.match(text)
+            histogram.record(time.perf_counter_ns() - t0)
+
+    snap = histogram.snapshot()
+    print(f"Corpus: {len(CORPUS)} phrases ({expected_hits} domotique, "
+          f"{len(CORPUS) - expected_hits} LLM)")
+    print(f"Reconnues localement : {matched}/{len(CORPUS)} | correctes : {correct}/{len(CORPUS)} | "
+          f"faux positifs : {false_positives}")
+    print(f"Latence par phrase : p50 {snap['p50_ms'] * 1000:.1f} µs | "
+          f"p95 {snap['p95_ms'] * 1000:.1f} µs | p99 {snap['p99_ms'] * 1000:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
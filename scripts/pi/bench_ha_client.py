@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark clients Home Assistant : requests (synchrone) vs aiohttp (asyncio)
+Contre le faux serveur local (fake_ha.py) ou un vrai HA (--url, --token)
+
+Usage : python3 bench_ha_client.py [--calls 100] [--delay-ms 20] [--batch 4]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+from bender_metrics import LatencyHistogram
+from fake_ha import FakeHomeAssistant
+from ha_async import AsyncHomeAssistantClient
+from intent_router import HAConfig, HomeAssistantClient
+
+ROOMS = ["salon", "cuisine", "chambre", "salle_de_bain"]
+
+
+def report(name: str, histogram: LatencyHistogram, elapsed: float, calls: int):
+    snap = histogram.snapshot()
+    print(f"{name:<22} total {elapsed * 1000:8.1f} ms | "
+          f"p50 {snap['p50_ms']:6.2f} ms | p95 {snap['p95_ms']:6.2f} ms | "
+          f"{calls / elapsed:7.1f} appels/s")
+
+
+def bench_sync(config: HAConfig, calls: int):
+    client = HomeAssistantClient(config)
+    client.test_connection()
+    histogram = LatencyHistogram()
+    start = time.perf_counter()
+    for i in range(calls):
+        t0 = time.perf_counter_ns()
+        client.call_service("light", "turn_on", f"light.{ROOMS[i % len(ROOMS)]}")
+        histogram.record(time.perf_counter_ns() - t0)
+    report("requests séquentiel", histogram, time.perf_counter() - start, calls)
+
+
+async def bench_async(config: HAConfig, calls: int, batch: int):
+    client = AsyncHomeAssistantClient(config, pool_size=batch)
+    await client.warm_up()
+
+    histogram = LatencyHistogram()
+    start = time.perf_counter()
+    for i in range(calls):
+        t0 = time.perf_counter_ns()
+        await client.call_service("light", "turn_on", f"light.{ROOMS[i % len(ROOMS)]}")
+        histogram.record(time.perf_counter_ns() - t0)
+    report("aiohttp séquentiel", histogram, time.perf_counter() - start, calls)
+
+    # Lots concurrents : `batch` pièces éteintes en même temps
+    histogram = LatencyHistogram()
+    start = time.perf_counter()
+    for _ in range(calls // batch):
+        t0 = time.perf_counter_ns()
+        await client.call_services([
+            ("light", "turn_off", f"light.{ROOMS[j % len(ROOMS)]}", None)
+            for j in range(batch)
+        ])
+        histogram.record(time.perf_counter_ns() - t0)
+    report(f"aiohttp lots de {batch}", histogram, time.perf_counter() - start,
+           (calls // batch) * batch)
+
+    await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark clients Home Assistant")
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=4)
+    parser.add_argument("--delay-ms", type=float, default=20.0)
+    parser.add_argument("--url", default=None, help="HA réel (sinon faux serveur local)")
+    parser.add_argument("--token", default="")
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        # Faux serveur dans une boucle asyncio dédiée
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        server = FakeHomeAssistant(args.delay_ms)
+        port = asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+        url = f"http://127.0.0.1:{port}"
+        print(f"Faux HA local, latence simulée {args.delay_ms:.0f} ms")
+
+    config = HAConfig(base_url=url, token=args.token)
+    bench_sync(config, args.calls)
+    asyncio.run(bench_async(config, args.calls, args.batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark décimation 48kHz → 16kHz - Raspberry Pi 5
+Compare le chemin IIR (sosfilt + [::3]) au décimateur polyphase FIR
+
+Usage : python3 bench_resampler.py [--seconds 60] [--chunk 1024]
+Résultat : temps CPU consommé par seconde d'audio traitée (ms CPU / s audio)
+"""
+
+import argparse
+import time
+
+import numpy as np
+from scipy import signal
+
+from audio_pipeline import AudioConfig, StreamingSOSFilter, PolyphaseDecimator
+
+
+def bench(name: str, process, audio: np.ndarray, chunk_size: int, seconds: float):
+    """Mesure le temps CPU d'un étage de décimation chunk par chunk"""
+    start = time.process_time()
+    for offset in range(0, len(audio) - chunk_size + 1, chunk_size):
+        process(audio[offset:offset + chunk_size])
+    cpu = time.process_time() - start
+
+    print(f"{name:<10} {cpu * 1000 / seconds:8.2f} ms CPU / s audio "
+          f"({cpu * 100 / seconds:.2f}% d'un cœur)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark décimation audio")
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--chunk", type=int, default=None)
+    args = parser.parse_args()
+
+    config = AudioConfig()
+    chunk_size = args.chunk or config.chunk_size
+    factor = config.sample_rate_in // config.sample_rate_out
+    nyquist = config.sample_rate_in // 2
+
+    rng = np.random.default_rng(0)
+    frames = int(args.seconds * config.sample_rate_in)
+    audio = (rng.standard_normal((frames, config.channels)) * 0.1).astype(np.float32)
+
+    antialias_sos = signal.butter(
+        6, (config.sample_rate_out // 2) / nyquist, btype='low', output='sos'
+    )
+    iir = StreamingSOSFilter(antialias_sos, config.channels)
+    decimator = PolyphaseDecimator(factor, config.channels, chunk_size)
+
+    print(f"{args.seconds:.0f}s audio, {config.channels}ch, chunk={chunk_size}, facteur={factor}")
+    bench("iir", lambda x: iir.process(x)[::factor], audio, chunk_size, args.seconds)
+    bench("polyphase", decimator.process, audio, chunk_size, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Bender Codec - Sérialisation des messages MQTT partagée (pipeline audio, router)
+
+Formats : "json" (défaut), "json-compact", "msgpack" et "cbor"
+(dépendances optionnelles msgpack / cbor2). Horodatage unique : entier
+epoch ns ("ts_ns").
+
+Négociation par topic : le topic de base reste en JSON encodé comme
+avant (réglages par défaut de json.dumps, consommateurs existants
+inchangés, "timestamp" ISO ajouté à l'encodage) ; chaque autre format
+activé pour un topic est publié sur `<topic>/<format>`, y compris
+"json-compact" (séparateurs compacts, UTF-8 non échappé).
+Un consommateur choisit son format en choisissant son topic :
+
+    TopicCodec({"bender/sys/metrics": ("json", "msgpack")})
+    → bender/sys/metrics (JSON) + bender/sys/metrics/msgpack
+
+Sans "json" dans la liste, seul le format binaire est publié.
+`decode()` reconnaît le format au premier octet.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+logger = logging.getLogger("bender.codec")
+
+
+def now_ns() -> int:
+    """Horodatage des messages : epoch ns"""
+    return time.time_ns()
+
+
+def _with_timestamp(message: Dict) -> Dict:
+    if "ts_ns" in message and "timestamp" not in message:
+        # Compatibilité : chaîne ISO attendue par les consommateurs JSON
+        iso = datetime.fromtimestamp(message["ts_ns"] / 1e9).isoformat()
+        message = {**message, "timestamp": iso}
+    return message
+
+
+def _encode_json(message: Dict) -> bytes:
+    return json.dumps(_with_timestamp(message)).encode("utf-8")
+
+
+def _encode_json_compact(message: Dict) -> bytes:
+    return json.dumps(_with_timestamp(message), separators=(",", ":"),
+                      ensure_ascii=False).encode("utf-8")
+
+
+def _decode_json(payload: bytes) -> Any:
+    return json.loads(payload)
+
+
+ENCODERS: Dict[str, Callable[[Dict], bytes]] = {"json": _encode_json,
+                                                 "json-compact": _encode_json_compact}
+DECODERS: Dict[str, Callable[[bytes], Any]] = {"json": _decode_json,
+                                               "json-compact": _decode_json}
+
+if msgpack is not None:
+    ENCODERS["msgpack"] = lambda message: msgpack.packb(message, use_bin_type=True)
+    DECODERS["msgpack"] = lambda payload: msgpack.unpackb(payload, raw=False)
+
+if cbor2 is not None:
+    ENCODERS["cbor"] = cbor2.dumps
+    DECODERS["cbor"] = cbor2.loads
+
+
+def available_formats() -> List[str]:
+    """Formats utilisables (selon les modules installés)"""
+    return list(ENCODERS)
+
+
+def encode(message: Dict, fmt: str = "json") -> bytes:
+    """Encodage d'un message dans un format"""
+    return ENCODERS[fmt](message)
+
+
+def detect_format(payload: bytes) -> str:
+    """Format d'un payload d'après son premier octet (messages = dicts)"""
+    first = payload[:1]
+    if first in (b"{", b"[", b" ", b"\n"):
+        return "json"
+    byte = first[0] if first else 0
+    # msgpack : fixmap 0x80-0x8f, map16/32 0xde/0xdf ; CBOR : map 0xa0-0xbb
+    if 0x80 <= byte <= 0x8F or byte in (0xDE, 0xDF):
+        return "msgpack"
+    if 0xA0 <= byte <= 0xBB:
+        return "cbor"
+    return "json"
+
+
+def decode(payload: bytes, fmt: Optional[str] = None) -> Any:
+    """Décodage d'un payload (format détecté si non précisé)"""
+    fmt = fmt or detect_format(payload)
+    if fmt not in DECODERS:
+        raise ValueError(f"Format {fmt} indisponible (module manquant)")
+    return DECODERS[fmt](payload)
+
+
+class TopicCodec:
+    """Formats de publication par topic"""
+
+    def __init__(self, formats: Optional[Dict[str, Iterable[str]]] = None):
+        self.formats: Dict[str, Tuple[str, ...]] = {}
+        for topic, topic_formats in (formats or {}).items():
+            usable = []
+            for fmt in topic_formats:
+                if fmt in ENCODERS:
+                    usable.append(fmt)
+                else:
+                    logger.warning(f"Format {fmt} indisponible pour {topic}, ignoré")
+            self.formats[topic] = tuple(usable) or ("json",)
+
+    def outputs(self, topic: str, message: Dict) -> List[Tuple[str, bytes]]:
+        """(topic, payload) à publier pour un message"""
+        outputs = []
+        for fmt in self.formats.get(topic, ("json",)):
+            target = topic if fmt == "json" else f"{topic}/{fmt}"
+            outputs.append((target, ENCODERS[fmt](message)))
+        return outputs
+
+    def publish(self, client, topic: str, message: Dict, qos: int = 0, retain: bool = False):
+        """Publication paho dans chaque format du topic"""
+        for target, payload in self.outputs(topic, message):
+            client.publish(target, payload, qos=qos, retain=retain)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Bender Metrics - Histogrammes de latence partagés (pipeline audio, router)
+
+Histogramme à buckets fixes log-linéaires (style HDR) : 2^SUB_BITS
+sous-buckets par puissance de 2, erreur relative < 12.5 %, mémoire
+constante, enregistrement O(1). Mesures en nanosecondes via
+`time.perf_counter_ns()` (horloge monotone).
+
+Usage :
+    metrics = MetricsRegistry()
+    with metrics.timer("filter"):
+        ...
+    t0 = time.perf_counter_ns(); ...; metrics.record("vad", time.perf_counter_ns() - t0)
+    metrics.snapshot()  # {"filter": {"count", "p50_ms", "p95_ms", "p99_ms", ...}}
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+SUB_BITS = 3
+SUB_COUNT = 1 << SUB_BITS
+MAX_BITS = 40  # ~1100 s en ns, au-delà : dernier bucket
+
+
+def _bucket_index(value: int) -> int:
+    """Index du bucket log-linéaire pour une valeur entière >= 0"""
+    bits = value.bit_length()
+    if bits <= SUB_BITS:
+        return value
+    if bits > MAX_BITS:
+        return (MAX_BITS - SUB_BITS + 1) * SUB_COUNT - 1
+    shift = bits - SUB_BITS - 1
+    return (shift + 1) * SUB_COUNT + ((value >> shift) - SUB_COUNT)
+
+
+def _bucket_upper(index: int) -> int:
+    """Borne haute (incluse) d'un bucket"""
+    if index < SUB_COUNT:
+        return index
+    shift = index // SUB_COUNT - 1
+    sub = index % SUB_COUNT
+    return ((SUB_COUNT + sub + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Histogramme de latences en nanosecondes, buckets fixes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = [0] * ((MAX_BITS - SUB_BITS + 1) * SUB_COUNT)
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns: Optional[int] = None
+        self.max_ns = 0
+
+    def record(self, value_ns: int):
+        """Enregistre une durée (ns)"""
+        if value_ns < 0:
+            value_ns = 0
+        index = _bucket_index(value_ns)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ns += value_ns
+            if self.min_ns is None or value_ns < self.min_ns:
+                self.min_ns = value_ns
+            if value_ns > self.max_ns:
+                self.max_ns = value_ns
+
+    def percentile(self, p: float) -> float:
+        """Percentile p (0-100) en ms, borne haute du bucket"""
+        with self.lock:
+            return self._percentile_ns(self.counts, self.count, p) / 1e6
+
+    def _percentile_ns(self, counts, count: int, p: float) -> int:
+        if count == 0:
+            return 0
+        target = max(1, int(count * p / 100.0 + 0.5))
+        seen = 0
+        for index, n in enumerate(counts):
+            seen += n
+            if seen >= target:
+                return min(_bucket_upper(index), self.max_ns)
+        return self.max_ns
+
+    def snapshot(self, reset: bool = False) -> Dict[str, float]:
+        """Résumé (ms) : count, min, moyenne, p50/p95/p99, max"""
+        with self.lock:
+            counts = self.counts[:]
+            count, total, min_ns, max_ns = self.count, self.total_ns, self.min_ns, self.max_ns
+            if reset:
+                self._reset()
+
+        snap = {
+            "count": count,
+            "min_ms": (min_ns or 0) / 1e6,
+            "mean_ms": (total / count / 1e6) if count else 0.0,
+            "max_ms": max_ns / 1e6
+        }
+        for p in (50, 95, 99):
+            snap[f"p{p}_ms"] = min(self._percentile_ns(counts, count, p), max_ns) / 1e6
+        return snap
+
+    def reset(self):
+        """Remise à zéro"""
+        with self.lock:
+            self._reset()
+
+    def _reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+
+class _StageTimer:
+    """Context manager de mesure d'une étape"""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: LatencyHistogram):
+        self.histogram = histogram
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.record(time.perf_counter_ns() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """Ensemble d'histogrammes nommés par étape"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.lock = threading.Lock()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """Histogramme d'une étape (créé à la première utilisation)"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def record(self, name: str, value_ns: int):
+        """Enregistre une durée (ns) pour une étape"""
+        self.histogram(name).record(value_ns)
+
+    def timer(self, name: str) -> _StageTimer:
+        """Context manager mesurant la durée du bloc"""
+        return _StageTimer(self.histogram(name))
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Dict[str, float]]:
+        """Percentiles de toutes les étapes"""
+        return {
+            name: histogram.snapshot(reset)
+            for name, histogram in list(self.histograms.items())
+        }
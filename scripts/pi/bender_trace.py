@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Bender Trace - Corrélation bout en bout parole → action HA → TTS
+
+Un contexte de trace (identifiant + liste ordonnée de hops horodatés) est
+créé par le pipeline audio à l'ouverture d'un segment de parole, transmis
+avec le segment, recopié par l'hôte ASR/LLM dans les payloads
+`bender/asr/*` et `bender/intent` (champ "trace"), complété par le router
+puis joint au message `bender/tts/say`.
+
+Horodatage : `time.time_ns()`. Les horloges monotones du Pi et du T630 ne
+sont pas comparables ; l'horloge murale (NTP) l'est, et l'ordre des hops
+est garanti par leur position dans la liste.
+
+Format JSON : {"id": "3f2a...", "hops": [["speech_start", 1724..., ...]]}
+"""
+
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from bender_metrics import MetricsRegistry
+
+
+class TraceContext:
+    """Identifiant de trace et hops horodatés (epoch ns)"""
+
+    __slots__ = ("trace_id", "hops")
+
+    def __init__(self, trace_id: Optional[str] = None,
+                 hops: Optional[List[Tuple[str, int]]] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.hops = hops if hops is not None else []
+
+    @classmethod
+    def start(cls, hop: str) -> "TraceContext":
+        """Nouvelle trace avec un premier hop"""
+        trace = cls()
+        trace.mark(hop)
+        return trace
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> Optional["TraceContext"]:
+        """Reconstruit une trace depuis un payload (None si absente/invalide)"""
+        if not isinstance(data, dict) or not data.get("id"):
+            return None
+        try:
+            hops = [(str(name), int(ts)) for name, ts in data.get("hops", [])]
+        except (TypeError, ValueError):
+            hops = []
+        return cls(str(data["id"]), hops)
+
+    def mark(self, hop: str, timestamp_ns: Optional[int] = None):
+        """Ajoute un hop"""
+        self.hops.append((hop, timestamp_ns or time.time_ns()))
+
+    def to_dict(self) -> Dict:
+        """Représentation JSON"""
+        return {"id": self.trace_id, "hops": [[name, ts] for name, ts in self.hops]}
+
+    def hop_latencies_ms(self) -> List[Tuple[str, float]]:
+        """Latence entre hops consécutifs : [("a->b", ms), ...]"""
+        return [
+            (f"{prev[0]}->{cur[0]}", (cur[1] - prev[1]) / 1e6)
+            for prev, cur in zip(self.hops, self.hops[1:])
+        ]
+
+    def total_ms(self) -> float:
+        """Durée premier → dernier hop"""
+        if len(self.hops) < 2:
+            return 0.0
+        return (self.hops[-1][1] - self.hops[0][1]) / 1e6
+
+
+class TraceCollector:
+    """Agrégation des traces terminées : histogrammes par hop et budget
+
+    Pour chaque trace hors budget, le hop le plus lent est comptabilisé
+    dans `over_budget_by_hop` : c'est l'étape qui fait sauter le budget.
+    """
+
+    def __init__(self, budget_ms: float = 1500.0, keep_last: int = 20):
+        self.budget_ms = budget_ms
+        self.hops = MetricsRegistry()
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=keep_last)
+        self.traces = 0
+        self.over_budget = 0
+        self.over_budget_by_hop: Dict[str, int] = {}
+
+    def record(self, trace: TraceContext):
+        """Enregistre une trace terminée"""
+        latencies = trace.hop_latencies_ms()
+        if not latencies:
+            return
+
+        for hop, ms in latencies:
+            self.hops.record(hop, int(max(ms, 0.0) * 1e6))
+        total = trace.total_ms()
+        self.hops.record("total", int(max(total, 0.0) * 1e6))
+
+        with self.lock:
+            self.traces += 1
+            if total > self.budget_ms:
+                self.over_budget += 1
+                slowest = max(latencies, key=lambda item: item[1])[0]
+                self.over_budget_by_hop[slowest] = self.over_budget_by_hop.get(slowest, 0) + 1
+            self.recent.append({
+                "id": trace.trace_id,
+                "total_ms": round(total, 1),
+                "hops": [[hop, round(ms, 1)] for hop, ms in latencies]
+            })
+
+    def snapshot(self) -> Dict:
+        """Résumé : percentiles par hop, dépassements de budget, dernières traces"""
+        with self.lock:
+            return {
+                "budget_ms": self.budget_ms,
+                "traces": self.traces,
+                "over_budget": self.over_budget,
+                "over_budget_by_hop": dict(self.over_budget_by_hop),
+                "hops": self.hops.snapshot(),
+                "recent": list(self.recent)
+            }
@@ -4,25 +4,49 @@
 Application principale pour l'interface utilisateur de Bender
 """
 
+import asyncio
 import os
 import json
+import uuid
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 
+from config import AUDIO_CONFIG, BRIDGE_CONFIG, MQTT_CONFIG, STATIC_CONFIG, STATIC_DIR, SYSTEM_CONFIG, VOICE_CONFIG
+from log_tail import LEVELS, LogFilter, LogFollower, tail_records
+from mqtt_bridge import MQTTBridge, StatusModel, WebSocketHub
+from static_assets import StaticAssets
+from system_metrics import FIELDS, SystemMetricsCollector
+from voice_catalog import VoiceCatalog
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Fichiers statiques chargés, pont MQTT → WebSocket, collecte système et catalogue des voix actifs pendant la vie de l'application"""
+    static_assets.load()
+    bridge.start()
+    collector.start()
+    voice_catalog.start()
+    yield
+    await voice_catalog.close()
+    await collector.stop()
+    await bridge.stop()
+    await hub.close()
+
+
 # Configuration
 app = FastAPI(
     title="Bender UI",
     description="Interface utilisateur pour l'assistant vocal Bender",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS pour le développement
@@ -53,6 +77,7 @@ class VoiceConfig(BaseModel):
     model_path: str
     checksum: str
     enabled: bool
+    status: str
 
 class AudioSettings(BaseModel):
     input_device: str
@@ -61,9 +86,39 @@ class AudioSettings(BaseModel):
     channels: int
     aec_enabled: bool
     vad_enabled: bool
+    # Réglages du pipeline modifiables à chaud (absents : inchangés)
+    vad_aggressiveness: Optional[int] = None
+    chunk_size: Optional[int] = None
+    eq_enabled: Optional[bool] = None
+    limiter_enabled: Optional[bool] = None
+    limiter_threshold: Optional[float] = None
+
+# Champ AudioSettings → paramètre AudioConfig du pipeline
+# (output_device et vad_enabled ne concernent pas la capture)
+AUDIO_PIPELINE_PARAMS = {
+    "input_device": "device_name",
+    "sample_rate": "sample_rate_in",
+    "channels": "channels",
+    "aec_enabled": "aec_enabled",
+    "vad_aggressiveness": "vad_aggressiveness",
+    "chunk_size": "chunk_size",
+    "eq_enabled": "eq_enabled",
+    "limiter_enabled": "limiter_enabled",
+    "limiter_threshold": "limiter_threshold"
+}
 
 # Variables globales
-connected_clients: List[WebSocket] = []
+audio_settings = AudioSettings(
+    input_device=AUDIO_CONFIG["input_device"],
+    output_device=AUDIO_CONFIG["output_device"],
+    sample_rate=AUDIO_CONFIG["sample_rate"],
+    channels=AUDIO_CONFIG["channels"],
+    aec_enabled=AUDIO_CONFIG["aec_enabled"],
+    vad_enabled=AUDIO_CONFIG["vad_enabled"],
+    vad_aggressiveness=AUDIO_CONFIG["vad_aggressiveness"],
+    chunk_size=AUDIO_CONFIG["buffer_size"]
+)
+
 system_status = {
     "timestamp": datetime.now().isoformat(),
     "services": {
@@ -85,49 +140,115 @@ class AudioSettings(BaseModel):
     }
 }
 
+# Statut fusionné alimenté par MQTT, diffusé par deltas
+status_model = StatusModel(system_status, BRIDGE_CONFIG["service_timeout"])
+hub = WebSocketHub(status_model, BRIDGE_CONFIG["client_queue_size"], BRIDGE_CONFIG["send_timeout"])
+bridge = MQTTBridge(MQTT_CONFIG, BRIDGE_CONFIG, status_model, hub)
+
+# Métriques système échantillonnées : statut (deltas) + historique en mémoire
+collector = SystemMetricsCollector(
+    SYSTEM_CONFIG["metrics_interval"], SYSTEM_CONFIG["history"],
+    on_sample=lambda values: bridge.apply({"system": values})
+)
+
+# Voix Piper : empreintes SHA-256 vérifiées, mises en cache sur disque
+voice_catalog = VoiceCatalog(VOICE_CONFIG, VOICE_CONFIG["index_file"], VOICE_CONFIG["hash_workers"])
+
+# Frontend servi depuis la mémoire (chemin absolu, indépendant du répertoire courant)
+static_assets = StaticAssets(STATIC_DIR, STATIC_CONFIG)
+
 # Routes API
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Page d'accueil - sert le frontend React"""
-    return FileResponse("static/index.html")
+    return static_assets.response(request, "index.html")
+
+@app.get("/static/{path:path}")
+async def static_file(request: Request, path: str):
+    """Fichiers statiques (React build) précompressés"""
+    return static_assets.response(request, path)
 
 @app.get("/api/status")
 async def get_status() -> SystemStatus:
     """Récupère le statut système actuel"""
     return SystemStatus(**system_status)
 
+@app.get("/api/metrics/history")
+async def get_metrics_history(resolution: str = "raw", start: Optional[float] = None,
+                              end: Optional[float] = None, fields: Optional[str] = None,
+                              agg: str = "mean", max_points: int = 0):
+    """Historique des métriques système (timestamps epoch, valeurs par champ)"""
+    if resolution not in collector.history.series:
+        raise HTTPException(status_code=400, detail=f"Résolution inconnue: {resolution}")
+    if agg not in ("mean", "max"):
+        raise HTTPException(status_code=400, detail=f"Agrégat inconnu: {agg}")
+    selected = fields.split(",") if fields else list(FIELDS)
+    unknown = [field for field in selected if field not in FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Champs inconnus: {', '.join(unknown)}")
+
+    end = datetime.now().timestamp() if end is None else end
+    start = end - SYSTEM_CONFIG["history"][resolution] if start is None else start
+    return collector.history.query(resolution, start, end, selected,
+                                   maximum=(agg == "max"), max_points=max(0, max_points))
+
 @app.get("/api/voices")
 async def get_voices() -> List[VoiceConfig]:
-    """Liste les voix disponibles"""
-    # TODO: Implémenter la lecture des voix Piper
-    return [
-        VoiceConfig(
-            voice_id="fr-siwis-medium",
-            model_path="/opt/bender/voices/fr-siwis-medium.onnx",
-            checksum="sha256:...",
-            enabled=True
-        )
-    ]
+    """Liste les voix disponibles (empreintes vérifiées contre VOICE_CONFIG)"""
+    return [VoiceConfig(**voice) for voice in await voice_catalog.scan()]
 
 @app.get("/api/audio/settings")
 async def get_audio_settings() -> AudioSettings:
-    """Récupère les paramètres audio actuels"""
-    # TODO: Lire la configuration audio réelle
-    return AudioSettings(
-        input_device="hw:0,0",
-        output_device="hw:0,1",
-        sample_rate=48000,
-        channels=2,
-        aec_enabled=True,
-        vad_enabled=True
-    )
+    """Récupère les derniers paramètres audio envoyés"""
+    return audio_settings
+
+def _log_request(service: str, level: Optional[str]) -> Path:
+    """Fichier de log d'un service (404/400 sinon)"""
+    path = SYSTEM_CONFIG["log_files"].get(service)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Service inconnu: {service}")
+    if level and level.upper() not in LEVELS:
+        raise HTTPException(status_code=400, detail=f"Niveau inconnu: {level}")
+    return path
+
+@app.get("/api/logs/{service}")
+async def get_logs(service: str, lines: int = 100, level: Optional[str] = None,
+                   contains: Optional[str] = None):
+    """Dernières lignes d'un log (lecture depuis la fin, filtres niveau/sous-chaîne)"""
+    path = _log_request(service, level)
+    tail = SYSTEM_CONFIG["log_tail"]
+    count = max(1, min(lines, SYSTEM_CONFIG["max_log_lines"]))
+    selected, _ = await asyncio.to_thread(
+        tail_records, path, count, LogFilter(level, contains),
+        tail["block_size"], tail["max_scan_bytes"])
+    return {"service": service, "lines": selected}
 
 @app.post("/api/audio/settings")
 async def update_audio_settings(settings: AudioSettings):
-    """Met à jour les paramètres audio"""
-    # TODO: Appliquer les nouveaux paramètres
-    logger.info(f"Nouveaux paramètres audio: {settings}")
-    return {"status": "success", "message": "Paramètres audio mis à jour"}
+    """Envoie les paramètres au pipeline audio et attend son résultat (appliqués à chaud)"""
+    global audio_settings
+    requested = settings.model_dump(exclude_none=True)
+    changes = {AUDIO_PIPELINE_PARAMS[name]: value for name, value in requested.items()
+               if name in AUDIO_PIPELINE_PARAMS}
+    request_id = uuid.uuid4().hex[:12]
+    try:
+        result = await bridge.request("audio_config", {"request_id": request_id, "changes": changes},
+                                      BRIDGE_CONFIG["request_timeout"])
+    except ConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Pipeline audio sans réponse")
+
+    rejected = result.get("rejected") or {}
+    accepted = {name: value for name, value in requested.items()
+                if AUDIO_PIPELINE_PARAMS.get(name) not in rejected}
+    audio_settings = audio_settings.model_copy(update=accepted)
+    logger.info(f"Paramètres audio ({request_id}): appliqués {result.get('applied')}, "
+                f"refusés {rejected}")
+    return {"status": "partial" if rejected else "success", "request_id": request_id,
+            "applied": result.get("applied", {}), "rejected": rejected,
+            "stream_reopened": result.get("stream_reopened", False),
+            "stream_down": result.get("stream_down", False)}
 
 @app.post("/api/tts/say")
 async def say_text(text: str):
@@ -146,32 +267,58 @@ async def restart_system():
 # WebSocket pour les mises à jour temps réel
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket pour les mises à jour temps réel"""
+    """WebSocket pour les mises à jour temps réel (état complet puis deltas)"""
     await websocket.accept()
-    connected_clients.append(websocket)
-    logger.info(f"Client WebSocket connecté. Total: {len(connected_clients)}")
+    client = hub.connect(websocket)
     
     try:
         while True:
-            # Envoyer le statut actuel
-            await websocket.send_json(system_status)
-            await websocket.receive_text()  # Attendre un ping du client
+            await websocket.receive_text()  # Pings du client : maintien de la connexion
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await hub.disconnect(client)
+
+@app.websocket("/ws/logs/{service}")
+async def logs_websocket(websocket: WebSocket, service: str, lines: int = 100,
+                         level: Optional[str] = None, contains: Optional[str] = None):
+    """Suivi d'un log : dernières lignes puis ajouts ({"type": "log_lines", "lines"})"""
+    try:
+        path = _log_request(service, level)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    await websocket.accept()
+
+    tail = SYSTEM_CONFIG["log_tail"]
+    log_filter = LogFilter(level, contains)
+    count = max(0, min(lines, SYSTEM_CONFIG["max_log_lines"]))
+    selected, offset = await asyncio.to_thread(
+        tail_records, path, count, log_filter, tail["block_size"], tail["max_scan_bytes"])
+    follower = LogFollower(path, offset, log_filter, tail["read_size"], tail["poll_interval"])
+    follower.start()
+    # Déconnexion détectée par la lecture (le client n'envoie rien d'autre)
+    receiver = asyncio.ensure_future(websocket.receive_text())
+
+    try:
+        if selected:
+            await websocket.send_json({"type": "log_lines", "service": service, "lines": selected})
+        while not receiver.done():
+            batch = await asyncio.to_thread(follower.read, tail["max_batch_lines"])
+            if batch:
+                # Envoi attendu avant la lecture suivante : pas d'accumulation pour un client lent
+                await websocket.send_json({"type": "log_lines", "service": service, "lines": batch})
+            if not follower.pending():
+                waiter = asyncio.ensure_future(follower.wait())
+                await asyncio.wait([receiver, waiter], return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
     except WebSocketDisconnect:
-        connected_clients.remove(websocket)
-        logger.info(f"Client WebSocket déconnecté. Total: {len(connected_clients)}")
-
-# Fonction utilitaire pour broadcaster aux clients WebSocket
-async def broadcast_status():
-    """Diffuse le statut à tous les clients connectés"""
-    if connected_clients:
-        for client in connected_clients.copy():
-            try:
-                await client.send_json(system_status)
-            except:
-                connected_clients.remove(client)
-
-# Montage des fichiers statiques (React build)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+        pass
+    except Exception as e:
+        logger.warning(f"Suivi du log {service} interrompu: {e}")
+    finally:
+        receiver.cancel()
+        follower.close()
 
 if __name__ == "__main__":
     # Configuration pour le développement
@@ -21,6 +21,17 @@
     "workers": 1
 }
 
+# Fichiers statiques (précompressés, validés par ETag)
+STATIC_CONFIG = {
+    "cache_control": {
+        ".html": "no-cache",  # Revalidation à chaque chargement (304 si inchangé)
+        "default": "public, max-age=600, must-revalidate"
+    },
+    "min_compress_size": 256,  # octets
+    "gzip_level": 9,
+    "brotli_quality": 11
+}
+
 # Configuration TLS (production)
 TLS_CONFIG = {
     "enabled": False,  # À activer en production
@@ -38,11 +49,24 @@
     "topics": {
         "status": "bender/sys/metrics",
         "audio_status": "bender/audio/status",
+        "log": "bender/sys/log",
+        "audio_config": "bender/audio/config",  # Reconfiguration à chaud du pipeline
+        "audio_config_result": "bender/audio/config/result",
         "tts_say": "bender/tts/say",
         "led_control": "bender/led/config"
     }
 }
 
+# Pont MQTT → WebSocket (statut poussé aux navigateurs)
+BRIDGE_CONFIG = {
+    "client_id": "bender-ui",
+    "client_queue_size": 64,  # Messages en attente par navigateur
+    "send_timeout": 5,  # Client retiré au-delà (secondes)
+    "service_timeout": 90,  # Service arrêté sans métriques (secondes)
+    "request_timeout": 5,  # Attente du résultat d'une commande (secondes)
+    "watchdog_interval": 10  # secondes
+}
+
 # Configuration Home Assistant
 HA_CONFIG = {
     "base_url": os.getenv("HA_URL", "http://192.168.1.138:8123"),
@@ -67,6 +91,9 @@
     "default_voice": "fr-siwis-medium",
     "voices_dir": VOICES_DIR,
     "download_url": "https://huggingface.co/rhasspy/piper-voices/resolve/main",
+    # Index des empreintes SHA-256 (chemin, taille, mtime, inode)
+    "index_file": Path("/opt/bender/cache/voice_index.json"),
+    "hash_workers": 2,
     "supported_voices": {
         "fr-siwis-medium": {
             "model_file": "fr_FR-siwis-medium.onnx",
@@ -89,7 +116,21 @@
         "ui": LOGS_DIR / "ui.log"
     },
     "metrics_interval": 5,  # secondes
-    "max_log_lines": 1000
+    # Rétention de l'historique des métriques par résolution (secondes)
+    "history": {
+        "raw": 3600,         # 1 h à metrics_interval
+        "1m": 86400,         # 24 h à la minute
+        "15m": 7 * 86400     # 7 jours au quart d'heure
+    },
+    "max_log_lines": 1000,
+    # Lecture des logs : blocs depuis la fin, volume lu borné par requête
+    "log_tail": {
+        "block_size": 8192,
+        "max_scan_bytes": 4 * 1024 * 1024,
+        "read_size": 64 * 1024,
+        "max_batch_lines": 200,    # Lignes par message WebSocket
+        "poll_interval": 1.0       # Scrutation si inotify indisponible (secondes)
+    }
 }
 
 # Configuration sécurité
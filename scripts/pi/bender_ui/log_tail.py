@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Bender UI - Lecture et suivi des fichiers de log
+
+tail_records() lit les dernières lignes en remontant le fichier par
+blocs depuis la fin (lecture bornée par `max_scan_bytes`, jamais le
+fichier entier). LogFollower suit les ajouts à partir d'un offset,
+réveillé par inotify (ctypes, sans dépendance) ou par scrutation si
+inotify est indisponible ; rotation détectée (inode ou taille).
+
+Filtres côté serveur (niveau minimal, sous-chaîne) : une ligne
+`asctime - name - LEVEL - message` ouvre un enregistrement, les lignes
+suivantes sans niveau (traceback) en héritent le niveau.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("bender.ui.logs")
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+LEVEL_PATTERN = re.compile(r" - (DEBUG|INFO|WARNING|ERROR|CRITICAL) - ")
+
+
+class LogFilter:
+    """Niveau minimal et sous-chaîne (insensible à la casse)"""
+
+    def __init__(self, level: Optional[str] = None, contains: Optional[str] = None):
+        self.min_level = LEVELS[level.upper()] if level else 0
+        self.contains = contains.lower() if contains else None
+
+    @staticmethod
+    def level_of(line: str) -> Optional[int]:
+        match = LEVEL_PATTERN.search(line)
+        return LEVELS[match.group(1)] if match else None
+
+    def matches(self, level: Optional[int], record: List[str]) -> bool:
+        if self.min_level and (level is None or level < self.min_level):
+            return False
+        if self.contains and not any(self.contains in line.lower() for line in record):
+            return False
+        return True
+
+
+def _reverse_lines(handle, end: int, block_size: int, max_scan_bytes: int) -> Iterator[str]:
+    """Lignes complètes de [.., end[ de la dernière à la première, par blocs"""
+    position = end
+    remainder = b""
+    scanned = 0
+    while position > 0 and scanned < max_scan_bytes:
+        size = min(block_size, position)
+        position -= size
+        scanned += size
+        handle.seek(position)
+        block = handle.read(size) + remainder
+        lines = block.split(b"\n")
+        # Première ligne du bloc peut-être incomplète : gardée pour le bloc précédent
+        remainder = lines.pop(0)
+        for line in reversed(lines):
+            yield line.decode("utf-8", errors="replace")
+    if position == 0 and remainder:
+        yield remainder.decode("utf-8", errors="replace")
+
+
+def tail_records(path: Path, count: int, log_filter: LogFilter, block_size: int = 8192,
+                 max_scan_bytes: int = 4 * 1024 * 1024) -> Tuple[List[str], int]:
+    """(dernières lignes filtrées, offset de fin) ; `count` lignes environ, enregistrements entiers"""
+    try:
+        handle = open(path, "rb")
+    except FileNotFoundError:
+        return [], 0
+    with handle:
+        end = handle.seek(0, os.SEEK_END)
+        # Dernière ligne non terminée : laissée au suivi
+        if end:
+            handle.seek(end - 1)
+            if handle.read(1) != b"\n":
+                handle.seek(max(0, end - block_size))
+                chunk = handle.read(end - handle.tell())
+                newline = chunk.rfind(b"\n")
+                end = end - len(chunk) + newline + 1 if newline >= 0 else end
+
+        selected: List[str] = []
+        pending: List[str] = []  # Lignes de continuation vues avant leur en-tête
+        for line in _reverse_lines(handle, end, block_size, max_scan_bytes):
+            if not line and not pending and not selected:
+                continue
+            pending.append(line)
+            level = log_filter.level_of(line)
+            if level is None:
+                continue
+            record = pending[::-1]
+            pending = []
+            if log_filter.matches(level, record):
+                selected.extend(reversed(record))
+                if len(selected) >= count:
+                    break
+        # Lignes sans en-tête en début de fichier : acceptées sans filtre de niveau
+        if pending and len(selected) < count and log_filter.matches(None, pending):
+            selected.extend(pending)
+        return selected[::-1], end
+
+
+class _Inotify:
+    """inotify via libc (Linux), surveillance d'un répertoire"""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        mask = (self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_CREATE | self.IN_DELETE
+                | self.IN_MOVED_FROM | self.IN_MOVED_TO)
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch {directory}")
+
+    def names(self) -> List[str]:
+        """Noms de fichiers des événements en attente"""
+        names = []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset + self.EVENT.size <= len(data):
+            _, _, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            names.append(data[offset:offset + length].rstrip(b"\0").decode(errors="replace"))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LogFollower:
+    """Suivi des lignes ajoutées à un fichier de log à partir d'un offset"""
+
+    def __init__(self, path: Path, offset: int, log_filter: LogFilter,
+                 read_size: int = 64 * 1024, poll_interval: float = 1.0):
+        self.path = Path(path)
+        self.offset = offset
+        self.filter = log_filter
+        self.read_size = read_size
+        self.poll_interval = poll_interval
+        self.partial = b""
+        self.level: Optional[int] = None  # Niveau de l'enregistrement en cours
+        self.inode = self._inode()
+        self.inotify: Optional[_Inotify] = None
+        self.changed = asyncio.Event()
+
+    def _inode(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return None
+
+    def start(self):
+        """inotify sur le répertoire si possible, sinon scrutation"""
+        try:
+            self.inotify = _Inotify(self.path.parent)
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify indisponible pour {self.path} ({e}), scrutation "
+                        f"toutes les {self.poll_interval} s")
+            return
+        asyncio.get_running_loop().add_reader(self.inotify.fd, self._on_inotify)
+
+    def close(self):
+        if self.inotify is not None:
+            asyncio.get_running_loop().remove_reader(self.inotify.fd)
+            self.inotify.close()
+            self.inotify = None
+
+    def _on_inotify(self):
+        if self.path.name in self.inotify.names():
+            self.changed.set()
+
+    async def wait(self):
+        """Attente d'un changement (événement inotify ou intervalle de scrutation)"""
+        if self.inotify is None:
+            await asyncio.sleep(self.poll_interval)
+            return
+        try:
+            # Filet de sécurité : événement manqué (rotation hors du répertoire)
+            await asyncio.wait_for(self.changed.wait(), self.poll_interval * 30)
+        except asyncio.TimeoutError:
+            pass
+        self.changed.clear()
+
+    def read(self, max_lines: int) -> List[str]:
+        """Nouvelles lignes filtrées (au plus `max_lines` lues par appel)"""
+        inode = self._inode()
+        if inode is None:
+            return []
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            return []
+        if inode != self.inode or size < self.offset:
+            # Rotation ou troncature : reprise au début du nouveau fichier
+            self.inode, self.offset, self.partial = inode, 0, b""
+
+        lines: List[str] = []
+        with open(self.path, "rb") as handle:
+            handle.seek(self.offset)
+            while len(lines) < max_lines:
+                data = handle.read(self.read_size)
+                if not data:
+                    break
+                self.offset += len(data)
+                *complete, self.partial = (self.partial + data).split(b"\n")
+                for raw in complete:
+                    line = raw.decode("utf-8", errors="replace")
+                    level = self.filter.level_of(line)
+                    if level is not None:
+                        self.level = level
+                    if self.filter.matches(self.level, [line]):
+                        lines.append(line)
+        return lines
+
+    def pending(self) -> bool:
+        """Données non lues (lecture interrompue par max_lines)"""
+        try:
+            return os.stat(self.path).st_size > self.offset
+        except FileNotFoundError:
+            return False
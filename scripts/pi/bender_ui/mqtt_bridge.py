@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Bender UI - Pont MQTT → WebSocket
+
+Abonné à bender/sys/metrics, bender/audio/status, bender/sys/log et
+bender/audio/config/result.
+Les métriques et le statut audio alimentent un modèle de statut fusionné ;
+seules les valeurs modifiées (delta) sont poussées aux navigateurs. Les
+logs sont relayés tels quels.
+
+Messages WebSocket (JSON) :
+    {"type": "status", "timestamp", "services", "system", "audio"}  état complet
+    {"type": "delta", "timestamp", <sections modifiées uniquement>}
+    {"type": "log", "timestamp", "level", "message", "component"}
+    {"type": "audio_config", "request_id", "applied", "rejected", "stream_reopened", "stream_down"}
+
+Commandes avec résultat (`request()`) : publiées avec un request_id,
+le résultat portant le même identifiant sur le topic de retour résout
+l'attente (configuration audio : bender/audio/config → .../result).
+
+Chaque client a sa file d'envoi et sa tâche d'émission : un navigateur
+lent ne retarde pas les autres. File pleine : vidée et remplacée par
+l'état complet (les deltas en attente sont périmés), logs en attente
+perdus pour ce client.
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+import paho.mqtt.client as mqtt
+from fastapi import WebSocket
+
+logger = logging.getLogger("bender.ui.bridge")
+
+# Composant des métriques → service du statut
+COMPONENT_SERVICES = {
+    "audio_pipeline": "audio_pipeline",
+    "intent_router": "intent_router"
+}
+
+
+def diff(old: Dict, new: Dict) -> Dict:
+    """Valeurs de `new` absentes ou différentes dans `old` (récursif)"""
+    delta = {}
+    for key, value in new.items():
+        if isinstance(value, dict) and isinstance(old.get(key), dict):
+            nested = diff(old[key], value)
+            if nested:
+                delta[key] = nested
+        elif old.get(key) != value:
+            delta[key] = value
+    return delta
+
+
+def merge(target: Dict, delta: Dict):
+    """Application d'un delta sur un dict (récursif)"""
+    for key, value in delta.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge(target[key], value)
+        else:
+            target[key] = value
+
+
+class StatusModel:
+    """Statut fusionné des services (métriques MQTT)"""
+
+    def __init__(self, status: Dict, service_timeout: float = 90.0):
+        self.status = status
+        self.service_timeout = service_timeout
+        # service → dernier message (monotone)
+        self.last_seen: Dict[str, float] = {}
+
+    def update(self, changes: Dict) -> Dict:
+        """Applique des changements, retourne le delta effectif (vide si rien ne change)"""
+        delta = diff(self.status, changes)
+        if delta:
+            merge(self.status, delta)
+            self.status["timestamp"] = delta["timestamp"] = datetime.now().isoformat()
+        return delta
+
+    def from_metrics(self, metrics: Dict) -> Dict:
+        """Métriques d'un composant → changements de statut"""
+        service = COMPONENT_SERVICES.get(metrics.get("component"))
+        if service is None:
+            return {}
+        self.last_seen[service] = time.monotonic()
+        changes = {"services": {service: True}}
+        if "ha_connected" in metrics:
+            changes["services"]["home_assistant"] = bool(metrics["ha_connected"])
+        return changes
+
+    @staticmethod
+    def from_audio_status(message: Dict) -> Dict:
+        """Statut audio (niveaux, état) : champs connus, valeurs texte"""
+        audio = {key: str(message[key]) for key in ("input_level", "output_level", "status")
+                 if key in message}
+        return {"audio": audio} if audio else {}
+
+    def expired(self) -> Dict:
+        """Services silencieux depuis `service_timeout` : arrêtés"""
+        now = time.monotonic()
+        services = {service: False for service, seen in self.last_seen.items()
+                    if now - seen > self.service_timeout and self.status["services"].get(service)}
+        return {"services": services} if services else {}
+
+    def snapshot(self) -> Dict:
+        """État complet (message initial, resynchronisation)"""
+        return {"type": "status", **copy.deepcopy(self.status)}
+
+
+class _Client:
+    __slots__ = ("websocket", "queue", "task", "dropped")
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+
+class WebSocketHub:
+    """Diffusion aux clients WebSocket (file et tâche d'envoi par client)"""
+
+    def __init__(self, model: StatusModel, queue_size: int = 64, send_timeout: float = 5.0):
+        self.model = model
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.clients: Set[_Client] = set()
+
+    def connect(self, websocket: WebSocket) -> _Client:
+        """Enregistre un client accepté, état complet en premier message"""
+        client = _Client(websocket, self.queue_size)
+        client.queue.put_nowait(self.model.snapshot())
+        client.task = asyncio.get_running_loop().create_task(self._sender(client))
+        self.clients.add(client)
+        logger.info(f"Client WebSocket connecté. Total: {len(self.clients)}")
+        return client
+
+    async def disconnect(self, client: _Client):
+        """Retire un client et arrête sa tâche d'envoi"""
+        if client not in self.clients:
+            return
+        self.clients.discard(client)
+        client.task.cancel()
+        await asyncio.gather(client.task, return_exceptions=True)
+        logger.info(f"Client WebSocket déconnecté. Total: {len(self.clients)}")
+
+    def broadcast(self, message: Dict):
+        """Mise en file pour tous les clients (sans attente)"""
+        for client in self.clients:
+            try:
+                client.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Client lent : état complet à la place du retard accumulé
+                client.dropped += client.queue.qsize()
+                while not client.queue.empty():
+                    client.queue.get_nowait()
+                client.queue.put_nowait(self.model.snapshot())
+
+    async def _sender(self, client: _Client):
+        try:
+            while True:
+                message = await client.queue.get()
+                await asyncio.wait_for(client.websocket.send_json(message), self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Client bloqué ou fermé : déconnexion, les autres continuent
+            logger.warning(f"Envoi WebSocket impossible, client retiré: {e}")
+            self.clients.discard(client)
+            try:
+                await client.websocket.close()
+            except Exception:
+                pass
+
+    async def close(self):
+        """Arrêt de toutes les tâches d'envoi"""
+        for client in list(self.clients):
+            await self.disconnect(client)
+
+
+class MQTTBridge:
+    """Client MQTT (thread paho) → modèle de statut → WebSocketHub (boucle asyncio)"""
+
+    def __init__(self, mqtt_config: Dict, bridge_config: Dict, model: StatusModel,
+                 hub: WebSocketHub):
+        self.mqtt_config = mqtt_config
+        self.config = bridge_config
+        self.model = model
+        self.hub = hub
+        self.topics = mqtt_config["topics"]
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.watchdog: Optional[asyncio.Task] = None
+        # request_id → résultat attendu (boucle asyncio)
+        self.requests: Dict[str, asyncio.Future] = {}
+
+        self.client = mqtt.Client(client_id=bridge_config["client_id"])
+        if mqtt_config.get("username") and mqtt_config.get("password"):
+            self.client.username_pw_set(mqtt_config["username"], mqtt_config["password"])
+        self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.client.on_message = self._on_message
+
+    def start(self):
+        """Connexion en arrière-plan (reconnexion automatique paho)"""
+        self.loop = asyncio.get_running_loop()
+        self.client.connect_async(self.mqtt_config["broker_host"], self.mqtt_config["broker_port"])
+        self.client.loop_start()
+        self.watchdog = self.loop.create_task(self._watchdog())
+
+    async def stop(self):
+        """Déconnexion MQTT et arrêt du watchdog"""
+        if self.watchdog is not None:
+            self.watchdog.cancel()
+            await asyncio.gather(self.watchdog, return_exceptions=True)
+        self.client.disconnect()
+        self.client.loop_stop()
+
+    # Callbacks paho (thread réseau) : traitement rapatrié sur la boucle
+    def _on_connect(self, client, userdata, flags, rc):
+        if rc != 0:
+            logger.error(f"Échec connexion MQTT: code {rc}")
+            return
+        for key in ("status", "audio_status", "log", "audio_config_result"):
+            client.subscribe(self.topics[key])
+        self.loop.call_soon_threadsafe(self.apply, {"services": {"mqtt": True}})
+
+    def _on_disconnect(self, client, userdata, rc):
+        logger.warning(f"Déconnexion MQTT: code {rc}")
+        self.loop.call_soon_threadsafe(self.apply, {"services": {"mqtt": False}})
+
+    def _on_message(self, client, userdata, msg):
+        self.loop.call_soon_threadsafe(self._handle, msg.topic, msg.payload)
+
+    def _handle(self, topic: str, payload: bytes):
+        try:
+            message = json.loads(payload)
+        except ValueError as e:
+            logger.error(f"Message MQTT invalide sur {topic}: {e}")
+            return
+        if not isinstance(message, dict):
+            return
+
+        if topic == self.topics["log"]:
+            self.hub.broadcast({
+                "type": "log",
+                "timestamp": message.get("timestamp", datetime.now().isoformat()),
+                "level": message.get("level", "info"),
+                "message": message.get("message", ""),
+                "component": message.get("component", "")
+            })
+        elif topic == self.topics["audio_config_result"]:
+            waiter = self.requests.pop(message.get("request_id"), None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(message)
+            self.hub.broadcast({"type": "audio_config", **message})
+        elif topic == self.topics["status"]:
+            self.apply(self.model.from_metrics(message))
+        elif topic == self.topics["audio_status"]:
+            self.apply(self.model.from_audio_status(message))
+
+    def publish(self, topic_key: str, message: Dict, qos: int = 1) -> bool:
+        """Publication JSON sur un topic de la config (False si broker déconnecté)"""
+        if not self.client.is_connected():
+            return False
+        result = self.client.publish(self.topics[topic_key], json.dumps(message), qos=qos)
+        return result.rc == mqtt.MQTT_ERR_SUCCESS
+
+    async def request(self, topic_key: str, message: Dict, timeout: float) -> Dict:
+        """Publie une commande {"request_id", ...} et attend son résultat
+
+        ConnectionError si le broker est déconnecté, asyncio.TimeoutError si
+        aucun résultat n'arrive (destinataire absent ou pas abonné).
+        """
+        request_id = message["request_id"]
+        waiter = self.loop.create_future()
+        self.requests[request_id] = waiter
+        try:
+            if not self.publish(topic_key, message):
+                raise ConnectionError("Broker MQTT indisponible")
+            return await asyncio.wait_for(waiter, timeout)
+        finally:
+            self.requests.pop(request_id, None)
+
+    def apply(self, changes: Dict[str, Any]):
+        """Changements de statut → delta diffusé (boucle asyncio uniquement)"""
+        delta = self.model.update(changes) if changes else {}
+        if delta:
+            self.hub.broadcast({"type": "delta", **delta})
+
+    async def _watchdog(self):
+        while True:
+            await asyncio.sleep(self.config["watchdog_interval"])
+            self.apply(self.model.expired())
@@ -10,6 +10,9 @@ class BenderUI {
         this.maxReconnectAttempts = 10;
         this.reconnectAttempts = 0;
         
+        // Statut fusionné (état complet puis deltas du serveur)
+        this.status = { services: {}, system: {}, audio: {} };
+        
         this.init();
     }
 
@@ -75,7 +78,24 @@ class BenderUI {
         this.ws.onmessage = (event) => {
             try {
                 const data = JSON.parse(event.data);
-                this.updateStatus(data);
+                if (data.type === 'log') {
+                    const level = ['error', 'warning'].includes(data.level) ? data.level : 'info';
+                    const source = data.component ? `${data.component}: ` : '';
+                    this.addLog(`${source}${data.message}`, level);
+                } else if (data.type === 'audio_config') {
+                    const rejected = Object.keys(data.rejected || {});
+                    if (Object.keys(data.applied || {}).length) {
+                        this.addLog(`Audio reconfiguré${data.stream_reopened ? ' (flux rouvert)' : ''}`, 'success');
+                    }
+                    if (rejected.length) {
+                        this.addLog(`Paramètres audio refusés: ${rejected.join(', ')}`, 'warning');
+                    }
+                    if (data.stream_down) {
+                        this.addLog('Capture audio arrêtée : périphérique indisponible', 'error');
+                    }
+                } else {
+                    this.updateStatus(data);
+                }
             } catch (error) {
                 console.error('Erreur parsing WebSocket:', error);
             }
@@ -131,19 +151,28 @@ class BenderUI {
     updateStatus(data) {
         console.log('Mise à jour statut:', data);
         
+        // Delta : seules les valeurs modifiées, fusionnées dans le statut connu
+        ['services', 'system', 'audio'].forEach((section) => {
+            if (data[section]) {
+                this.status[section] = data.type === 'delta'
+                    ? { ...this.status[section], ...data[section] }
+                    : { ...data[section] };
+            }
+        });
+        
         // Mettre à jour les services
         if (data.services) {
-            this.updateServicesStatus(data.services);
+            this.updateServicesStatus(this.status.services);
         }
         
         // Mettre à jour les métriques système
         if (data.system) {
-            this.updateSystemMetrics(data.system);
+            this.updateSystemMetrics(this.status.system);
         }
         
         // Mettre à jour l'audio
         if (data.audio) {
-            this.updateAudioStatus(data.audio);
+            this.updateAudioStatus(this.status.audio);
         }
         
         // Ajouter au log
@@ -313,9 +342,10 @@ class BenderUI {
             
             if (response.ok) {
                 const result = await response.json();
-                this.addLog('Paramètres audio sauvegardés', 'success');
+                this.addLog(`Paramètres audio traités par le pipeline (${result.request_id})`, 'info');
             } else {
-                throw new Error(`Erreur HTTP: ${response.status}`);
+                const error = await response.json().catch(() => ({}));
+                throw new Error(error.detail || `Erreur HTTP: ${response.status}`);
             }
         } catch (error) {
             console.error('Erreur sauvegarde audio:', error);
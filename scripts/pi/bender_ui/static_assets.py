@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Bender UI - Fichiers statiques précompressés
+
+Au démarrage, chaque fichier de STATIC_DIR est chargé en mémoire avec
+ses variantes gzip et brotli (module `brotli` optionnel). Les variantes
+déjà produites sur disque (`<fichier>.gz`, `<fichier>.br`, plus récentes
+que la source) sont reprises telles quelles : brotli niveau 11 coûte
+cher sur le Pi, le rendu peut être fait à l'installation :
+
+    python3 static_assets.py [répertoire]
+
+Réponses : encodage négocié (Accept-Encoding, br > gzip > identité),
+ETag dérivé du SHA-256 du contenu (suffixe par encodage), Cache-Control
+par extension, 304 sur If-None-Match.
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger("bender.ui.static")
+
+# Suffixe de fichier précompressé → encodage HTTP
+ENCODINGS = {".br": "br", ".gz": "gzip"}
+# Préférence serveur à qualité égale
+PREFERENCE = ("br", "gzip", "identity")
+
+
+def compress(data: bytes, encoding: str, config: Dict) -> Optional[bytes]:
+    """Compression dans un encodage (None si indisponible)"""
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=config["gzip_level"], mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=config["brotli_quality"])
+    return None
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Accept-Encoding → {encodage: qualité}"""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+
+class Asset:
+    """Fichier statique et ses variantes encodées"""
+
+    __slots__ = ("media_type", "etag", "bodies", "cache_control")
+
+    def __init__(self, media_type: str, etag: str, cache_control: str):
+        self.media_type = media_type
+        self.etag = etag
+        self.cache_control = cache_control
+        # encodage → contenu ("identity" toujours présent)
+        self.bodies: Dict[str, bytes] = {}
+
+
+class StaticAssets:
+    """Fichiers statiques servis depuis la mémoire"""
+
+    def __init__(self, directory: Path, config: Dict):
+        self.directory = Path(directory)
+        self.config = config
+        self.assets: Dict[str, Asset] = {}
+
+    def load(self):
+        """Chargement et compression de tous les fichiers du répertoire"""
+        self.assets.clear()
+        saved = total = 0
+        for path in sorted(self.directory.rglob("*")):
+            if not path.is_file() or path.suffix in ENCODINGS:
+                continue
+            asset = self._load_asset(path)
+            self.assets[path.relative_to(self.directory).as_posix()] = asset
+            identity = len(asset.bodies["identity"])
+            total += identity
+            saved += identity - min(len(body) for body in asset.bodies.values())
+        logger.info(f"Fichiers statiques: {len(self.assets)} chargés depuis {self.directory} "
+                    f"({total} octets, {saved} économisés par compression)")
+
+    def _load_asset(self, path: Path) -> Asset:
+        data = path.read_bytes()
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type in ("application/javascript",
+                                                             "application/json"):
+            media_type += "; charset=utf-8"
+        cache_control = self.config["cache_control"].get(
+            path.suffix, self.config["cache_control"]["default"])
+
+        asset = Asset(media_type, hashlib.sha256(data).hexdigest()[:32], cache_control)
+        asset.bodies["identity"] = data
+        if len(data) < self.config["min_compress_size"]:
+            return asset
+
+        mtime = path.stat().st_mtime
+        for suffix, encoding in ENCODINGS.items():
+            prebuilt = path.with_name(path.name + suffix)
+            if prebuilt.exists() and prebuilt.stat().st_mtime >= mtime:
+                body = prebuilt.read_bytes()
+            else:
+                body = compress(data, encoding, self.config)
+            # Variante conservée seulement si plus petite
+            if body is not None and len(body) < len(data):
+                asset.bodies[encoding] = body
+        return asset
+
+    def response(self, request: Request, name: str) -> Response:
+        """Réponse pour un fichier (404 si inconnu, 304 si à jour)"""
+        asset = self.assets.get(name)
+        if asset is None:
+            return Response(status_code=404)
+
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = "identity"
+        for candidate in PREFERENCE[:-1]:
+            if candidate in asset.bodies and accepted.get(candidate, 0.0) > 0.0:
+                encoding = candidate
+                break
+
+        etag = f'"{asset.etag}"' if encoding == "identity" else f'"{asset.etag}-{encoding}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding"
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in
+                              [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(asset.bodies[encoding], media_type=asset.media_type, headers=headers)
+
+
+def build(directory: Path, config: Dict):
+    """Écrit les variantes .gz/.br à côté des sources (installation)"""
+    for path in sorted(Path(directory).rglob("*")):
+        if not path.is_file() or path.suffix in ENCODINGS:
+            continue
+        data = path.read_bytes()
+        if len(data) < config["min_compress_size"]:
+            continue
+        for suffix, encoding in ENCODINGS.items():
+            body = compress(data, encoding, config)
+            if body is not None and len(body) < len(data):
+                path.with_name(path.name + suffix).write_bytes(body)
+                print(f"{path.name}{suffix}: {len(data)} → {len(body)} octets")
+    if brotli is None:
+        print("Module brotli absent : variantes gzip seulement")
+
+
+if __name__ == "__main__":
+    from config import STATIC_CONFIG, STATIC_DIR
+
+    build(Path(sys.argv[1]) if len(sys.argv) > 1 else STATIC_DIR, STATIC_CONFIG)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Bender UI - Collecte des métriques système et historique en mémoire
+
+Lecture directe de /proc et /sys (aucun processus lancé par
+échantillon) : CPU (/proc/stat), mémoire (/proc/meminfo), disque
+(statvfs), température SoC (thermal_zone0), fréquence CPU et drapeaux
+de throttling firmware du Pi (get_throttled) quand ils existent.
+
+Historique : anneaux NumPy de taille fixe à trois résolutions
+    raw  : chaque échantillon (metrics_interval)
+    1m   : moyenne et max par minute
+    15m  : moyenne et max par quart d'heure
+Une requête d'intervalle ne copie que les échantillons demandés
+(recherche dichotomique sur les deux segments ordonnés de l'anneau).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("bender.ui.metrics")
+
+FIELDS = ("cpu_percent", "memory_percent", "disk_percent", "temperature",
+          "cpu_freq_mhz", "throttled")
+
+THERMAL_PATH = "/sys/class/thermal/thermal_zone0/temp"
+CPU_FREQ_PATH = "/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq"
+THROTTLED_PATH = "/sys/devices/platform/soc/soc:firmware/get_throttled"
+
+
+class _ProcFile:
+    """Fichier /proc ou /sys ouvert une fois, relu depuis le début"""
+
+    def __init__(self, path: str):
+        try:
+            self.fd: Optional[int] = os.open(path, os.O_RDONLY)
+        except OSError:
+            self.fd = None
+
+    def read(self) -> Optional[bytes]:
+        if self.fd is None:
+            return None
+        try:
+            return os.pread(self.fd, 4096, 0)
+        except OSError:
+            return None
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class SystemSampler:
+    """Échantillon courant des métriques (NaN si indisponible)"""
+
+    def __init__(self, disk_path: str = "/"):
+        self.disk_path = disk_path
+        self.stat = _ProcFile("/proc/stat")
+        self.meminfo = _ProcFile("/proc/meminfo")
+        self.thermal = _ProcFile(THERMAL_PATH)
+        self.cpu_freq = _ProcFile(CPU_FREQ_PATH)
+        self.throttled = _ProcFile(THROTTLED_PATH)
+        self.last_cpu: Optional[Tuple[int, int]] = None
+
+    def _cpu_percent(self) -> float:
+        data = self.stat.read()
+        if not data:
+            return float("nan")
+        # cpu user nice system idle iowait irq softirq steal ...
+        values = [int(value) for value in data.split(b"\n", 1)[0].split()[1:]]
+        idle = values[3] + (values[4] if len(values) > 4 else 0)
+        total = sum(values[:8])
+        previous, self.last_cpu = self.last_cpu, (idle, total)
+        if previous is None or total == previous[1]:
+            return float("nan")
+        return 100.0 * (1.0 - (idle - previous[0]) / (total - previous[1]))
+
+    def _memory_percent(self) -> float:
+        data = self.meminfo.read()
+        if not data:
+            return float("nan")
+        fields = {}
+        for line in data.split(b"\n"):
+            name, _, rest = line.partition(b":")
+            if name in (b"MemTotal", b"MemAvailable"):
+                fields[name] = int(rest.split()[0])
+                if len(fields) == 2:
+                    break
+        if len(fields) < 2:
+            return float("nan")
+        return 100.0 * (1.0 - fields[b"MemAvailable"] / fields[b"MemTotal"])
+
+    def _disk_percent(self) -> float:
+        try:
+            stat = os.statvfs(self.disk_path)
+        except OSError:
+            return float("nan")
+        total = stat.f_blocks * stat.f_frsize
+        if not total:
+            return float("nan")
+        return 100.0 * (1.0 - stat.f_bavail * stat.f_frsize / total)
+
+    @staticmethod
+    def _number(proc_file: _ProcFile, scale: float = 1.0, base: int = 10) -> float:
+        data = proc_file.read()
+        if not data:
+            return float("nan")
+        try:
+            return int(data.strip(), base) / scale
+        except ValueError:
+            return float("nan")
+
+    def sample(self) -> np.ndarray:
+        """Valeurs dans l'ordre de FIELDS"""
+        return np.array([
+            self._cpu_percent(),
+            self._memory_percent(),
+            self._disk_percent(),
+            self._number(self.thermal, 1000.0),
+            self._number(self.cpu_freq, 1000.0),
+            self._number(self.throttled, base=16)
+        ], dtype=np.float32)
+
+    def close(self):
+        for proc_file in (self.stat, self.meminfo, self.thermal, self.cpu_freq, self.throttled):
+            proc_file.close()
+
+
+class RingSeries:
+    """Série temporelle dans un anneau NumPy de taille fixe (moyenne et max)"""
+
+    def __init__(self, capacity: int, fields: int):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.means = np.zeros((capacity, fields), dtype=np.float32)
+        self.maxima = np.zeros((capacity, fields), dtype=np.float32)
+        self.head = 0    # Prochaine position d'écriture
+        self.count = 0
+
+    def append(self, timestamp: float, mean: np.ndarray, maximum: Optional[np.ndarray] = None):
+        self.timestamps[self.head] = timestamp
+        self.means[self.head] = mean
+        self.maxima[self.head] = mean if maximum is None else maximum
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _segments(self) -> List[slice]:
+        """Tranches ordonnées dans le temps (deux si l'anneau a bouclé)"""
+        if self.count < self.capacity:
+            return [slice(0, self.count)]
+        return [slice(self.head, self.capacity), slice(0, self.head)]
+
+    def range(self, start: float, end: float, maximum: bool = False,
+              step: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, valeurs) dans [start, end], un point sur `step`"""
+        values = self.maxima if maximum else self.means
+        times, rows = [], []
+        for segment in self._segments():
+            segment_times = self.timestamps[segment]
+            first = np.searchsorted(segment_times, start, side="left")
+            last = np.searchsorted(segment_times, end, side="right")
+            if last > first:
+                times.append(segment_times[first:last])
+                rows.append(values[segment][first:last])
+        if not times:
+            return np.empty(0), np.empty((0, values.shape[1]), dtype=np.float32)
+        # Seule copie : la fenêtre demandée (concaténation des vues)
+        times = np.concatenate(times) if len(times) > 1 else times[0]
+        rows = np.concatenate(rows) if len(rows) > 1 else rows[0]
+        return times[::step], rows[::step]
+
+
+class Downsampler:
+    """Agrégation par période alignée (moyenne pondérée et max) vers une série"""
+
+    def __init__(self, period: float, series: RingSeries,
+                 on_flush: Optional[Callable[[float, np.ndarray, np.ndarray, int], None]] = None):
+        self.period = period
+        self.series = series
+        self.on_flush = on_flush
+        self.bucket: Optional[float] = None
+        fields = series.means.shape[1]
+        self.sums = np.zeros(fields, dtype=np.float64)
+        self.counts = np.zeros(fields, dtype=np.int64)
+        self.maxima = np.full(fields, -np.inf, dtype=np.float64)
+        self.samples = 0
+
+    def add(self, timestamp: float, mean: np.ndarray, maximum: np.ndarray, weight: int = 1):
+        bucket = timestamp - timestamp % self.period
+        if self.bucket is not None and bucket != self.bucket:
+            self.flush()
+        self.bucket = bucket
+        valid = ~np.isnan(mean)
+        self.sums[valid] += mean[valid] * weight
+        self.counts[valid] += weight
+        self.maxima = np.fmax(self.maxima, maximum)
+        self.samples += weight
+
+    def flush(self):
+        if self.bucket is None or not self.samples:
+            return
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = (self.sums / self.counts).astype(np.float32)
+        maximum = np.where(np.isneginf(self.maxima), np.nan, self.maxima).astype(np.float32)
+        self.series.append(self.bucket, mean, maximum)
+        if self.on_flush is not None:
+            self.on_flush(self.bucket, mean, maximum, self.samples)
+        self.sums[:] = 0.0
+        self.counts[:] = 0
+        self.maxima[:] = -np.inf
+        self.samples = 0
+
+
+class MetricsHistory:
+    """Historique multi-résolution : raw → 1m → 15m"""
+
+    def __init__(self, interval: float, retention: Dict[str, float]):
+        fields = len(FIELDS)
+        # Taille fixe allouée une fois : rétention / période de la résolution
+        periods = {"raw": interval, "1m": 60.0, "15m": 900.0}
+        self.series: Dict[str, RingSeries] = {
+            resolution: RingSeries(max(1, int(retention[resolution] / period)), fields)
+            for resolution, period in periods.items()
+        }
+        self.quarter = Downsampler(900.0, self.series["15m"])
+        self.minute = Downsampler(60.0, self.series["1m"],
+                                  on_flush=lambda t, mean, maximum, n:
+                                  self.quarter.add(t, mean, maximum, n))
+
+    def add(self, timestamp: float, values: np.ndarray):
+        self.series["raw"].append(timestamp, values)
+        self.minute.add(timestamp, values, values)
+
+    def query(self, resolution: str, start: float, end: float,
+              fields: Sequence[str] = FIELDS, maximum: bool = False,
+              max_points: int = 0) -> Dict:
+        """Intervalle d'une résolution, réduit à `max_points` points si demandé"""
+        series = self.series[resolution]
+        columns = [FIELDS.index(field) for field in fields]
+        step = 1
+        if max_points:
+            times, _ = series.range(start, end)
+            step = max(1, -(-len(times) // max_points))
+        times, rows = series.range(start, end, maximum, step)
+        rows = rows[:, columns]
+        return {
+            "resolution": resolution,
+            "aggregate": "max" if maximum else "mean",
+            "timestamps": times.tolist(),
+            # NaN (capteur absent) → null en JSON
+            "values": {field: [None if np.isnan(value) else round(float(value), 2)
+                               for value in rows[:, index]]
+                       for index, field in enumerate(fields)}
+        }
+
+
+class SystemMetricsCollector:
+    """Échantillonnage périodique (tâche asyncio) → historique + callback statut"""
+
+    def __init__(self, interval: float, retention: Dict[str, float],
+                 on_sample: Optional[Callable[[Dict[str, float]], None]] = None):
+        self.interval = interval
+        self.on_sample = on_sample
+        self.sampler = SystemSampler()
+        self.history = MetricsHistory(interval, retention)
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.sampler.sample()  # Référence CPU pour le premier écart
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        self.sampler.close()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
+        while True:
+            next_run += self.interval
+            await asyncio.sleep(max(0.0, next_run - loop.time()))
+            try:
+                values = self.sampler.sample()
+                self.history.add(time.time(), values)
+                if self.on_sample is not None:
+                    self.on_sample({field: round(float(value), 1)
+                                    for field, value in zip(FIELDS, values)
+                                    if not np.isnan(value)})
+            except Exception as e:
+                logger.error(f"Erreur collecte métriques: {e}")
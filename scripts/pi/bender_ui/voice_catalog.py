@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Bender UI - Catalogue des voix Piper
+
+Parcourt VOICES_DIR (modèles *.onnx), calcule le SHA-256 de chaque
+modèle (mmap lu par tranches, pool de threads) et le vérifie contre
+VOICE_CONFIG["supported_voices"].
+
+Les empreintes sont conservées dans un petit index JSON sur disque,
+clé (chemin, taille, mtime, inode) : un modèle inchangé n'est jamais
+relu, seul un stat() est fait à chaque requête. Un même fichier n'est
+haché qu'une fois même si plusieurs requêtes arrivent pendant le calcul.
+
+Statut par voix :
+    verified  empreinte identique à celle épinglée
+    unpinned  pas d'empreinte épinglée (checksum vide)
+    mismatch  empreinte différente : voix désactivée
+    missing   modèle ou config JSON absent
+    unknown   modèle présent mais absent de supported_voices
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("bender.ui.voices")
+
+HASH_CHUNK = 8 * 1024 * 1024
+
+
+def sha256_file(path: Path, chunk_size: int = HASH_CHUNK) -> str:
+    """SHA-256 d'un fichier par tranches d'un mmap (pas de copie en mémoire)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, chunk_size):
+                    digest.update(view[offset:offset + chunk_size])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+def _file_key(stat: os.stat_result) -> Dict[str, int]:
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "inode": stat.st_ino}
+
+
+class VoiceCatalog:
+    """Voix disponibles, empreintes en cache (index disque + mémoire)"""
+
+    def __init__(self, voice_config: Dict, index_file: Path, workers: int = 2):
+        self.config = voice_config
+        self.voices_dir = Path(voice_config["voices_dir"])
+        self.index_file = Path(index_file)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bender-voice-hash")
+        # chemin → {"size", "mtime_ns", "inode", "sha256"}
+        self.index: Dict[str, Dict] = self._load_index()
+        # chemin → calcul en cours
+        self.pending: Dict[str, asyncio.Task] = {}
+        self.warmup: Optional[asyncio.Task] = None
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_file) as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Index des voix illisible ({self.index_file}), reconstruit: {e}")
+            return {}
+
+    def _save_index(self):
+        """Écriture atomique (fichier temporaire + rename)"""
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.index_file.with_suffix(".tmp")
+            with open(temporary, "w") as f:
+                json.dump(self.index, f, indent=1, sort_keys=True)
+            os.replace(temporary, self.index_file)
+        except OSError as e:
+            logger.warning(f"Sauvegarde de l'index des voix impossible: {e}")
+
+    async def digest(self, path: Path, stat: os.stat_result) -> str:
+        """Empreinte d'un modèle : index si (taille, mtime, inode) inchangés, sinon calcul"""
+        name = str(path)
+        key = _file_key(stat)
+        cached = self.index.get(name)
+        if cached is not None and all(cached.get(field) == value for field, value in key.items()):
+            return cached["sha256"]
+
+        task = self.pending.get(name)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._hash(path, key))
+            self.pending[name] = task
+            task.add_done_callback(lambda _: self.pending.pop(name, None))
+        # Requête annulée : le calcul continue pour les autres
+        return await asyncio.shield(task)
+
+    async def _hash(self, path: Path, key: Dict[str, int]) -> str:
+        logger.info(f"Calcul SHA-256 de {path.name} ({key['size'] / 1e6:.0f} Mo)")
+        checksum = await asyncio.get_running_loop().run_in_executor(self.executor, sha256_file, path)
+        self.index[str(path)] = {**key, "sha256": checksum}
+        self._save_index()
+        return checksum
+
+    async def scan(self) -> List[Dict]:
+        """Catalogue : voix configurées puis modèles inconnus du répertoire"""
+        models: Dict[str, os.stat_result] = {}
+        try:
+            for entry in os.scandir(self.voices_dir):
+                if entry.name.endswith(".onnx") and entry.is_file():
+                    models[entry.name] = entry.stat()
+        except FileNotFoundError:
+            logger.warning(f"Répertoire des voix absent: {self.voices_dir}")
+
+        # (voice_id, config ou None si inconnue, fichier modèle)
+        voices = [(voice_id, voice, voice["model_file"])
+                  for voice_id, voice in self.config["supported_voices"].items()]
+        known = {model_file for _, _, model_file in voices}
+        voices += [(Path(name).stem, None, name) for name in sorted(models) if name not in known]
+
+        # Hachages en parallèle dans le pool (modèles présents seulement)
+        present = [model_file for _, _, model_file in voices if model_file in models]
+        results = await asyncio.gather(*[self.digest(self.voices_dir / model_file, models[model_file])
+                                         for model_file in present], return_exceptions=True)
+        checksums = dict(zip(present, results))
+
+        catalog = []
+        for voice_id, voice, model_file in voices:
+            entry = {
+                "voice_id": voice_id,
+                "model_path": str(self.voices_dir / model_file),
+                "checksum": "",
+                "enabled": False,
+                "status": "missing"
+            }
+            catalog.append(entry)
+            if model_file not in checksums:
+                continue
+            checksum = checksums[model_file]
+            if isinstance(checksum, BaseException):
+                logger.error(f"Lecture du modèle {model_file} impossible: {checksum}")
+                continue
+            entry["checksum"] = f"sha256:{checksum}"
+            if voice is None:
+                entry["status"] = "unknown"
+                continue
+            if not (self.voices_dir / voice["config_file"]).is_file():
+                continue
+            pinned = voice.get("checksum", "").removeprefix("sha256:").lower()
+            if not pinned:
+                entry["status"] = "unpinned"
+            elif pinned == checksum:
+                entry["status"] = "verified"
+            else:
+                entry["status"] = "mismatch"
+                logger.error(f"Empreinte de {model_file} différente de celle épinglée "
+                             f"({checksum[:12]}… ≠ {pinned[:12]}…)")
+            entry["enabled"] = entry["status"] in ("verified", "unpinned")
+        return catalog
+
+    def start(self):
+        """Premier parcours en tâche de fond : empreintes prêtes avant la première requête"""
+        self.warmup = asyncio.get_running_loop().create_task(self.scan())
+
+    async def close(self):
+        if self.warmup is not None:
+            self.warmup.cancel()
+            await asyncio.gather(self.warmup, return_exceptions=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
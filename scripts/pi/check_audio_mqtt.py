@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Vérification de la sortie MQTT du pipeline audio (audio_pipeline.py)
+contre le faux broker local : métriques périodiques avec histogrammes de
+latence par étape, commande de reconfiguration et publication de son
+résultat. Aucun flux audio ouvert : chunks synthétiques traités en direct.
+
+Usage : python3 check_audio_mqtt.py
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+from audio_pipeline import AudioConfig, AudioPipeline, SegmentSink
+from fake_mqtt_broker import FakeMQTTBroker
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+    return ok
+
+
+def received(broker: FakeMQTTBroker, topic: str):
+    return [json.loads(payload) for received_topic, payload, _ in broker.received
+            if received_topic == topic]
+
+
+def main() -> int:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    run = lambda coro: asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    broker = FakeMQTTBroker()
+    port = run(broker.start())
+    config = AudioConfig(mqtt_broker="127.0.0.1", mqtt_port=port)
+    pipeline = AudioPipeline(config, segment_sink=SegmentSink())
+    pipeline.loop = loop  # Commandes MQTT rapatriées sur la boucle (fait par start())
+    results = []
+
+    results.append(check("connexion MQTT et abonnement aux commandes", wait_for(
+        lambda: pipeline.mqtt_client.is_connected()
+        and any(config.mqtt_topic_config in patterns
+                for patterns in list(broker.subscriptions.values())))))
+
+    # 100 chunks : une publication périodique des métriques
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        chunk = (rng.standard_normal((config.chunk_size, config.channels)) * 2**24).astype(np.int32)
+        pipeline._process_chunk(chunk, time.perf_counter_ns())
+    results.append(check("métriques publiées", wait_for(
+        lambda: received(broker, config.mqtt_topic_metrics))))
+    metrics = received(broker, config.mqtt_topic_metrics)
+    latency = metrics[0].get("latency", {}) if metrics else {}
+    results.append(check(f"histogrammes de latence ({', '.join(sorted(latency))})",
+                         latency.get("chunk", {}).get("count") == 100
+                         and "p95_ms" in latency["chunk"]))
+
+    # Commande de reconfiguration → résultat publié
+    pipeline.mqtt_client.publish(config.mqtt_topic_config, json.dumps(
+        {"request_id": "check", "changes": {"vad_aggressiveness": 3}}), qos=1)
+    results.append(check("résultat de reconfiguration publié", wait_for(
+        lambda: any(result.get("request_id") == "check"
+                    and result.get("applied") == {"vad_aggressiveness": 3}
+                    for result in received(broker, config.mqtt_topic_config_result)))))
+
+    run(pipeline.stop())
+    run(broker.stop())
+    print(f"{sum(results)}/{len(results)} vérifications OK")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
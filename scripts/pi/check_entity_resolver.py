@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Vérification de la résolution des noms parlés (entity_resolver.py) sur un
+registre HA réduit : pièces, alias, noms d'entités, erreurs d'ASR, et
+phrases qui ne doivent désigner aucune entité (mot inconnu en plus).
+
+Usage : python3 check_entity_resolver.py
+"""
+
+import sys
+
+from entity_resolver import EntityResolver
+
+AREAS = [
+    {"area_id": "salon", "name": "Salon", "aliases": ["Séjour"]},
+    {"area_id": "cuisine", "name": "Cuisine", "aliases": []},
+    {"area_id": "chambre", "name": "Chambre", "aliases": []},
+    {"area_id": "salle_de_bain", "name": "Salle de bain", "aliases": []},
+]
+ENTITIES = [
+    {"entity_id": "light.salon", "area_id": "salon"},
+    {"entity_id": "light.cuisine", "area_id": "cuisine"},
+    {"entity_id": "light.chambre", "area_id": "chambre", "name": "Plafonnier"},
+    {"entity_id": "light.salle_de_bain", "area_id": "salle_de_bain"},
+    {"entity_id": "sensor.temperature_salon", "area_id": "salon"},
+]
+
+# (nom parlé, domaine, hint, entity_id attendu ou None)
+CASES = [
+    ("salon", "light", None, "light.salon"),
+    ("la chambre", "light", None, "light.chambre"),
+    ("séjour", "light", None, "light.salon"),
+    ("salle de bain", "light", None, "light.salle_de_bain"),
+    ("plafonnier", "light", None, "light.chambre"),
+    ("plafonnier de la chambre", "light", None, "light.chambre"),
+    ("cuisinne", "light", None, "light.cuisine"),
+    ("salon", "sensor", "temperature", "sensor.temperature_salon"),
+    # Mot inconnu en plus : aucune entité
+    ("ventilateur de la chambre", "light", None, None),
+    ("chambre d'amis", "light", None, None),
+    ("garage", "light", None, None),
+]
+
+
+def main() -> int:
+    resolver = EntityResolver()
+    resolver.load_areas(AREAS)
+    resolver.load_entities(ENTITIES)
+    resolver.load_states([{"entity_id": entity["entity_id"], "attributes": {}}
+                          for entity in ENTITIES])
+
+    results = []
+    for text, domain, hint, expected in CASES:
+        found = resolver.resolve(text, domain, hint)
+        ok = found == expected
+        results.append(ok)
+        print(f"{'OK  ' if ok else 'FAIL'} {text!r} ({domain}) → {found}")
+    print(f"{sum(results)}/{len(results)} vérifications OK")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
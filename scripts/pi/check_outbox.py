@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Vérification de la file de publication MQTT (mqtt_outbox.py) contre le
+faux broker local : coupure, publications en file, expiration TTL,
+rejeu ordonné à la reconnexion, sauvegarde/reprise disque.
+
+Usage : python3 check_outbox.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+
+from fake_mqtt_broker import FakeMQTTBroker
+from mqtt_outbox import MQTTOutbox, OutboxConfig
+
+
+def wait_for(condition, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+    return ok
+
+
+def main() -> int:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    run = lambda coro: asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    broker = FakeMQTTBroker()
+    port = run(broker.start())
+    spill_path = os.path.join(tempfile.mkdtemp(), "outbox.jsonl")
+    config = OutboxConfig(max_messages=4, spill_path=spill_path,
+                          topic_ttl_s={"bender/tts/say": 0.5, "bender/sys/metrics": 0.0,
+                                       "bender/sys/log": 300.0})
+
+    client = mqtt.Client(client_id="check-outbox")
+    client.reconnect_delay_set(min_delay=1, max_delay=1)
+    outbox = MQTTOutbox(client, config)
+    client.on_connect = lambda c, u, f, rc: outbox.on_connect()
+    client.on_disconnect = lambda c, u, rc: outbox.on_disconnect()
+    client.connect("127.0.0.1", port)
+    client.loop_start()
+    results = []
+
+    # Connecté : envoi direct
+    wait_for(lambda: outbox.connected)
+    outbox.publish("bender/sys/log", b"direct")
+    results.append(check("publication directe",
+                         wait_for(lambda: broker.topics() == ["bender/sys/log"])))
+
+    # Coupure broker : TTS (TTL 0.5 s) et logs mis en file, débordement disque
+    run(broker.stop())
+    wait_for(lambda: not outbox.connected)
+    outbox.publish("bender/tts/say", b"tts-perime")
+    outbox.publish("bender/sys/metrics", b"metriques")
+    for i in range(6):
+        outbox.publish("bender/sys/log", f"log-{i}".encode())
+    snapshot = outbox.snapshot()
+    results.append(check(f"mise en file pendant la coupure (profondeur {snapshot['depth']}, "
+                         f"disque {snapshot['spill_depth']}, métriques non conservées)",
+                         snapshot["depth"] == 7 and snapshot["spill_depth"] == 3))
+    time.sleep(0.6)
+
+    # Reconnexion : rejeu dans l'ordre, TTS expiré abandonné
+    broker.received.clear()
+    run(broker.start(port=port))
+    expected = [f"log-{i}".encode() for i in range(6)]
+    results.append(check("rejeu ordonné après reconnexion", wait_for(
+        lambda: [payload for _, payload, _ in broker.received] == expected)))
+    snapshot = outbox.snapshot()
+    results.append(check(f"TTS périmé et métriques abandonnés (expirés {snapshot['dropped_expired']})",
+                         snapshot["dropped_expired"] == 2 and snapshot["depth"] == 0))
+    results.append(check("QoS 1 par topic TTS",
+                         config.topic_qos.get("bender/tts/say") == 1))
+
+    # Coupure pas encore signalée : un message QoS 1 n'est envoyé qu'une fois,
+    # un TTS QoS 1 expiré pendant la coupure n'est pas renvoyé par paho
+    run(broker.stop())
+    wait_for(lambda: not outbox.connected)
+    outbox.connected = True
+    outbox.publish("bender/nlu/request", b"qos1-unique", ttl_s=60.0)
+    outbox.publish("bender/tts/say", b"tts-qos1-perime")
+    outbox.connected = False
+    time.sleep(0.6)
+    broker.received.clear()
+    run(broker.start(port=port))
+    wait_for(lambda: any(payload == b"qos1-unique" for _, payload, _ in broker.received))
+    time.sleep(0.5)
+    payloads = [payload for _, payload, _ in broker.received]
+    results.append(check(f"QoS 1 publié une seule fois après coupure "
+                         f"({payloads.count(b'qos1-unique')} reçu)",
+                         payloads.count(b"qos1-unique") == 1))
+    results.append(check("TTS QoS 1 périmé jamais renvoyé",
+                         b"tts-qos1-perime" not in payloads))
+
+    # Arrêt avec messages en file : sauvegarde disque puis reprise
+    client.loop_stop()
+    client.disconnect()
+    outbox.on_disconnect()
+    outbox.publish("bender/sys/log", b"avant-arret")
+    outbox.stop()
+    restored = MQTTOutbox(mqtt.Client(client_id="check-outbox-2"), config)
+    results.append(check("file sauvegardée et rechargée au redémarrage", restored.depth() == 1))
+
+    run(broker.stop())
+    print(f"{sum(results)}/{len(results)} vérifications OK")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Vérification du runtime asyncio du router (intent_router_async.py)
+contre le faux broker MQTT et le faux Home Assistant, tous sur une même
+boucle : démarrage, intents ASR → service HA → TTS, ordre par entité,
+cadence des métriques, reconnexion broker, arrêt propre sans thread.
+
+Usage : python3 check_router_async.py
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+
+from bender_codec import decode
+from fake_ha import FakeHomeAssistant
+from fake_mqtt_broker import FakeMQTTBroker
+from intent_router import HAConfig, MQTTConfig, TTSCacheConfig
+from intent_router_async import AsyncIntentRouter, AsyncMQTTClient
+
+# Threads du mode classique : aucun ne doit exister
+CLASSIC_THREADS = ("paho-mqtt-client", "bender-intent", "bender-ha-mirror",
+                   "bender-ha-coalescer", "bender-tts-warm")
+
+
+async def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+    return ok
+
+
+def received(broker: FakeMQTTBroker, topic: str):
+    return [decode(payload) for received_topic, payload, _ in broker.received
+            if received_topic == topic]
+
+
+async def main() -> int:
+    ha = FakeHomeAssistant(delay_ms=20.0)
+    ha_port = await ha.start()
+    broker = FakeMQTTBroker()
+    broker_port = await broker.start()
+
+    router = AsyncIntentRouter(
+        HAConfig(base_url=f"http://127.0.0.1:{ha_port}", token="check"),
+        MQTTConfig(broker="127.0.0.1", port=broker_port, username="", client_id="check-router"),
+        tts_cache_config=TTSCacheConfig(enabled=False),
+        test_mode=False,
+        metrics_interval=0.2
+    )
+    router_task = asyncio.get_running_loop().create_task(router.run())
+    results = []
+
+    # Client de test, piloté par la même boucle
+    asr = AsyncMQTTClient(mqtt.Client(client_id="check-asr"))
+    asr.start("127.0.0.1", broker_port)
+
+    def say(text: str):
+        asr.client.publish("bender/asr/final", json.dumps({"text": text, "confidence": 0.93}))
+
+    results.append(check("démarrage (HA, miroir, MQTT)", await wait_for(
+        lambda: router.running and router.state_mirror.is_alive() and len(router.entity_resolver))))
+    await wait_for(asr.client.is_connected)
+
+    threads = [thread.name for thread in threading.enumerate()]
+    results.append(check(f"aucun thread du mode classique ({len(threads)} threads)", not any(
+        name.startswith(CLASSIC_THREADS) for name in threads)))
+
+    # ASR final → NLU locale → light.turn_on → TTS
+    say("allume la lumière du salon")
+    results.append(check("intent exécuté et réponse TTS publiée", await wait_for(
+        lambda: received(broker, "bender/tts/say"))))
+    results.append(check("service HA appelé", ("light", "turn_on", {"entity_id": "light.salon"})
+                         in ha.service_calls))
+
+    # Ordre conservé pour une même entité, autre pièce en parallèle
+    ha.service_calls.clear()
+    say("éteins la lumière du salon")
+    say("allume la lumière de la cuisine")
+    say("allume la lumière du salon")
+    await wait_for(lambda: len(ha.service_calls) == 3)
+    salon = [service for _, service, data in ha.service_calls
+             if data.get("entity_id") == "light.salon"]
+    results.append(check(f"ordre par entité ({' → '.join(salon)})",
+                         salon == ["turn_off", "turn_on"]))
+
+    # Cadence des métriques
+    await wait_for(lambda: len(received(broker, "bender/sys/metrics")) >= 6, timeout=3.0)
+    metrics = received(broker, "bender/sys/metrics")
+    intervals = [(b["ts_ns"] - a["ts_ns"]) / 1e6 for a, b in zip(metrics, metrics[1:])]
+    jitter = statistics.pstdev(intervals) if intervals else float("inf")
+    results.append(check(f"métriques toutes les 200 ms ({len(metrics)} publiées, "
+                         f"écart-type {jitter:.2f} ms)", len(metrics) >= 6 and jitter < 20.0))
+    results.append(check("stats cohérentes", metrics[-1]["intents_processed"] == 4
+                         and metrics[-1]["fast_path_hits"] == 4))
+
+    # Coupure broker : reconnexion (backoff) et rejeu de la file
+    await broker.stop()
+    await wait_for(lambda: not router.connected)
+    router.publish_log("pendant la coupure")
+    broker.received.clear()
+    await broker.start(port=broker_port)
+    results.append(check("reconnexion et rejeu après coupure", await wait_for(
+        lambda: any(message["message"] == "pendant la coupure"
+                    for message in received(broker, "bender/sys/log")), timeout=10.0)))
+
+    # Arrêt propre
+    await asr.stop()
+    router.request_stop()
+    ok = await asyncio.wait_for(router_task, 10.0)
+    results.append(check("arrêt propre (tâches terminées, MQTT déconnecté)",
+                         ok and not router.tasks and not router.dispatcher.tasks
+                         and not router.mqtt_client.is_connected()
+                         and router.mqtt.supervisor is None))
+
+    await broker.stop()
+    await ha.stop()
+    print(f"{sum(results)}/{len(results)} vérifications OK")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
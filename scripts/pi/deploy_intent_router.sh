@@ -10,6 +10,7 @@ set -euo pipefail
 # Configuration
 BENDER_DIR="/opt/bender"
 LOGS_DIR="$BENDER_DIR/logs"
+TTS_CACHE_DIR="$BENDER_DIR/cache/tts"
 SERVICE_NAME="bender-intent.service"
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
@@ -45,7 +46,7 @@ check_root() {
 }
 
 check_files() {
-    local files=("intent_router.py" "bender-intent.service")
+    local files=("intent_router.py" "intent_router_async.py" "bender_codec.py" "bender_metrics.py" "bender_trace.py" "ha_async.py" "ha_state_mirror.py" "entity_resolver.py" "fast_nlu.py" "tts_cache.py" "mqtt_outbox.py" "bender-intent.service")
     
     for file in "${files[@]}"; do
         if [[ ! -f "$SCRIPT_DIR/$file" ]]; then
@@ -67,6 +68,8 @@ install_dependencies() {
     apt-get install -y \
         python3-paho-mqtt \
         python3-requests \
+        python3-aiohttp \
+        python3-msgpack \
         python3-full
     
     log_success "Dépendances installées"
@@ -78,6 +81,7 @@ setup_directories() {
     # Création des répertoires si nécessaire
     mkdir -p "$BENDER_DIR"
     mkdir -p "$LOGS_DIR"
+    mkdir -p "$TTS_CACHE_DIR"
     
     # Permissions
     chown -R bender:bender "$BENDER_DIR"
@@ -101,6 +105,12 @@ install_intent_router() {
     chown bender:bender "$BENDER_DIR/intent_router.py"
     chmod 755 "$BENDER_DIR/intent_router.py"
     
+    # Modules partagés importés par le router
+    for module in bender_codec.py bender_metrics.py bender_trace.py ha_async.py ha_state_mirror.py entity_resolver.py fast_nlu.py tts_cache.py mqtt_outbox.py intent_router_async.py; do
+        cp "$SCRIPT_DIR/$module" "$BENDER_DIR/"
+        chown bender:bender "$BENDER_DIR/$module"
+    done
+    
     # Installation du service systemd
     cp "$SCRIPT_DIR/bender-intent.service" "/etc/systemd/system/"
     
@@ -188,6 +198,16 @@ Exemples:
 
 Fichiers requis dans le même répertoire:
     - intent_router.py
+    - intent_router_async.py (runtime asyncio, optionnel)
+    - bender_codec.py
+    - bender_metrics.py
+    - bender_trace.py
+    - ha_async.py
+    - ha_state_mirror.py
+    - entity_resolver.py
+    - fast_nlu.py
+    - tts_cache.py
+    - mqtt_outbox.py
     - bender-intent.service
 
 EOF
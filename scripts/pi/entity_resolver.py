@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Résolution des noms parlés (pièce, appareil) vers les entity_id Home Assistant
+
+Index construit une fois depuis les registres HA (pièces, appareils,
+entités : noms, alias, friendly_name) puis tenu à jour entité par entité
+à partir des événements `*_registry_updated` et `state_changed`
+(alimentation par HAStateMirror).
+
+Normalisation : minuscules, accents retirés, articles et prépositions
+ignorés ("la salle de bain" → "salle bain"). Trois niveaux de recherche :
+1. phrase exacte normalisée (dict)
+2. recouvrement de tokens (Jaccard) via l'index inversé des tokens ;
+   chaque mot de la requête doit figurer dans le nom retenu
+   ("ventilateur chambre" ne désigne pas la lumière "chambre")
+3. trigrammes de caractères pour les erreurs d'ASR ("cuisinne"), chaque
+   mot de la requête devant ressembler à un mot du nom ("chambre d'amis"
+   ne désigne pas la "chambre")
+"""
+
+import re
+import threading
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+STOPWORDS = frozenset({
+    "le", "la", "les", "l", "du", "de", "des", "d", "au", "aux", "a",
+    "dans", "en", "un", "une", "mon", "ma", "mes", "sur", "pour"
+})
+
+# Score minimum d'une correspondance tokens / trigrammes
+MIN_TOKEN_SCORE = 0.5
+MIN_TRIGRAM_SCORE = 0.5
+# Pénalité des noms hérités de la pièce (le nom propre de l'entité prime)
+AREA_NAME_WEIGHT = 0.95
+
+_SPLIT = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> List[str]:
+    """Tokens normalisés : minuscules, sans accents ni mots vides"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return [token for token in _SPLIT.split(text) if token and token not in STOPWORDS]
+
+
+def trigrams(phrase: str) -> Set[str]:
+    """Trigrammes de caractères d'une phrase normalisée"""
+    padded = f" {phrase} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b)
+
+
+def _covered(required: List[Set[str]], words: List[Set[str]]) -> bool:
+    """Chaque mot requis proche d'un mot de la phrase (trigrammes par mot)"""
+    return all(any(_similarity(token, word) >= MIN_TRIGRAM_SCORE for word in words)
+               for token in required)
+
+
+class _Entry:
+    """Entité indexée : sources de noms et clés d'index dérivées"""
+
+    __slots__ = ("entity_id", "domain", "registry", "friendly_name",
+                 "names", "phrases", "phrase_grams", "tokens", "grams")
+
+    def __init__(self, entity_id: str):
+        self.entity_id = entity_id
+        self.domain = entity_id.split(".", 1)[0]
+        self.registry: Dict = {}
+        self.friendly_name: Optional[str] = None
+        # (tokens du nom, poids)
+        self.names: List[Tuple[FrozenSet[str], float]] = []
+        self.phrases: Set[str] = set()
+        # (trigrammes de la phrase, trigrammes de chacun de ses mots)
+        self.phrase_grams: List[Tuple[Set[str], List[Set[str]]]] = []
+        self.tokens: Set[str] = set()
+        self.grams: Set[str] = set()
+
+
+class EntityResolver:
+    """Index nom parlé → entity_id, mis à jour de façon incrémentale"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: Dict[str, _Entry] = {}
+        # area_id → {"name", "aliases"} ; device_id → area_id
+        self.areas: Dict[str, Dict] = {}
+        self.devices: Dict[str, Optional[str]] = {}
+
+        # Index inversés
+        self.phrase_index: Dict[str, Set[str]] = {}
+        self.token_index: Dict[str, Set[str]] = {}
+        self.trigram_index: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # Alimentation (thread du miroir HA)
+    def load_states(self, states: Iterable[Dict]):
+        """friendly_name de toutes les entités (résultat de get_states)"""
+        for state in states or []:
+            self.update_state(state)
+
+    def update_state(self, state: Dict):
+        """friendly_name d'une entité (ré-indexée seulement s'il change)"""
+        entity_id = state.get("entity_id")
+        if not entity_id:
+            return
+        friendly_name = (state.get("attributes") or {}).get("friendly_name")
+        with self.lock:
+            entry = self.entries.get(entity_id)
+            if entry is not None and entry.friendly_name == friendly_name:
+                return
+            if entry is None:
+                entry = self.entries[entity_id] = _Entry(entity_id)
+            entry.friendly_name = friendly_name
+            self._reindex(entry)
+
+    def load_areas(self, areas: Iterable[Dict]):
+        """Registre des pièces complet (seules les pièces modifiées sont ré-indexées)"""
+        areas = {area["area_id"]: {"name": area.get("name") or "",
+                                   "aliases": list(area.get("aliases") or [])}
+                 for area in areas or [] if area.get("area_id")}
+        with self.lock:
+            changed = {area_id for area_id in set(areas) | set(self.areas)
+                       if areas.get(area_id) != self.areas.get(area_id)}
+            self.areas = areas
+            self._reindex_where(lambda area_id, entry: area_id in changed)
+
+    def load_devices(self, devices: Iterable[Dict]):
+        """Registre des appareils complet (seule la pièce est utilisée)"""
+        devices = {device["id"]: device.get("area_id")
+                   for device in devices or [] if device.get("id")}
+        with self.lock:
+            changed = {device_id for device_id in set(devices) | set(self.devices)
+                       if devices.get(device_id) != self.devices.get(device_id)}
+            self.devices = devices
+            self._reindex_where(
+                lambda area_id, entry: entry.registry.get("device_id") in changed
+            )
+
+    def load_entities(self, entities: Iterable[Dict]):
+        """Registre des entités complet"""
+        for registry in entities or []:
+            self.upsert_entity(registry)
+
+    def upsert_entity(self, registry: Optional[Dict]):
+        """Création / mise à jour d'une entrée du registre des entités"""
+        if not registry or not registry.get("entity_id"):
+            return
+        entity_id = registry["entity_id"]
+        with self.lock:
+            entry = self.entries.get(entity_id)
+            if entry is None:
+                entry = self.entries[entity_id] = _Entry(entity_id)
+            entry.registry = registry
+            self._reindex(entry)
+
+    def remove_entity(self, entity_id: str):
+        """Suppression d'une entité"""
+        with self.lock:
+            entry = self.entries.pop(entity_id, None)
+            if entry is not None:
+                self._unindex(entry)
+
+    # Indexation (appelant détient self.lock)
+    def _area_of(self, entry: _Entry) -> Optional[str]:
+        area_id = entry.registry.get("area_id")
+        if area_id is None and entry.registry.get("device_id"):
+            area_id = self.devices.get(entry.registry["device_id"])
+        return area_id
+
+    def _reindex_where(self, predicate):
+        for entry in self.entries.values():
+            if predicate(self._area_of(entry), entry):
+                self._reindex(entry)
+
+    def _unindex(self, entry: _Entry):
+        for index, keys in ((self.phrase_index, entry.phrases),
+                            (self.token_index, entry.tokens),
+                            (self.trigram_index, entry.grams)):
+            for key in keys:
+                postings = index.get(key)
+                if postings is not None:
+                    postings.discard(entry.entity_id)
+                    if not postings:
+                        del index[key]
+
+    def _reindex(self, entry: _Entry):
+        self._unindex(entry)
+
+        registry = entry.registry
+        own = [registry.get("name"), entry.friendly_name, registry.get("original_name"),
+               entry.entity_id.split(".", 1)[1].replace("_", " ")]
+        own += list(registry.get("aliases") or [])
+        own_names = {" ".join(normalize(name)) for name in own if name}
+        own_names.discard("")
+
+        area = self.areas.get(self._area_of(entry))
+        area_names = set()
+        if area is not None:
+            for name in [area["name"]] + area["aliases"]:
+                phrase = " ".join(normalize(name))
+                if phrase:
+                    area_names.add(phrase)
+                    # "plafonnier salon" pour une entité "Plafonnier" du salon
+                    area_names.update(f"{own_name} {phrase}" for own_name in own_names)
+
+        entry.names = [(frozenset(phrase.split()), 1.0) for phrase in own_names]
+        entry.names += [(frozenset(phrase.split()), AREA_NAME_WEIGHT)
+                        for phrase in area_names - own_names]
+        entry.phrases = own_names | area_names
+        entry.tokens = set().union(*(tokens for tokens, _ in entry.names))
+        entry.phrase_grams = [(trigrams(phrase), [trigrams(word) for word in phrase.split()])
+                              for phrase in entry.phrases]
+        entry.grams = set().union(*(grams for grams, _ in entry.phrase_grams))
+
+        for index, keys in ((self.phrase_index, entry.phrases),
+                            (self.token_index, entry.tokens),
+                            (self.trigram_index, entry.grams)):
+            for key in keys:
+                index.setdefault(key, set()).add(entry.entity_id)
+
+    # Résolution (threads du router)
+    def resolve(self, text: str, domain: Optional[str] = None,
+                hint: Optional[str] = None) -> Optional[str]:
+        """entity_id correspondant à un nom parlé, None si aucun
+
+        `domain` restreint la recherche ("light"), `hint` ajoute des mots
+        au nom ("temperature" pour un capteur de la pièce demandée).
+        """
+        tokens = normalize(text)
+        # Mots prononcés : tous requis ; mots de `hint` : facultatifs
+        required = frozenset(tokens)
+        if hint:
+            tokens += [token for token in normalize(hint) if token not in tokens]
+        if not tokens:
+            return None
+        query = frozenset(tokens)
+
+        with self.lock:
+            # 1. Phrase exacte
+            candidates = self._in_domain(self.phrase_index.get(" ".join(tokens)), domain)
+            if len(candidates) == 1:
+                return next(iter(candidates))
+
+            # 2. Recouvrement de tokens
+            if not candidates:
+                candidates = set()
+                for token in query:
+                    candidates |= self._in_domain(self.token_index.get(token), domain)
+            best, score = self._best(candidates, lambda entry: max(
+                (len(query & name) / len(query | name) * weight for name, weight in entry.names
+                 if required <= name),
+                default=0.0
+            ))
+            if best is not None and score >= MIN_TOKEN_SCORE:
+                return best
+
+            # 3. Trigrammes (nom mal transcrit)
+            grams = trigrams(" ".join(tokens))
+            required_grams = [trigrams(token) for token in required]
+            # Similarité ≥ seuil impossible sous seuil × |grams| trigrammes communs
+            shared: Dict[str, int] = {}
+            for gram in grams:
+                for entity_id in self._in_domain(self.trigram_index.get(gram), domain):
+                    shared[entity_id] = shared.get(entity_id, 0) + 1
+            minimum = MIN_TRIGRAM_SCORE * len(grams)
+            candidates = {entity_id for entity_id, count in shared.items() if count >= minimum}
+            best, score = self._best(
+                candidates, lambda entry: self._trigram_score(entry, grams, required_grams))
+            if best is not None and score >= MIN_TRIGRAM_SCORE:
+                return best
+        return None
+
+    @staticmethod
+    def _trigram_score(entry: _Entry, grams: Set[str], required_grams: List[Set[str]]) -> float:
+        """Meilleure similarité d'une phrase de l'entité couvrant tous les mots requis"""
+        best = 0.0
+        for phrase_grams, words in entry.phrase_grams:
+            score = _similarity(grams, phrase_grams)
+            if score > best and score >= MIN_TRIGRAM_SCORE and _covered(required_grams, words):
+                best = score
+        return best
+
+    def _in_domain(self, postings: Optional[Set[str]], domain: Optional[str]) -> Set[str]:
+        if not postings:
+            return set()
+        if domain is None:
+            return set(postings)
+        return {entity_id for entity_id in postings if self.entries[entity_id].domain == domain}
+
+    def _best(self, candidates: Set[str], score_fn) -> Tuple[Optional[str], float]:
+        best, best_score = None, 0.0
+        # Tri : résultat déterministe à score égal
+        for entity_id in sorted(candidates):
+            score = score_fn(self.entries[entity_id])
+            if score > best_score:
+                best, best_score = entity_id, score
+        return best, best_score
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Faux serveur Home Assistant pour tests et benchmarks locaux
+API REST minimale : /api/, /api/states[/<entity_id>], /api/services/<domain>/<service>
+API WebSocket minimale : /api/websocket (auth, get_states,
+subscribe_events, ping, config/{area,device,entity}_registry/list,
+config/entity_registry/get)
+
+Usage : python3 fake_ha.py [--port 8123] [--delay-ms 20]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from aiohttp import WSMsgType, web
+
+DEFAULT_AREAS = {
+    "salon": {"name": "Salon", "aliases": ["séjour"]},
+    "cuisine": {"name": "Cuisine", "aliases": []},
+    "chambre": {"name": "Chambre", "aliases": ["chambre parentale"]},
+    "salle_de_bain": {"name": "Salle de bain", "aliases": ["SDB"]},
+}
+
+DEFAULT_ENTITIES = {
+    "light.salon": {"state": "off", "attributes": {"friendly_name": "Salon"},
+                    "area_id": "salon"},
+    "light.cuisine": {"state": "off", "attributes": {"friendly_name": "Cuisine"},
+                      "area_id": "cuisine"},
+    "light.chambre": {"state": "off", "attributes": {"friendly_name": "Chambre"},
+                      "area_id": "chambre"},
+    "light.salle_de_bain": {"state": "off", "attributes": {"friendly_name": "Salle de bain"},
+                            "area_id": "salle_de_bain"},
+    "sensor.temperature_salon": {
+        "state": "21.5",
+        "attributes": {"unit_of_measurement": "°C", "friendly_name": "Température salon"},
+        "area_id": "salon"
+    },
+    "media_player.salon": {"state": "idle", "attributes": {"volume_level": 0.5},
+                           "area_id": "salon"},
+}
+
+
+class FakeHomeAssistant:
+    """Serveur HA simulé avec latence configurable"""
+
+    def __init__(self, delay_ms: float = 0.0, entities: Optional[Dict] = None):
+        self.delay = delay_ms / 1000.0
+        self.logger = logging.getLogger("bender.fake_ha")
+        self.service_calls = []
+        self.runner: Optional[web.AppRunner] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        # ws → {event_type: id d'abonnement}
+        self.subscribers: Dict[web.WebSocketResponse, Dict[str, int]] = {}
+        self.states: Dict[str, Dict] = {}
+        self.areas: Dict[str, Dict] = {area_id: dict(area, area_id=area_id)
+                                       for area_id, area in DEFAULT_AREAS.items()}
+        self.entity_registry: Dict[str, Dict] = {}
+        for entity_id, state in (entities or DEFAULT_ENTITIES).items():
+            self.set_state(entity_id, state["state"], state.get("attributes", {}))
+            self.entity_registry[entity_id] = {
+                "entity_id": entity_id, "area_id": state.get("area_id"),
+                "device_id": None, "name": None, "original_name": None, "aliases": []
+            }
+
+        self.app = web.Application()
+        self.app.router.add_get("/api/", self.handle_api)
+        self.app.router.add_get("/api/states", self.handle_states)
+        self.app.router.add_get("/api/states/{entity_id}", self.handle_state)
+        self.app.router.add_post("/api/services/{domain}/{service}", self.handle_service)
+        self.app.router.add_get("/api/websocket", self.handle_websocket)
+
+    def set_state(self, entity_id: str, state: str, attributes: Optional[Dict] = None):
+        """Modifie l'état d'une entité"""
+        now = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
+        old_state = self.states.get(entity_id)
+        new_state = {
+            "entity_id": entity_id,
+            "state": state,
+            "attributes": dict(attributes or {}),
+            "last_changed": now,
+            "last_updated": now
+        }
+        self.states[entity_id] = new_state
+        
+        self._emit("state_changed",
+                   {"entity_id": entity_id, "old_state": old_state, "new_state": new_state})
+        return new_state
+
+    def update_entity_registry(self, entity_id: str, **changes):
+        """Modifie une entrée du registre (name, aliases, area_id...)"""
+        action = "update" if entity_id in self.entity_registry else "create"
+        entry = self.entity_registry.setdefault(entity_id, {"entity_id": entity_id})
+        entry.update(changes)
+        self._emit("entity_registry_updated", {"action": action, "entity_id": entity_id})
+
+    def update_area(self, area_id: str, name: str, aliases=None):
+        """Crée ou renomme une pièce"""
+        action = "update" if area_id in self.areas else "create"
+        self.areas[area_id] = {"area_id": area_id, "name": name, "aliases": list(aliases or [])}
+        self._emit("area_registry_updated", {"action": action, "area_id": area_id})
+
+    def _emit(self, event_type: str, data: Dict):
+        # Diffusion aux abonnés WebSocket (thread-safe)
+        if self.loop is not None and self.subscribers:
+            event = {"event_type": event_type, "data": data}
+            self.loop.call_soon_threadsafe(self._broadcast, event)
+
+    def _broadcast(self, event: Dict):
+        for ws, subscriptions in list(self.subscribers.items()):
+            subscription_id = subscriptions.get(event["event_type"])
+            if subscription_id is not None:
+                asyncio.ensure_future(
+                    ws.send_json({"id": subscription_id, "type": "event", "event": event})
+                )
+
+    async def handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"type": "auth_required", "ha_version": "fake"})
+
+        auth = await ws.receive_json()
+        if auth.get("type") != "auth":
+            await ws.send_json({"type": "auth_invalid", "message": "auth attendu"})
+            await ws.close()
+            return ws
+        await ws.send_json({"type": "auth_ok", "ha_version": "fake"})
+
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    break
+                data = message.json()
+                msg_id, msg_type = data.get("id"), data.get("type")
+                results = {
+                    "get_states": lambda: list(self.states.values()),
+                    "config/area_registry/list": lambda: list(self.areas.values()),
+                    "config/device_registry/list": lambda: [],
+                    "config/entity_registry/list": lambda: list(self.entity_registry.values()),
+                    "config/entity_registry/get": lambda: self.entity_registry.get(
+                        data.get("entity_id"))
+                }
+                if msg_type in results:
+                    await self._delay()
+                    await ws.send_json({"id": msg_id, "type": "result", "success": True,
+                                        "result": results[msg_type]()})
+                elif msg_type == "subscribe_events":
+                    event_type = data.get("event_type", "state_changed")
+                    self.subscribers.setdefault(ws, {})[event_type] = msg_id
+                    await ws.send_json({"id": msg_id, "type": "result", "success": True,
+                                        "result": None})
+                elif msg_type == "ping":
+                    await ws.send_json({"id": msg_id, "type": "pong"})
+                else:
+                    await ws.send_json({"id": msg_id, "type": "result", "success": False,
+                                        "error": {"code": "unknown_command"}})
+        finally:
+            self.subscribers.pop(ws, None)
+        return ws
+
+    async def _delay(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+    async def handle_api(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response({"message": "API running."})
+
+    async def handle_states(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response(list(self.states.values()))
+
+    async def handle_state(self, request: web.Request) -> web.Response:
+        await self._delay()
+        state = self.states.get(request.match_info["entity_id"])
+        if state is None:
+            return web.json_response({"message": "Entity not found."}, status=404)
+        return web.json_response(state)
+
+    async def handle_service(self, request: web.Request) -> web.Response:
+        await self._delay()
+        domain = request.match_info["domain"]
+        service = request.match_info["service"]
+        data = await request.json() if request.can_read_body else {}
+        self.service_calls.append((domain, service, data))
+
+        entity_id = data.get("entity_id")
+        changed = []
+        if entity_id in self.states:
+            attributes = {**self.states[entity_id]["attributes"],
+                          **{k: v for k, v in data.items() if k != "entity_id"}}
+            state = {"turn_on": "on", "turn_off": "off", "media_play": "playing",
+                     "media_stop": "idle"}.get(service, self.states[entity_id]["state"])
+            changed.append(self.set_state(entity_id, state, attributes))
+        return web.json_response(changed)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Démarre le serveur, retourne le port effectif"""
+        self.loop = asyncio.get_running_loop()
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.logger.info(f"Faux Home Assistant sur http://{host}:{port}")
+        return port
+
+    async def stop(self):
+        """Arrêt du serveur"""
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+
+async def _serve(host: str, port: int, delay_ms: float):
+    server = FakeHomeAssistant(delay_ms)
+    await server.start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Faux serveur Home Assistant")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args.host, args.port, args.delay_ms))
+    except KeyboardInterrupt:
+        pass
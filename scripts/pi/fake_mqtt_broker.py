@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Faux broker MQTT 3.1.1 minimal pour tests locaux (remplace Mosquitto)
+CONNECT, PUBLISH QoS 0/1 (PUBACK), SUBSCRIBE (jokers + et #),
+UNSUBSCRIBE, PINGREQ, DISCONNECT. Distribution aux abonnés en QoS 0.
+Messages reçus conservés dans `received` pour vérification.
+
+Usage : python3 fake_mqtt_broker.py [--port 1883]
+"""
+
+import argparse
+import asyncio
+import logging
+import struct
+from typing import Dict, List, Optional, Set, Tuple
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """Correspondance d'un filtre d'abonnement MQTT"""
+    pattern_parts = pattern.split("/")
+    topic_parts = topic.split("/")
+    for index, part in enumerate(pattern_parts):
+        if part == "#":
+            return True
+        if index >= len(topic_parts):
+            return False
+        if part != "+" and part != topic_parts[index]:
+            return False
+    return len(pattern_parts) == len(topic_parts)
+
+
+def _encode_length(length: int) -> bytes:
+    encoded = bytearray()
+    while True:
+        byte = length % 128
+        length //= 128
+        encoded.append(byte | (0x80 if length else 0))
+        if not length:
+            return bytes(encoded)
+
+
+def _utf8(text: str) -> bytes:
+    data = text.encode("utf-8")
+    return struct.pack("!H", len(data)) + data
+
+
+class FakeMQTTBroker:
+    """Broker MQTT en mémoire (asyncio)"""
+
+    def __init__(self):
+        self.logger = logging.getLogger("bender.fake_mqtt")
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.subscriptions: Dict[asyncio.StreamWriter, Set[str]] = {}
+        # (topic, payload, qos) dans l'ordre de réception
+        self.received: List[Tuple[str, bytes, int]] = []
+        self.connections = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Démarre le broker, retourne le port effectif"""
+        self.server = await asyncio.start_server(self._handle, host, port)
+        port = self.server.sockets[0].getsockname()[1]
+        self.logger.info(f"Faux broker MQTT sur {host}:{port}")
+        return port
+
+    async def stop(self):
+        """Arrêt du broker et fermeture des connexions clientes"""
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self.subscriptions):
+                writer.close()
+            await self.server.wait_closed()
+            self.server = None
+        self.subscriptions.clear()
+
+    async def _read_packet(self, reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+        header = (await reader.readexactly(1))[0]
+        length, multiplier = 0, 1
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            length += (byte & 0x7F) * multiplier
+            multiplier *= 128
+            if not byte & 0x80:
+                break
+        return header, await reader.readexactly(length)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self.subscriptions[writer] = set()
+        try:
+            while True:
+                header, body = await self._read_packet(reader)
+                packet_type, flags = header >> 4, header & 0x0F
+
+                if packet_type == 1:  # CONNECT
+                    writer.write(b"\x20\x02\x00\x00")
+
+                elif packet_type == 3:  # PUBLISH
+                    qos = (flags >> 1) & 0x03
+                    topic_length = struct.unpack("!H", body[:2])[0]
+                    topic = body[2:2 + topic_length].decode("utf-8")
+                    offset = 2 + topic_length
+                    if qos:
+                        packet_id = body[offset:offset + 2]
+                        offset += 2
+                        writer.write(b"\x40\x02" + packet_id)
+                    payload = body[offset:]
+                    self.received.append((topic, payload, qos))
+                    self._deliver(topic, payload)
+
+                elif packet_type == 8:  # SUBSCRIBE
+                    packet_id, offset, granted = body[:2], 2, bytearray()
+                    while offset < len(body):
+                        length = struct.unpack("!H", body[offset:offset + 2])[0]
+                        pattern = body[offset + 2:offset + 2 + length].decode("utf-8")
+                        granted.append(min(body[offset + 2 + length], 1))
+                        offset += 3 + length
+                        self.subscriptions[writer].add(pattern)
+                    writer.write(b"\x90" + _encode_length(2 + len(granted)) + packet_id + granted)
+
+                elif packet_type == 10:  # UNSUBSCRIBE
+                    packet_id, offset = body[:2], 2
+                    while offset < len(body):
+                        length = struct.unpack("!H", body[offset:offset + 2])[0]
+                        self.subscriptions[writer].discard(body[offset + 2:offset + 2 + length].decode())
+                        offset += 2 + length
+                    writer.write(b"\xb0\x02" + packet_id)
+
+                elif packet_type == 12:  # PINGREQ
+                    writer.write(b"\xd0\x00")
+
+                elif packet_type == 14:  # DISCONNECT
+                    break
+
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.subscriptions.pop(writer, None)
+            writer.close()
+
+    def _deliver(self, topic: str, payload: bytes):
+        packet = None
+        for writer, patterns in list(self.subscriptions.items()):
+            if any(topic_matches(pattern, topic) for pattern in patterns):
+                if packet is None:
+                    body = _utf8(topic) + payload
+                    packet = b"\x30" + _encode_length(len(body)) + body
+                writer.write(packet)
+
+    def topics(self) -> List[str]:
+        """Topics reçus dans l'ordre"""
+        return [topic for topic, _, _ in self.received]
+
+
+async def _serve(host: str, port: int):
+    broker = FakeMQTTBroker()
+    await broker.start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await broker.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Faux broker MQTT")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+NLU locale rapide pour Bender : commandes domotique françaises courantes
+reconnues par le router sans aller-retour LLM
+
+Gabarits regex précompilés avec extraction de slots (pièce, pourcentage),
+indexés par mot déclencheur : seuls les gabarits du verbe de la phrase
+sont essayés. Le résultat alimente directement `intent_handlers` ;
+les phrases non reconnues partent vers le LLM.
+
+Correspondance sur le texte sans accents, slots extraits du texte
+d'origine (mêmes positions, accents conservés pour la réponse TTS).
+
+Gabarits sans objet explicite ("allume la cuisine") : le nom n'est
+accepté que s'il désigne une pièce ou une lumière connue (`known_room`),
+sinon "allume le chauffage" partirait en action lumière.
+"""
+
+import re
+import unicodedata
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+
+# Formules de politesse / interpellation retirées avant correspondance
+_PREFIX = re.compile(
+    r"^(?:(?:hey |dis |ok )?bender )?"
+    r"(?:(?:est-ce que |est ce que )?(?:tu peux |tu pourrais |peux-tu |peux tu |pourrais-tu |pourrais tu ))?"
+)
+_SUFFIX = re.compile(r"(?: s'il te plait| s'il vous plait| stp| merci| bender)+$")
+_PUNCT = re.compile(r"[,.!?;:\"«»]+")
+_SPACES = re.compile(r"\s+")
+
+# Articles et prépositions entre l'objet et la pièce
+_LOC = r"(?:(?:du|de la|de l'|des|dans le|dans la|dans l'|dans les|au|a la|a l'|aux|en|de) ?)"
+_ROOM = r"(?P<room>[a-z' -]+?)"
+# Nom seul, sans objet "lumière" : pièce connue exigée
+_AREA = r"(?P<area>[a-z' -]+?)"
+_LIGHT = r"(?:la |les |l')?(?:lumieres?|lampes?|eclairages?|plafonniers?)"
+
+
+def _percent(slot: str) -> str:
+    return rf"(?P<{slot}>\d{{1,3}}|[a-z-]+)(?: ?%| pour ?cent| pourcents?)?"
+
+
+NUMBER_WORDS = {
+    "zero": 0, "dix": 10, "quinze": 15, "vingt": 20, "vingt-cinq": 25, "trente": 30,
+    "quarante": 40, "cinquante": 50, "soixante": 60, "soixante-dix": 70,
+    "soixante-quinze": 75, "quatre-vingt": 80, "quatre-vingts": 80,
+    "quatre-vingt-dix": 90, "cent": 100, "moitie": 50, "max": 100, "maximum": 100
+}
+
+# (mots déclencheurs, intent, gabarit) ; premier gabarit reconnu retenu
+TEMPLATES: List[Tuple[Tuple[str, ...], str, str]] = [
+    (("allume", "allumer", "active", "activer"), "turn_on_light",
+     rf"(?:allumer?|activer?) (?:moi )?{_LIGHT}(?: {_LOC}{_ROOM})?"),
+    (("allume", "allumer"), "turn_on_light",
+     rf"allumer? (?:moi )?(?:le |la |l'|les )?{_AREA}"),
+    (("eteins", "eteint", "eteindre", "coupe", "couper", "desactive"), "turn_off_light",
+     rf"(?:eteins|eteint|eteindre|coupe|couper|desactiver?) (?:moi )?{_LIGHT}(?: {_LOC}{_ROOM})?"),
+    (("eteins", "eteint", "eteindre"), "turn_off_light",
+     rf"(?:eteins|eteint|eteindre) (?:moi )?(?:le |la |l'|les )?{_AREA}"),
+    (("mets", "mettre", "regle", "regler", "baisse", "monte", "luminosite"), "set_brightness",
+     rf"(?:(?:mets|mettre|regle|regler|baisse|monte) )?(?:la )?(?:luminosite|{_LIGHT})"
+     rf"(?: {_LOC}{_ROOM})? (?:a|au|sur) {_percent('brightness')}"),
+    (("mets", "mettre", "regle", "regler", "baisse", "monte", "volume"), "set_volume",
+     rf"(?:(?:mets|mettre|regle|regler|baisse|monte) )?(?:le )?(?:son|volume)"
+     rf"(?: de la musique)? (?:a|au|sur) {_percent('volume')}"),
+    (("lance", "lancer", "mets", "mettre", "joue", "jouer", "demarre"), "play_music",
+     r"(?:lancer?|mets|mettre|jouer?|demarre) (?:de la |la |une )?(?:musique|chanson)"),
+    (("arrete", "arreter", "stop", "stoppe", "coupe", "couper"), "stop_music",
+     r"(?:arreter?|stop|stoppe|coupe|couper) (?:la )?(?:musique|chanson)"),
+    (("stop", "silence"), "stop_music", r"(?:stop|silence)"),
+    (("quelle", "quel", "temperature", "combien", "il"), "get_temperature",
+     rf"(?:quelle (?:est la )?|quel est la )?temperature(?: (?:fait-il|fait il|il fait))?"
+     rf"(?: {_LOC}{_ROOM})?"),
+    (("il", "combien"), "get_temperature",
+     rf"(?:il fait combien|combien il fait|combien fait-il|il fait quelle temperature)"
+     rf"(?: {_LOC}{_ROOM})?"),
+    (("quel", "statut", "etat", "status", "comment"), "get_status",
+     r"(?:(?:quel est )?(?:le |l')?(?:statut|status|etat)(?: du systeme| de bender)?"
+     r"|comment (?:tu vas|vas-tu|ca va))"),
+]
+
+# Slots refusés comme pièce (verbes/objets pris par le gabarit générique)
+_NOT_ROOMS = frozenset({"musique", "chanson", "son", "volume", "tele", "radio"})
+# Phrases composées ("... et éteins la cuisine") : laissées au LLM
+_CONJUNCTIONS = frozenset({"et", "puis", "ou", "mais", "sauf", "celle", "celui", "aussi"})
+_MAX_ROOM_WORDS = 4
+
+
+def _fold_table() -> Dict[int, str]:
+    # Latin-1 et Latin étendu A : un caractère accentué → une lettre de base
+    table = {}
+    for code in range(0xC0, 0x180):
+        base = unicodedata.normalize("NFKD", chr(code))
+        base = "".join(c for c in base if not unicodedata.combining(c))
+        if len(base) == 1 and base != chr(code):
+            table[code] = base
+    return table
+
+
+_FOLD = _fold_table()
+
+
+def fold(text: str) -> str:
+    """Texte sans accents, même longueur que l'entrée (positions des slots)"""
+    return text.translate(_FOLD)
+
+
+class FastIntentMatcher:
+    """Reconnaissance locale des commandes françaises courantes"""
+
+    def __init__(self, confidence: float = 0.95,
+                 known_room: Optional[Callable[[str], bool]] = None):
+        self.confidence = confidence
+        # Nom → pièce ou lumière connue ; absent : gabarits sans objet désactivés
+        self.known_room = known_room
+        self.by_trigger: Dict[str, List[Tuple[str, Pattern]]] = {}
+        for triggers, intent, template in TEMPLATES:
+            pattern = re.compile(template + "$")
+            for trigger in triggers:
+                self.by_trigger.setdefault(trigger, []).append((intent, pattern))
+
+    def clean(self, text: str) -> str:
+        """Texte minuscule, apostrophes uniformisées, sans ponctuation"""
+        text = text.lower().replace("’", "'")
+        text = _SPACES.sub(" ", _PUNCT.sub(" ", text)).strip()
+        return text
+
+    def match(self, text: str) -> Optional[Dict]:
+        """Intent au format `bender/intent` ou None si non reconnu"""
+        original = self.clean(text)
+        folded = fold(original)
+
+        start = _PREFIX.match(folded).end()
+        end = len(folded)
+        suffix = _SUFFIX.search(folded, start)
+        if suffix:
+            end = suffix.start()
+        if start >= end:
+            return None
+
+        head = folded[start:end].split(" ", 1)[0]
+        for intent, pattern in self.by_trigger.get(head, ()):
+            found = pattern.match(folded, start, end)
+            if found is None:
+                continue
+            entities = self._slots(found, original)
+            if entities is None:
+                continue
+            return {
+                "intent": intent,
+                "entities": entities,
+                "confidence": self.confidence,
+                "text": text,
+                "source": "fast_path"
+            }
+        return None
+
+    def _slots(self, found: re.Match, original: str) -> Optional[Dict]:
+        entities = {}
+        groups = found.groupdict()
+
+        for slot in ("room", "area"):
+            if not groups.get(slot):
+                continue
+            room = original[found.start(slot):found.end(slot)].strip(" '-")
+            words = fold(room).split()
+            if (not words or len(words) > _MAX_ROOM_WORDS or fold(room) in _NOT_ROOMS
+                    or _CONJUNCTIONS.intersection(words)):
+                return None
+            if slot == "area" and (self.known_room is None or not self.known_room(room)):
+                return None
+            entities["room"] = room
+
+        for slot in ("brightness", "volume"):
+            value = groups.get(slot)
+            if value is None:
+                continue
+            number = int(value) if value.isdigit() else NUMBER_WORDS.get(value)
+            if number is None or not 0 <= number <= 100:
+                return None
+            entities[slot] = number
+
+        return entities
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Client Home Assistant asyncio pour Bender
+Même API que HomeAssistantClient (call_service/get_state/test_connection)
+sur un pool de connexions HTTP keep-alive aiohttp
+
+- warm_up() : ouvre les connexions du pool au démarrage (pas de handshake
+  TCP sur le chemin critique du premier intent)
+- call_services() : lot d'appels concurrents (ex. éteindre plusieurs pièces)
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from bender_metrics import MetricsRegistry
+
+if TYPE_CHECKING:
+    from intent_router import HAConfig
+
+# (domain, service, entity_id, service_data)
+ServiceCall = Tuple[str, str, Optional[str], Optional[Dict]]
+
+
+class AsyncHomeAssistantClient:
+    """Client asynchrone pour interagir avec Home Assistant"""
+
+    def __init__(self, config: "HAConfig", pool_size: int = 4,
+                 latency: Optional[MetricsRegistry] = None):
+        self.config = config
+        self.pool_size = pool_size
+        self.logger = logging.getLogger("bender.ha_client_async")
+        self.latency = latency or MetricsRegistry()
+        self.session: Optional[aiohttp.ClientSession] = None
+
+        self.headers = {"Content-Type": "application/json"}
+        if config.token:
+            self.headers["Authorization"] = f"Bearer {config.token}"
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=60
+            )
+            self.session = aiohttp.ClientSession(
+                base_url=self.config.base_url,
+                headers=self.headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+            )
+        return self.session
+
+    async def warm_up(self) -> int:
+        """Ouvre `pool_size` connexions keep-alive, retourne le nombre établi"""
+        results = await asyncio.gather(
+            *(self.test_connection(log=False) for _ in range(self.pool_size))
+        )
+        established = sum(results)
+        self.logger.info(f"Pool Home Assistant préchauffé: {established}/{self.pool_size}")
+        return established
+
+    async def call_service(self, domain: str, service: str,
+                           entity_id: Optional[str] = None,
+                           service_data: Optional[Dict] = None) -> bool:
+        """Appel d'un service Home Assistant"""
+        data = {}
+        if entity_id:
+            data["entity_id"] = entity_id
+        if service_data:
+            data.update(service_data)
+
+        session = await self._get_session()
+        try:
+            with self.latency.timer("ha_call"):
+                async with session.post(f"/api/services/{domain}/{service}", json=data) as response:
+                    response.raise_for_status()
+                    await response.read()
+            self.logger.info(f"Service {domain}.{service} appelé avec succès")
+            return True
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f"Erreur appel service {domain}.{service}: {e}")
+            return False
+
+    async def call_services(self, calls: Sequence[ServiceCall]) -> List[bool]:
+        """Lot d'appels de services exécutés en parallèle"""
+        return list(await asyncio.gather(
+            *(self.call_service(domain, service, entity_id, service_data)
+              for domain, service, entity_id, service_data in calls)
+        ))
+
+    async def get_state(self, entity_id: str) -> Optional[Dict]:
+        """Récupère l'état d'une entité"""
+        session = await self._get_session()
+        try:
+            with self.latency.timer("ha_state"):
+                async with session.get(f"/api/states/{entity_id}") as response:
+                    response.raise_for_status()
+                    return await response.json()
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f"Erreur récupération état {entity_id}: {e}")
+            return None
+
+    async def test_connection(self, log: bool = True) -> bool:
+        """Test de connexion à Home Assistant"""
+        session = await self._get_session()
+        try:
+            async with session.get("/api/") as response:
+                response.raise_for_status()
+                await response.read()
+            if log:
+                self.logger.info("Connexion Home Assistant OK")
+            return True
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f"Erreur connexion Home Assistant: {e}")
+            return False
+
+    async def close(self):
+        """Fermeture du pool de connexions"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Miroir d'états Home Assistant pour Bender (API WebSocket)
+
+Au démarrage : authentification, `get_states` (index complet) puis
+abonnement aux événements `state_changed`. L'index en mémoire répond à
+`get_state()` en quelques microsecondes, avec l'âge de l'entrée.
+Tout message reçu (événement ou pong du ping périodique) sert de signal
+de vie : au-delà de `stale_after` sans message, le miroir est considéré
+hors service et l'appelant repasse par l'API REST.
+
+Avec un EntityResolver : chargement des registres (pièces, appareils,
+entités) à la connexion puis mise à jour incrémentale sur les
+événements `*_registry_updated`.
+
+Boucle asyncio dans un thread dédié (start/stop) : lectures thread-safe
+depuis le router (remplacement atomique des entrées d'un dict sous GIL).
+Runtime asyncio du router : run() s'exécute sur sa boucle, sans thread.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+import aiohttp
+
+from entity_resolver import EntityResolver
+
+REGISTRY_EVENTS = ("area_registry_updated", "device_registry_updated",
+                   "entity_registry_updated")
+
+if TYPE_CHECKING:
+    from intent_router import HAConfig
+
+
+class HAStateMirror:
+    """Index local des états HA alimenté par le flux `state_changed`"""
+
+    def __init__(self, config: "HAConfig", heartbeat_interval: float = 10.0,
+                 stale_after: float = 30.0, resolver: Optional[EntityResolver] = None):
+        self.config = config
+        self.resolver = resolver
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.logger = logging.getLogger("bender.ha_mirror")
+
+        base = config.base_url.rstrip("/")
+        self.ws_url = base.replace("http", "ws", 1) + "/api/websocket"
+
+        # entity_id → (état HA, instant de réception monotone)
+        self.index: Dict[str, Tuple[Dict, float]] = {}
+        self.connected = False
+        self.last_message = 0.0
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self.next_id = 1
+        # id de requête → traitement du résultat
+        self.pending: Dict[int, Callable[[Any], None]] = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "events": 0,
+            "reconnects": 0
+        }
+
+    # API lecture (thread router)
+    def is_alive(self) -> bool:
+        """Abonnement actif et message reçu récemment"""
+        return self.connected and time.monotonic() - self.last_message < self.stale_after
+
+    def get_state(self, entity_id: str) -> Optional[Dict]:
+        """État depuis l'index local (None si absent ou miroir hors service)
+
+        Le dict retourné est l'état HA enrichi d'une clé "mirror" :
+        {"age_s": âge de l'entrée, "heartbeat_age_s": âge du dernier message}.
+        """
+        if not self.is_alive():
+            return None
+
+        entry = self.index.get(entity_id)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        state, received = entry
+        now = time.monotonic()
+        return {
+            **state,
+            "mirror": {
+                "age_s": now - received,
+                "heartbeat_age_s": now - self.last_message
+            }
+        }
+
+    def update_state(self, state: Dict):
+        """Insère un état obtenu par ailleurs (ex. repli REST)"""
+        entity_id = state.get("entity_id")
+        if entity_id:
+            self.index[entity_id] = (state, time.monotonic())
+
+    def entity_ids(self):
+        """Identifiants connus"""
+        return list(self.index.keys())
+
+    # Cycle de vie
+    def start(self):
+        """Démarre le thread du miroir"""
+        self.running = True
+        self.thread = threading.Thread(target=self._thread_main, name="bender-ha-mirror", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Arrête le miroir"""
+        self.running = False
+        if self.loop is not None and self.ws is not None:
+            asyncio.run_coroutine_threadsafe(self.ws.close(), self.loop)
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    async def run(self):
+        """Exécution sur la boucle appelante (annulation = arrêt)"""
+        self.running = True
+        self.loop = asyncio.get_running_loop()
+        try:
+            await self._run()
+        finally:
+            self.running = False
+            self.loop = None
+
+    def _thread_main(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._run())
+        finally:
+            self.loop.close()
+            self.loop = None
+
+    async def _run(self):
+        backoff = 1.0
+        async with aiohttp.ClientSession() as session:
+            while self.running:
+                try:
+                    await self._session(session)
+                    backoff = 1.0
+                except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                    self.logger.warning(f"WebSocket Home Assistant indisponible: {e}")
+                except Exception as e:
+                    self.logger.error(f"Erreur miroir Home Assistant: {e}")
+                finally:
+                    self.connected = False
+                    self.ws = None
+
+                if self.running:
+                    self.stats["reconnects"] += 1
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 30.0)
+
+    async def _send(self, message: Dict) -> int:
+        message["id"] = self.next_id
+        self.next_id += 1
+        await self.ws.send_json(message)
+        return message["id"]
+
+    async def _request(self, message: Dict, callback: Callable[[Any], None]):
+        self.pending[await self._send(message)] = callback
+
+    async def _session(self, session: aiohttp.ClientSession):
+        async with session.ws_connect(self.ws_url, heartbeat=None) as ws:
+            self.ws = ws
+            self.next_id = 1
+            self.pending = {}
+
+            # Authentification
+            message = await ws.receive_json(timeout=self.config.timeout)
+            if message.get("type") == "auth_required":
+                await ws.send_json({"type": "auth", "access_token": self.config.token})
+                message = await ws.receive_json(timeout=self.config.timeout)
+            if message.get("type") != "auth_ok":
+                raise ConnectionError(f"Authentification refusée: {message.get('message', message)}")
+
+            await self._request({"type": "get_states"}, self._on_states)
+            await self._send({"type": "subscribe_events", "event_type": "state_changed"})
+            if self.resolver is not None:
+                await self._request({"type": "config/area_registry/list"}, self.resolver.load_areas)
+                await self._request({"type": "config/device_registry/list"}, self.resolver.load_devices)
+                await self._request({"type": "config/entity_registry/list"}, self.resolver.load_entities)
+                for event_type in REGISTRY_EVENTS:
+                    await self._send({"type": "subscribe_events", "event_type": event_type})
+            self.connected = True
+            self.last_message = time.monotonic()
+            self.logger.info(f"Miroir Home Assistant connecté ({self.ws_url})")
+
+            while self.running:
+                try:
+                    message = await ws.receive(timeout=self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    await self._send({"type": "ping"})
+                    if time.monotonic() - self.last_message > self.stale_after:
+                        raise ConnectionError("Pas de pong Home Assistant")
+                    continue
+
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+                self.last_message = time.monotonic()
+                self._handle(message.json())
+
+    def _handle(self, message: Dict):
+        msg_type = message.get("type")
+        if msg_type == "event":
+            event = message.get("event", {})
+            data = event.get("data", {})
+            self.stats["events"] += 1
+            if event.get("event_type", "state_changed") == "state_changed":
+                self._on_state_changed(data)
+            else:
+                self._on_registry_updated(event["event_type"], data)
+
+        elif msg_type == "result":
+            callback = self.pending.pop(message.get("id"), None)
+            if callback is None:
+                return
+            if message.get("success", True):
+                callback(message.get("result"))
+            else:
+                self.logger.warning(f"Requête Home Assistant refusée: {message.get('error')}")
+
+    def _on_states(self, states):
+        now = time.monotonic()
+        self.index = {state["entity_id"]: (state, now) for state in states or []}
+        if self.resolver is not None:
+            self.resolver.load_states(states)
+        self.logger.info(f"Miroir Home Assistant: {len(self.index)} entités")
+
+    def _on_state_changed(self, data: Dict):
+        entity_id = data.get("entity_id")
+        new_state = data.get("new_state")
+        if new_state is None:
+            self.index.pop(entity_id, None)
+        elif entity_id:
+            self.index[entity_id] = (new_state, time.monotonic())
+            if self.resolver is not None:
+                self.resolver.update_state(new_state)
+
+    def _on_registry_updated(self, event_type: str, data: Dict):
+        """Mise à jour incrémentale : seule l'entrée modifiée est relue"""
+        if self.resolver is None:
+            return
+        if event_type == "entity_registry_updated":
+            if data.get("action") == "remove":
+                self.resolver.remove_entity(data.get("entity_id"))
+            else:
+                asyncio.ensure_future(self._request(
+                    {"type": "config/entity_registry/get", "entity_id": data.get("entity_id")},
+                    self.resolver.upsert_entity
+                ))
+        elif event_type == "area_registry_updated":
+            asyncio.ensure_future(self._request(
+                {"type": "config/area_registry/list"}, self.resolver.load_areas
+            ))
+        elif event_type == "device_registry_updated":
+            asyncio.ensure_future(self._request(
+                {"type": "config/device_registry/list"}, self.resolver.load_devices
+            ))
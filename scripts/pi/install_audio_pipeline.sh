@@ -120,6 +120,17 @@ install_pipeline_script() {
         exit 1
     fi
     
+    # Modules importés par le pipeline
+    for module in audio_transport.py bender_codec.py bender_metrics.py bender_trace.py; do
+        if [[ -f "$SCRIPT_DIR/$module" ]]; then
+            cp "$SCRIPT_DIR/$module" /opt/bender/
+            chown "$SERVICE_USER:$SERVICE_USER" "/opt/bender/$module"
+        else
+            log_error "Module $module introuvable"
+            exit 1
+        fi
+    done
+    
     # Configuration par défaut
     cat > /opt/bender/audio_config.json << EOF
 {
@@ -23,15 +23,19 @@ fi
 echo "Création des répertoires..."
 mkdir -p "$UI_DIR"
 mkdir -p "$UI_DIR/static"
-mkdir -p "$UI_DIR/templates"
 mkdir -p "$CERTS_DIR"
 
 # Copier les fichiers de l'UI
 echo "Copie des fichiers de l'interface..."
 cp bender_ui/app.py "$UI_DIR/"
 cp bender_ui/config.py "$UI_DIR/"
+cp bender_ui/mqtt_bridge.py "$UI_DIR/"
+cp bender_ui/static_assets.py "$UI_DIR/"
+cp bender_ui/system_metrics.py "$UI_DIR/"
+cp bender_ui/log_tail.py "$UI_DIR/"
+cp bender_ui/voice_catalog.py "$UI_DIR/"
 cp bender_ui/requirements.txt "$UI_DIR/"
-cp bender_ui/index.html "$UI_DIR/templates/"
+cp bender_ui/static/index.html "$UI_DIR/static/"
 cp bender_ui/static/app.js "$UI_DIR/static/"
 
 # Créer le fichier .env.sample
@@ -81,6 +85,10 @@ EOF
 echo "Installation des dépendances Python..."
 pip3 install -r "$UI_DIR/requirements.txt"
 
+# Précompression des fichiers statiques (gzip, brotli)
+echo "Précompression des fichiers statiques..."
+(cd "$UI_DIR" && python3 static_assets.py)
+
 # Générer les certificats TLS si nécessaire
 if [[ ! -f "$CERTS_DIR/server.crt" ]]; then
     echo "Génération des certificats TLS..."
@@ -103,8 +111,7 @@ chown -R "$USER:$GROUP" "$CERTS_DIR"
 chmod 755 "$UI_DIR"
 chmod 644 "$UI_DIR"/*.py
 chmod 644 "$UI_DIR"/*.txt
-chmod 644 "$UI_DIR/templates"/*.html
-chmod 644 "$UI_DIR/static"/*.js
+chmod 644 "$UI_DIR/static"/*
 chmod 600 "$CERTS_DIR"/*.key
 chmod 644 "$CERTS_DIR"/*.crt
 
@@ -129,6 +136,11 @@ echo "Vérification de la syntaxe..."
 cd "$UI_DIR"
 python3 -m py_compile app.py
 python3 -m py_compile config.py
+python3 -m py_compile mqtt_bridge.py
+python3 -m py_compile static_assets.py
+python3 -m py_compile system_metrics.py
+python3 -m py_compile log_tail.py
+python3 -m py_compile voice_catalog.py
 
 echo "=== Installation terminée ==="
 echo ""
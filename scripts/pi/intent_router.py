@@ -8,18 +8,31 @@
 Date: 2025-08-22
 """
 
+import asyncio
 import json
 import logging
+import queue
 import time
 import threading
-from typing import Dict, Any, Optional, Callable
-from dataclasses import dataclass, asdict
-from datetime import datetime
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from dataclasses import dataclass, asdict, field
 
 import paho.mqtt.client as mqtt
 import requests
 from requests.auth import HTTPBasicAuth
 
+from bender_codec import TopicCodec, now_ns
+from bender_metrics import MetricsRegistry
+from bender_trace import TraceContext, TraceCollector
+from entity_resolver import EntityResolver, normalize
+from fast_nlu import FastIntentMatcher
+from mqtt_outbox import MQTTOutbox, OutboxConfig
+from tts_cache import TTSPhraseCache, WyomingPiperClient
+from ha_state_mirror import HAStateMirror
+
 
 @dataclass
 class HAConfig:
@@ -27,6 +40,7 @@ class HAConfig:
     base_url: str = "http://192.168.1.138:8123"
     token: str = ""  # À définir dans .env.local
     timeout: int = 5
+    state_mirror: bool = True  # États via WebSocket state_changed (REST en repli)
     
 @dataclass
 class MQTTConfig:
@@ -41,18 +55,266 @@ class MQTTConfig:
     # Topics MQTT
     topic_intent: str = "bender/intent"
     topic_asr_final: str = "bender/asr/final"
+    topic_asr_partial: str = "bender/asr/partial"
+    topic_nlu_request: str = "bender/nlu/request"  # Phrases non reconnues → LLM
     topic_tts_say: str = "bender/tts/say"
     topic_sys_metrics: str = "bender/sys/metrics"
     topic_sys_log: str = "bender/sys/log"
+    
+    # Formats par topic (bender_codec) : JSON seul par défaut, binaire sur <topic>/<format>
+    topic_formats: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+
+
+@dataclass
+class DispatchConfig:
+    """Configuration de l'exécution des intents (pool de workers)"""
+    workers: int = 4
+    queue_size: int = 16              # Par worker
+    shed_policy: str = "drop_oldest"  # "drop_oldest" ou "drop_newest"
+    merge_workers: int = 8            # Réglages fusionnables exécutés en parallèle
+
+
+@dataclass
+class SpeculationConfig:
+    """Exécution spéculative sur les transcriptions partielles"""
+    enabled: bool = True
+    stable_partials: int = 2          # Partiels consécutifs au même intent
+    min_confidence: float = 0.7       # Confiance ASR minimale du partiel
+    execute_early: bool = False       # Déclencher l'action avant le final
+    ttl_s: float = 5.0                # Abandon (et annulation) sans final
+
+
+@dataclass
+class CoalescerConfig:
+    """Regroupement des appels de services HA"""
+    enabled: bool = True
+    debounce_ms: float = 40.0         # Fenêtre de fusion des réglages (volume, luminosité)
+    batch_workers: int = 4            # Appels indépendants exécutés en parallèle
+
+
+@dataclass
+class TTSCacheConfig:
+    """Cache des réponses TTS pré-rendues"""
+    enabled: bool = True
+    cache_dir: str = "/opt/bender/cache/tts"
+    max_mb: int = 64
+    voice_id: str = "fr_FR-siwis-medium"
+    piper_host: str = "192.168.1.138"  # Piper Wyoming sur le T630
+    piper_port: int = 10200
+    warm_on_start: bool = True
+
+
+# Réponses TTS du router (gabarits : préchauffage du cache TTS)
+TTS_PHRASES = {
+    "not_understood": "Je n'ai pas bien compris, pouvez-vous répéter ?",
+    "light_not_found": "Je ne trouve pas de lumière pour {room}",
+    "light_on": "J'allume la lumière du {room}",
+    "light_on_failed": "Impossible d'allumer la lumière du {room}",
+    "light_off": "J'éteins la lumière du {room}",
+    "light_off_failed": "Impossible d'éteindre la lumière du {room}",
+    "brightness_set": "Luminosité du {room} réglée à {percent}%",
+    "brightness_failed": "Impossible de régler la luminosité du {room}",
+    "sensor_not_found": "Je ne trouve pas de capteur de température pour {room}",
+    "temperature": "La température du {room} est de {temp} {unit}",
+    "temperature_failed": "Impossible d'obtenir la température du {room}",
+    "music_play": "Je lance la musique",
+    "music_play_failed": "Impossible de lancer la musique",
+    "music_stop": "J'arrête la musique",
+    "music_stop_failed": "Impossible d'arrêter la musique",
+    "volume_set": "Volume réglé à {percent}%",
+    "volume_failed": "Impossible de régler le volume",
+    "unknown": "Je ne sais pas comment faire cela",
+}
+DEFAULT_ROOMS = ("salon", "cuisine", "chambre", "salle de bain")
+
+
+# Services en dernier-écrivain-gagne : seul le dernier réglage compte
+COALESCED_SERVICES = {("media_player", "volume_set"), ("light", "turn_on")}
+
+
+# Intents idempotents déclenchables avant le final, service HA associé
+EARLY_INTENTS = {
+    "turn_on_light": ("light", "turn_on"),
+    "turn_off_light": ("light", "turn_off"),
+}
+
+
+# Contexte de l'intent en cours d'exécution (worker du dispatcher ou tâche asyncio)
+_current_trace: ContextVar[Optional[TraceContext]] = ContextVar("bender_trace", default=None)
+_current_speculation: ContextVar[Optional["Speculation"]] = ContextVar("bender_speculation", default=None)
+_current_received_ns: ContextVar[Optional[int]] = ContextVar("bender_received_ns", default=None)
+
+
+def run_sync(coro_fn: Callable, *args):
+    """Exécution sur place d'un handler coroutine en mode threads : les
+    clients HA y sont synchrones, la coroutine ne se suspend jamais"""
+    coro = coro_fn(*args)
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    coro.close()
+    raise RuntimeError(f"{coro_fn.__name__} suspendue hors d'une boucle asyncio")
+
+
+class Speculation:
+    """Intent pressenti sur les partiels d'un énoncé"""
+
+    __slots__ = ("key", "intent_data", "signature", "stable", "started", "created",
+                 "entity_id", "call", "result", "prior_state")
+
+    def __init__(self, key: str, intent_data: Dict, signature: Tuple):
+        self.key = key
+        self.intent_data = intent_data
+        self.signature = signature
+        self.stable = 1
+        self.started = False
+        self.created = time.monotonic()
+        self.entity_id: Optional[str] = None
+        # Appel HA déjà exécuté : (domain, service, entity_id), résultat, état antérieur
+        self.call: Optional[Tuple[str, str, str]] = None
+        self.result: Optional[bool] = None
+        self.prior_state: Optional[str] = None
+
+
+class IntentDispatcher:
+    """Pool de workers à files bornées pour l'exécution des intents
+
+    Une clé d'ordonnancement envoie toujours sur le même worker : les
+    intents d'une même ressource (ex. light.salon) restent ordonnés. Sans
+    clé, répartition round-robin. File pleine : délestage selon
+    `shed_policy` (abandon du plus ancien ou du nouvel intent).
+
+    Tâches `merge` (réglages fusionnés par le coalesceur) : les tâches
+    fusionnables consécutives d'un worker s'exécutent en parallèle pour
+    pouvoir se rejoindre ; la tâche ordinaire suivante attend leur fin.
+    """
+    
+    def __init__(self, config: DispatchConfig, latency: MetricsRegistry):
+        self.config = config
+        self.latency = latency
+        self.logger = logging.getLogger("bender.intent_dispatch")
+        self.queues = [queue.Queue(maxsize=config.queue_size) for _ in range(config.workers)]
+        self.threads = []
+        self.merge_pool = ThreadPoolExecutor(max_workers=config.merge_workers,
+                                             thread_name_prefix="bender-intent-merge")
+        self.next_worker = 0
+        self.lock = threading.Lock()
+        self.stats = {
+            "dispatched": 0,
+            "shed": 0,
+            "queue_depth_max": 0
+        }
+        
+    def start(self):
+        """Démarrage des workers"""
+        for index, work_queue in enumerate(self.queues):
+            thread = threading.Thread(
+                target=self._worker, args=(work_queue,),
+                name=f"bender-intent-{index}", daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+            
+    def submit(self, key: Optional[str], fn: Callable, *args, merge: bool = False) -> bool:
+        """Met une tâche en file, False si délestée"""
+        with self.lock:
+            if key is None:
+                index = self.next_worker
+                self.next_worker = (self.next_worker + 1) % len(self.queues)
+            else:
+                index = hash(key) % len(self.queues)
+                
+        work_queue = self.queues[index]
+        item = (time.perf_counter_ns(), fn, args, merge)
+        
+        try:
+            work_queue.put_nowait(item)
+        except queue.Full:
+            with self.lock:
+                self.stats["shed"] += 1
+            if self.config.shed_policy != "drop_oldest":
+                self.logger.warning(f"File intents pleine, intent abandonné ({key})")
+                return False
+            try:
+                work_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.logger.warning(f"File intents pleine, intent le plus ancien abandonné ({key})")
+            try:
+                work_queue.put_nowait(item)
+            except queue.Full:
+                return False
+                
+        with self.lock:
+            self.stats["dispatched"] += 1
+            depth = work_queue.qsize()
+            if depth > self.stats["queue_depth_max"]:
+                self.stats["queue_depth_max"] = depth
+        return True
+        
+    def _worker(self, work_queue: queue.Queue):
+        merging = []  # Tâches fusionnables en cours (pool)
+        while True:
+            item = work_queue.get()
+            if item is None:
+                break
+            enqueued_ns, fn, args, merge = item
+            if merge:
+                self.latency.record("dispatch_wait", time.perf_counter_ns() - enqueued_ns)
+                merging = [task for task in merging if not task.done()]
+                merging.append(self.merge_pool.submit(self._run, fn, args))
+                continue
+            if merging:
+                # Ordre conservé : réglages précédents terminés avant la tâche suivante
+                wait(merging)
+                merging = []
+            self.latency.record("dispatch_wait", time.perf_counter_ns() - enqueued_ns)
+            self._run(fn, args)
+    
+    def _run(self, fn: Callable, args):
+        try:
+            fn(*args)
+        except Exception as e:
+            self.logger.error(f"Erreur worker intent: {e}")
+                
+    def queue_depth(self) -> int:
+        """Nombre total de tâches en attente"""
+        return sum(work_queue.qsize() for work_queue in self.queues)
+        
+    def snapshot(self) -> Dict[str, int]:
+        """Métriques de contre-pression"""
+        with self.lock:
+            return {**self.stats, "queue_depth": self.queue_depth()}
+        
+    def stop(self, timeout: float = 5.0):
+        """Arrêt des workers après vidage des files (file pleine : plus anciennes abandonnées)"""
+        for work_queue in self.queues:
+            while True:
+                try:
+                    work_queue.put_nowait(None)
+                    break
+                except queue.Full:
+                    try:
+                        work_queue.get_nowait()
+                    except queue.Empty:
+                        pass
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+        self.merge_pool.shutdown(wait=True)
 
 
 class HomeAssistantClient:
     """Client pour interagir avec Home Assistant"""
     
-    def __init__(self, config: HAConfig):
+    def __init__(self, config: HAConfig, latency: Optional[MetricsRegistry] = None,
+                 state_mirror: Optional[HAStateMirror] = None):
         self.config = config
         self.logger = logging.getLogger("bender.ha_client")
         self.session = requests.Session()
+        self.latency = latency or MetricsRegistry()
+        self.state_mirror = state_mirror
         
         if config.token:
             self.session.headers.update({
@@ -73,11 +335,12 @@ def call_service(self, domain: str, service: str,
             data.update(service_data)
             
         try:
-            response = self.session.post(
-                url, 
-                json=data, 
-                timeout=self.config.timeout
-            )
+            with self.latency.timer("ha_call"):
+                response = self.session.post(
+                    url, 
+                    json=data, 
+                    timeout=self.config.timeout
+                )
             response.raise_for_status()
             self.logger.info(f"Service {domain}.{service} appelé avec succès")
             return True
@@ -87,26 +350,36 @@ def call_service(self, domain: str, service: str,
             return False
     
     def get_state(self, entity_id: str) -> Optional[Dict]:
-        """Récupère l'état d'une entité"""
+        """Récupère l'état d'une entité (miroir local, REST si absent)"""
+        if self.state_mirror is not None:
+            state = self.state_mirror.get_state(entity_id)
+            if state is not None:
+                return state
+        
         url = f"{self.config.base_url}/api/states/{entity_id}"
         
         try:
-            response = self.session.get(url, timeout=self.config.timeout)
+            with self.latency.timer("ha_state"):
+                response = self.session.get(url, timeout=self.config.timeout)
             response.raise_for_status()
-            return response.json()
+            state = response.json()
+            if self.state_mirror is not None:
+                self.state_mirror.update_state(state)
+            return state
             
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Erreur récupération état {entity_id}: {e}")
             return None
     
-    def test_connection(self) -> bool:
+    def test_connection(self, log: bool = True) -> bool:
         """Test de connexion à Home Assistant"""
         url = f"{self.config.base_url}/api/"
         
         try:
             response = self.session.get(url, timeout=self.config.timeout)
             response.raise_for_status()
-            self.logger.info("Connexion Home Assistant OK")
+            if log:
+                self.logger.info("Connexion Home Assistant OK")
             return True
             
         except requests.exceptions.RequestException as e:
@@ -114,25 +387,256 @@ def test_connection(self) -> bool:
             return False
 
 
+class _PendingCall:
+    """Appel en attente : données fusionnées et appelants en attente"""
+
+    __slots__ = ("domain", "service", "entity_id", "data", "order", "deadline",
+                 "coalesced", "waiters")
+
+    def __init__(self, domain: str, service: str, entity_id: Optional[str],
+                 data: Optional[Dict], order: int, deadline: float, coalesced: bool):
+        self.domain = domain
+        self.service = service
+        self.entity_id = entity_id
+        self.data = dict(data) if data else None
+        self.order = order
+        self.deadline = deadline
+        self.coalesced = coalesced
+        # (future, ordre) de chaque appelant fusionné
+        self.waiters = []
+
+
+class ServiceCallCoalescer:
+    """Coalescence des appels `call_service` devant HomeAssistantClient
+
+    Réglages d'une même entité (volume_set, light.turn_on) reçus pendant
+    `debounce_ms` : fusionnés, le plus récent (ordre de réception de
+    l'intent) gagne, un seul appel HA. Les autres appels partent sans
+    attendre ; tous les appels échus ensemble sont exécutés en parallèle.
+    Une entité n'a qu'un appel en vol à la fois, quel que soit le service :
+    les suivants attendent sa fin, dans l'ordre de soumission.
+
+    `call()` retourne True/False, ou None si l'appel a été remplacé par
+    un réglage plus récent (l'appelant ne répond pas).
+
+    Mode threads uniquement : `call()` bloque le worker appelant jusqu'au
+    vidage ; refusé depuis une boucle asyncio (le runtime asyncio n'a pas
+    de coalesceur).
+    """
+    
+    def __init__(self, client: HomeAssistantClient, config: CoalescerConfig):
+        self.client = client
+        self.config = config
+        self.logger = logging.getLogger("bender.ha_coalescer")
+        self.pool = ThreadPoolExecutor(max_workers=config.batch_workers,
+                                       thread_name_prefix="bender-ha-call")
+        self.condition = threading.Condition()
+        self.pending: "OrderedDict[Tuple, _PendingCall]" = OrderedDict()
+        self.in_flight = set()  # (domain, entity_id) des appels en cours
+        # Dernier ordre exécuté par (domain, service, entity_id) : réglages périmés ignorés
+        self.last_order: Dict[Tuple, int] = {}
+        self.sequence = 0
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self.stats = {
+            "submitted": 0,
+            "executed": 0,
+            "coalesced": 0,
+            "stale": 0,
+            "batches": 0,
+            "batch_size_max": 0
+        }
+    
+    def start(self):
+        """Démarrage du thread de vidage"""
+        self.running = True
+        self.thread = threading.Thread(target=self._flush_loop, name="bender-ha-coalescer",
+                                       daemon=True)
+        self.thread.start()
+    
+    def call(self, domain: str, service: str, entity_id: Optional[str] = None,
+             service_data: Optional[Dict] = None, order: Optional[int] = None) -> Optional[bool]:
+        """Appel de service (bloquant jusqu'à exécution de l'appel fusionné)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("coalesceur réservé au mode threads (appel bloquant)")
+        future: Future = Future()
+        order = order or time.time_ns()
+        # Réglage (données de service) : fusionnable ; simple allumage : immédiat
+        coalesced = ((domain, service) in COALESCED_SERVICES and entity_id is not None
+                     and bool(service_data))
+        
+        with self.condition:
+            self.stats["submitted"] += 1
+            if coalesced:
+                key = (domain, service, entity_id)
+            else:
+                self.sequence += 1
+                key = (domain, service, entity_id, self.sequence)
+            
+            pending = self.pending.get(key)
+            if pending is None:
+                delay = self.config.debounce_ms / 1000.0 if coalesced else 0.0
+                pending = _PendingCall(domain, service, entity_id, service_data, order,
+                                       time.monotonic() + delay, coalesced)
+                self.pending[key] = pending
+            else:
+                # Dernier écrivain : données du réglage le plus récent par-dessus
+                self.stats["coalesced"] += 1
+                if order >= pending.order:
+                    pending.data = {**(pending.data or {}), **(service_data or {})}
+                    pending.order = order
+                else:
+                    pending.data = {**(service_data or {}), **(pending.data or {})}
+            pending.waiters.append((future, order))
+            self.condition.notify()
+        
+        return future.result()
+    
+    def _flush_loop(self):
+        while True:
+            with self.condition:
+                while self.running:
+                    now = time.monotonic()
+                    due, deadlines = self._eligible(now)
+                    if due:
+                        break
+                    self.condition.wait(max(min(deadlines) - now, 0.001) if deadlines else None)
+                if not self.running:
+                    return
+                
+                batch = [self.pending.pop(key) for key in due]
+                for pending in batch:
+                    if pending.entity_id is not None:
+                        self.in_flight.add((pending.domain, pending.entity_id))
+                self.stats["batches"] += 1
+                self.stats["batch_size_max"] = max(self.stats["batch_size_max"], len(batch))
+            
+            for pending in batch:
+                self.pool.submit(self._execute, pending)
+    
+    def _eligible(self, now: float) -> Tuple[List[Tuple], List[float]]:
+        """(appels échus exécutables, échéances des autres) : par entité, seul le
+        plus ancien appel en attente est éligible, et seulement sans appel en vol"""
+        due, deadlines = [], []
+        busy = set(self.in_flight)
+        for key, pending in self.pending.items():
+            if pending.entity_id is not None:
+                entity = (pending.domain, pending.entity_id)
+                if entity in busy:
+                    continue
+                busy.add(entity)
+            if pending.deadline <= now:
+                due.append(key)
+            else:
+                deadlines.append(pending.deadline)
+        return due, deadlines
+    
+    def _execute(self, pending: _PendingCall):
+        call_key = (pending.domain, pending.service, pending.entity_id)
+        result = None
+        try:
+            stale = False
+            if pending.coalesced:
+                with self.condition:
+                    stale = pending.order < self.last_order.get(call_key, 0)
+                    if stale:
+                        self.stats["stale"] += 1
+            if not stale:
+                result = self.client.call_service(pending.domain, pending.service,
+                                                  pending.entity_id, pending.data)
+                with self.condition:
+                    self.stats["executed"] += 1
+                    if pending.coalesced:
+                        self.last_order[call_key] = pending.order
+        except Exception as e:
+            self.logger.error(f"Erreur appel groupé {pending.domain}.{pending.service}: {e}")
+            result = False
+        finally:
+            with self.condition:
+                self.in_flight.discard((pending.domain, pending.entity_id))
+                self.condition.notify()
+            
+            # Seul l'appelant le plus récent reçoit le résultat
+            for future, order in pending.waiters:
+                future.set_result(result if order == pending.order else None)
+    
+    def snapshot(self) -> Dict[str, int]:
+        """Compteurs, dont les appels HA économisés"""
+        with self.condition:
+            stats = dict(self.stats)
+        stats["saved"] = stats["submitted"] - stats["executed"]
+        return stats
+    
+    def stop(self, timeout: float = 5.0):
+        """Arrêt après exécution des appels en attente"""
+        with self.condition:
+            for pending in self.pending.values():
+                pending.deadline = 0.0
+            self.condition.notify()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.condition:
+                if not self.pending:
+                    break
+            time.sleep(0.01)
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+        self.pool.shutdown(wait=True)
+
+
 class IntentRouter:
     """Router principal pour les intents Bender"""
     
-    def __init__(self, ha_config: HAConfig, mqtt_config: MQTTConfig):
+    def __init__(self, ha_config: HAConfig, mqtt_config: MQTTConfig,
+                 dispatch_config: Optional[DispatchConfig] = None,
+                 speculation_config: Optional[SpeculationConfig] = None,
+                 coalescer_config: Optional[CoalescerConfig] = None,
+                 tts_cache_config: Optional[TTSCacheConfig] = None,
+                 outbox_config: Optional[OutboxConfig] = None,
+                 test_mode: bool = True):
         self.ha_config = ha_config
         self.mqtt_config = mqtt_config
+        self.speculation_config = speculation_config or SpeculationConfig()
         self.logger = logging.getLogger("bender.intent_router")
         
         # Mode test (désactiver HA temporairement)
-        self.test_mode = True
+        self.test_mode = test_mode
+        
+        # Latences par étape (histogrammes, percentiles publiés)
+        self.latency = MetricsRegistry()
+        
+        # Traces bout en bout (parole → action HA → TTS), budget domotique 1.5 s
+        self.trace_collector = TraceCollector(budget_ms=1500.0)
+        
+        # Commandes courantes reconnues localement (sans LLM)
+        self.fast_nlu = FastIntentMatcher(known_room=self.is_known_room)
+        
+        # Noms parlés → entity_id (index alimenté par le miroir HA)
+        self.entity_resolver = EntityResolver()
         
         # Clients
+        self.state_mirror = None
         if not self.test_mode:
-            self.ha_client = HomeAssistantClient(ha_config)
+            if ha_config.state_mirror:
+                self.state_mirror = HAStateMirror(ha_config, resolver=self.entity_resolver)
+            self.ha_client = HomeAssistantClient(ha_config, self.latency, self.state_mirror)
         else:
             self.logger.info("Mode test: Home Assistant désactivé")
             self.ha_client = None
             
         self.mqtt_client = mqtt.Client(client_id=mqtt_config.client_id)
+        self.codec = TopicCodec(mqtt_config.topic_formats)
+        
+        # Publications conservées pendant les coupures broker, rejouées à la reconnexion
+        self.outbox = MQTTOutbox(self.mqtt_client, outbox_config or OutboxConfig())
         
         # État
         self.connected = False
@@ -141,8 +645,36 @@ def __init__(self, ha_config: HAConfig, mqtt_config: MQTTConfig):
             "intents_processed": 0,
             "ha_commands_sent": 0,
             "errors": 0,
+            "fast_path_hits": 0,
+            "fast_path_misses": 0,
+            "speculations": 0,
+            "speculative_fired": 0,
+            "speculative_commits": 0,
+            "speculative_rollbacks": 0,
             "start_time": None
         }
+        self.stats_lock = threading.Lock()
+        
+        # Coalescence des réglages et appels HA groupés
+        coalescer_config = coalescer_config or CoalescerConfig()
+        self.coalescer = None
+        if self.ha_client is not None and coalescer_config.enabled:
+            self.coalescer = ServiceCallCoalescer(self.ha_client, coalescer_config)
+        
+        # Réponses TTS pré-rendues (Piper T630)
+        self.tts_cache_config = tts_cache_config or TTSCacheConfig()
+        self.tts_cache = None
+        if not self.test_mode and self.tts_cache_config.enabled:
+            self.tts_cache = self._create_tts_cache(self.tts_cache_config)
+        
+        # Exécution des intents hors du thread réseau paho
+        self.dispatcher = IntentDispatcher(dispatch_config or DispatchConfig(), self.latency)
+        
+        # Spéculation sur bender/asr/partial : énoncé → intent pressenti
+        self.speculations: Dict[str, Speculation] = {}
+        self.speculation_lock = threading.Lock()
+        self.finalized = deque(maxlen=32)
+        self.last_prewarm = 0.0
         
         # Configuration MQTT
         self.setup_mqtt()
@@ -160,6 +692,60 @@ def __init__(self, ha_config: HAConfig, mqtt_config: MQTTConfig):
             "unknown": self.handle_unknown_intent
         }
     
+    def _create_tts_cache(self, config: TTSCacheConfig) -> Optional[TTSPhraseCache]:
+        """Cache TTS disque, None si le répertoire est inutilisable"""
+        piper = WyomingPiperClient(config.piper_host, config.piper_port, config.voice_id)
+        try:
+            return TTSPhraseCache(config.cache_dir, config.voice_id,
+                                  config.max_mb * 1024 * 1024, render=piper.synthesize)
+        except OSError as e:
+            self.logger.warning(f"Cache TTS désactivé ({config.cache_dir}): {e}")
+            return None
+    
+    def tts_warm_phrases(self):
+        """Réponses prévisibles : gabarits × pièces connues × pourcentages"""
+        rooms = set(DEFAULT_ROOMS)
+        for area in self.entity_resolver.areas.values():
+            rooms.update(name.lower() for name in [area["name"]] + area["aliases"])
+        
+        for template in TTS_PHRASES.values():
+            if "{temp}" in template:
+                continue  # Valeur mesurée : non prévisible
+            if "{room}" in template:
+                for room in sorted(rooms):
+                    if "{percent}" in template:
+                        for percent in range(0, 101, 10):
+                            yield template.format(room=room, percent=percent)
+                    else:
+                        yield template.format(room=room)
+            elif "{percent}" in template:
+                for percent in range(0, 101, 10):
+                    yield template.format(percent=percent)
+            else:
+                yield template
+    
+    def _warm_tts_cache(self):
+        # Pièces du registre HA : attente du chargement par le miroir
+        deadline = time.monotonic() + 10.0
+        while (self.running and self.state_mirror is not None
+               and not self.entity_resolver.areas and time.monotonic() < deadline):
+            time.sleep(0.5)
+        self.tts_cache.warm(self.tts_warm_phrases())
+    
+    def _count(self, key: str, n: int = 1):
+        """Incrément thread-safe d'un compteur de stats"""
+        with self.stats_lock:
+            self.stats[key] += n
+    
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Copie cohérente des stats"""
+        with self.stats_lock:
+            return dict(self.stats)
+    
+    def _submit(self, key: Optional[str], coro_fn: Callable, *args, merge: bool = False) -> bool:
+        """Mise en file d'un traitement (coroutine) sur le dispatcher"""
+        return self.dispatcher.submit(key, run_sync, coro_fn, *args, merge=merge)
+    
     def setup_mqtt(self):
         """Configuration du client MQTT"""
         # Callbacks
@@ -185,10 +771,14 @@ def on_mqtt_connect(self, client, userdata, flags, rc):
                 (self.mqtt_config.topic_intent, 0),
                 (self.mqtt_config.topic_asr_final, 0)
             ]
+            if self.speculation_config.enabled:
+                topics.append((self.mqtt_config.topic_asr_partial, 0))
             
             for topic, qos in topics:
                 client.subscribe(topic, qos)
                 self.logger.info(f"Souscription à {topic}")
+            
+            self.outbox.on_connect()
                 
         else:
             self.connected = False
@@ -197,6 +787,7 @@ def on_mqtt_connect(self, client, userdata, flags, rc):
     def on_mqtt_disconnect(self, client, userdata, rc):
         """Callback déconnexion MQTT"""
         self.connected = False
+        self.outbox.on_disconnect()
         self.logger.warning(f"Déconnexion MQTT: code {rc}")
     
     def on_mqtt_message(self, client, userdata, msg):
@@ -208,224 +799,528 @@ def on_mqtt_message(self, client, userdata, msg):
             self.logger.debug(f"Message reçu sur {topic}: {payload}")
             
             if topic == self.mqtt_config.topic_intent:
-                self.process_intent(payload)
+                self.dispatch_intent(payload)
             elif topic == self.mqtt_config.topic_asr_final:
                 self.process_asr_result(payload)
+            elif topic == self.mqtt_config.topic_asr_partial:
+                self.process_asr_partial(payload)
                 
         except Exception as e:
             self.logger.error(f"Erreur traitement message MQTT: {e}")
-            self.stats["errors"] += 1
+            self._count("errors")
+    
+    def _parse_json(self, payload: str, kind: str) -> Optional[Dict]:
+        """Décodage JSON d'un payload (None et erreur comptée si invalide)"""
+        try:
+            data = json.loads(payload)
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Erreur parsing JSON {kind}: {e}")
+            self._count("errors")
+            return None
+        
+        if not isinstance(data, dict):
+            self.logger.error(f"Payload {kind} invalide: {payload}")
+            self._count("errors")
+            return None
+        return data
+    
+    def dispatch_intent(self, payload: str):
+        """Mise en file d'un intent : le thread réseau paho n'exécute rien"""
+        received_ns = time.time_ns()
+        intent_data = self._parse_json(payload, "intent")
+        if intent_data is None:
+            return
+        
+        key = self.intent_ordering_key(intent_data)
+        self._submit(key, self.execute_intent, intent_data, received_ns,
+                     merge=self.intent_mergeable(intent_data))
+    
+    def intent_ordering_key(self, intent_data: Dict) -> Optional[str]:
+        """Clé d'ordonnancement : intents d'une même ressource exécutés dans l'ordre"""
+        intent_name = intent_data.get("intent", "unknown")
+        entities = intent_data.get("entities", {}) or {}
+        
+        if intent_name in ("turn_on_light", "turn_off_light", "set_brightness"):
+            room = entities.get("room", "salon")
+            return self.resolve_entity("light", room) or f"light.{room}"
+        if intent_name in ("play_music", "stop_music", "set_volume"):
+            return "media_player.salon"
+        return None
+    
+    def intent_mergeable(self, intent_data: Dict) -> bool:
+        """Réglage fusionnable par le coalesceur : exécuté en parallèle des
+        réglages voisins de même clé, toujours après les intents précédents"""
+        return (self.coalescer is not None
+                and intent_data.get("intent") in ("set_brightness", "set_volume"))
     
     def process_intent(self, payload: str):
-        """Traitement d'un intent reçu"""
+        """Traitement synchrone d'un intent reçu"""
+        intent_data = self._parse_json(payload, "intent")
+        if intent_data is not None:
+            run_sync(self.execute_intent, intent_data)
+    
+    async def execute_intent(self, intent_data: Dict, received_ns: Optional[int] = None):
+        """Exécution d'un intent décodé (handler HA + réponse TTS)"""
+        with self.latency.timer("intent"):
+            await self._execute_intent(intent_data, received_ns)
+    
+    async def _execute_intent(self, intent_data: Dict, received_ns: Optional[int]):
+        trace = None
         try:
-            intent_data = json.loads(payload)
             intent_name = intent_data.get("intent", "unknown")
             entities = intent_data.get("entities", {})
             confidence = intent_data.get("confidence", 0.0)
             
+            # Contexte de trace propagé depuis le segment audio
+            trace = TraceContext.from_dict(intent_data.get("trace"))
+            if trace:
+                # Intent de la NLU locale : réception déjà marquée
+                if intent_data.get("source") != "fast_path":
+                    trace.mark("router_rx", received_ns)
+                if received_ns:
+                    trace.mark("dispatched")
+            _current_trace.set(trace)
+            _current_speculation.set(intent_data.get("speculation"))
+            _current_received_ns.set(received_ns)
+            
             self.logger.info(f"Intent reçu: {intent_name} (conf: {confidence:.2f})")
             
             # Seuil de confiance minimum
             if confidence < 0.5:
                 self.logger.warning(f"Confiance trop faible: {confidence:.2f}")
-                self.send_tts_response("Je n'ai pas bien compris, pouvez-vous répéter ?")
+                self.send_tts_response(TTS_PHRASES["not_understood"])
                 return
             
             # Routage vers le handler approprié
             handler = self.intent_handlers.get(intent_name, self.handle_unknown_intent)
-            handler(entities, confidence)
+            await handler(entities, confidence)
             
-            self.stats["intents_processed"] += 1
+            self._count("intents_processed")
             
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Erreur parsing JSON intent: {e}")
-            self.stats["errors"] += 1
         except Exception as e:
             self.logger.error(f"Erreur traitement intent: {e}")
-            self.stats["errors"] += 1
+            self._count("errors")
+        finally:
+            _current_trace.set(None)
+            _current_speculation.set(None)
+            _current_received_ns.set(None)
+            if trace:
+                self.trace_collector.record(trace)
     
     def process_asr_result(self, payload: str):
-        """Traitement d'un résultat ASR final"""
+        """Traitement d'un résultat ASR final : NLU locale, sinon relais LLM"""
+        received_ns = time.time_ns()
+        asr_data = self._parse_json(payload, "ASR")
+        if asr_data is None:
+            return
+        
+        text = asr_data.get("text", "")
+        confidence = asr_data.get("confidence", 0.0)
+        self.logger.info(f"ASR final: '{text}' (conf: {confidence:.2f})")
+        
+        # Log pour debug
+        self.publish_log(f"ASR: {text} ({confidence:.2f})")
+        
+        self._expire_speculations()
+        utterance = self._utterance_key(asr_data)
+        with self.speculation_lock:
+            speculation = self.speculations.pop(utterance, None)
+            if utterance != "current":
+                self.finalized.append(utterance)
+        
+        with self.latency.timer("fast_nlu"):
+            intent_data = self.fast_nlu.match(text)
+        
+        # Réconciliation avec l'intent pressenti sur les partiels
+        if speculation is not None and speculation.started:
+            if intent_data is not None and self._signature(intent_data) == speculation.signature:
+                intent_data["speculation"] = speculation
+            else:
+                self._submit(self.intent_ordering_key(speculation.intent_data),
+                             self.rollback_speculation, speculation)
+        
+        trace = TraceContext.from_dict(asr_data.get("trace"))
+        if intent_data is not None:
+            self._count("fast_path_hits")
+            if trace:
+                trace.mark("router_rx", received_ns)
+                trace.mark("fast_nlu")
+                intent_data["trace"] = trace.to_dict()
+            key = self.intent_ordering_key(intent_data)
+            self._submit(key, self.execute_intent, intent_data, received_ns,
+                         merge=self.intent_mergeable(intent_data))
+            return
+        
+        # Non reconnue : interprétation par le LLM (hôte T630)
+        self._count("fast_path_misses")
+        if trace:
+            trace.mark("nlu_forward", received_ns)
+            asr_data["trace"] = trace.to_dict()
         try:
-            asr_data = json.loads(payload)
-            text = asr_data.get("text", "")
-            confidence = asr_data.get("confidence", 0.0)
+            self.publish(self.mqtt_config.topic_nlu_request, asr_data)
+        except Exception as e:
+            self.logger.error(f"Erreur relais NLU: {e}")
+    
+    # Spéculation sur les transcriptions partielles
+    def _utterance_key(self, asr_data: Dict) -> str:
+        """Identifiant d'énoncé commun aux partiels et au final"""
+        trace = asr_data.get("trace")
+        if isinstance(trace, dict) and trace.get("id"):
+            return str(trace["id"])
+        return str(asr_data.get("segment_id", "current"))
+    
+    @staticmethod
+    def _signature(intent_data: Dict) -> Tuple:
+        return (intent_data["intent"], tuple(sorted(intent_data["entities"].items())))
+    
+    def process_asr_partial(self, payload: str):
+        """Transcription partielle : spéculation quand l'intent reste stable"""
+        asr_data = self._parse_json(payload, "ASR partiel")
+        if asr_data is None:
+            return
+        self._expire_speculations()
+        
+        utterance = self._utterance_key(asr_data)
+        if utterance in self.finalized:
+            return
+        
+        config = self.speculation_config
+        with self.latency.timer("fast_nlu"):
+            intent_data = self.fast_nlu.match(asr_data.get("text", ""))
+        
+        with self.speculation_lock:
+            speculation = self.speculations.get(utterance)
+            if speculation is not None and speculation.started:
+                return  # Déjà lancée : réconciliation au final
             
-            self.logger.info(f"ASR final: '{text}' (conf: {confidence:.2f})")
+            if intent_data is None or asr_data.get("confidence", 0.0) < config.min_confidence:
+                if speculation is not None:
+                    speculation.stable = 0
+                return
             
-            # Log pour debug
-            self.publish_log(f"ASR: {text} ({confidence:.2f})")
+            signature = self._signature(intent_data)
+            if speculation is None or speculation.signature != signature:
+                speculation = Speculation(utterance, intent_data, signature)
+                self.speculations[utterance] = speculation
+            else:
+                speculation.stable += 1
             
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Erreur parsing JSON ASR: {e}")
+            if speculation.stable < config.stable_partials:
+                return
+            speculation.started = True
+        
+        self._count("speculations")
+        self._submit(self.intent_ordering_key(intent_data), self.speculate, speculation)
+    
+    async def speculate(self, speculation: Speculation):
+        """Préparation de l'intent pressenti : entité résolue, connexion HA
+        chaude, voire action idempotente déjà déclenchée"""
+        intent_name = speculation.intent_data["intent"]
+        room = speculation.intent_data["entities"].get("room", "salon")
+        
+        if intent_name in EARLY_INTENTS or intent_name == "set_brightness":
+            speculation.entity_id = self.resolve_entity("light", room)
+        elif intent_name == "get_temperature":
+            speculation.entity_id = self.resolve_entity("sensor", room, hint="temperature")
+        
+        if self.ha_client is None:
+            return
+        
+        if (self.speculation_config.execute_early and intent_name in EARLY_INTENTS
+                and speculation.entity_id):
+            domain, service = EARLY_INTENTS[intent_name]
+            prior = await self.ha_state(speculation.entity_id)
+            speculation.prior_state = prior.get("state") if prior else None
+            speculation.call = (domain, service, speculation.entity_id)
+            speculation.result = await self.ha_call(domain, service, speculation.entity_id)
+            self._count("speculative_fired")
+        elif intent_name == "get_temperature" and speculation.entity_id:
+            await self.ha_state(speculation.entity_id)
+        elif time.monotonic() - self.last_prewarm > 5.0:
+            # Connexion keep-alive rouverte avant l'appel réel
+            self.last_prewarm = time.monotonic()
+            await self.ha_ping()
+    
+    async def rollback_speculation(self, speculation: Speculation):
+        """Annulation d'une action spéculative démentie par le final"""
+        if speculation.call is None or not speculation.result:
+            return
+        
+        domain, service, entity_id = speculation.call
+        speculation.call = None
+        self._count("speculative_rollbacks")
+        
+        restore = {"on": "turn_on", "off": "turn_off"}.get(speculation.prior_state)
+        if restore is None:
+            self.logger.warning(f"Spéculation annulée, état antérieur de {entity_id} inconnu")
+        elif restore != service:
+            self.logger.info(f"Spéculation annulée: {domain}.{restore} sur {entity_id}")
+            await self.ha_call(domain, restore, entity_id)
+    
+    def _expire_speculations(self):
+        """Spéculations sans final après ttl_s : annulées"""
+        now = time.monotonic()
+        with self.speculation_lock:
+            expired = [speculation for speculation in self.speculations.values()
+                       if now - speculation.created > self.speculation_config.ttl_s]
+            for speculation in expired:
+                del self.speculations[speculation.key]
+        
+        for speculation in expired:
+            if speculation.started:
+                self._submit(self.intent_ordering_key(speculation.intent_data),
+                             self.rollback_speculation, speculation)
+    
+    # Accès HA : clients synchrones (mode threads), redéfinis par le runtime asyncio
+    async def ha_call(self, domain: str, service: str, entity_id: Optional[str] = None,
+                      service_data: Optional[Dict] = None) -> bool:
+        return self.ha_client.call_service(domain, service, entity_id, service_data)
+    
+    async def ha_state(self, entity_id: str) -> Optional[Dict]:
+        return self.ha_client.get_state(entity_id)
+    
+    async def ha_ping(self) -> bool:
+        return self.ha_client.test_connection(log=False)
+    
+    async def call_service(self, domain: str, service: str,
+                           entity_id: Optional[str] = None,
+                           service_data: Optional[Dict] = None) -> Optional[bool]:
+        """Appel de service HA ; l'appel identique déjà fait par spéculation est
+        repris. None : réglage remplacé par un plus récent (pas de réponse)"""
+        speculation = _current_speculation.get()
+        if (speculation is not None and speculation.result and service_data is None
+                and speculation.call == (domain, service, entity_id)):
+            speculation.call = None
+            self._count("speculative_commits")
+            trace = _current_trace.get()
+            if trace:
+                trace.mark("speculative_commit")
+            return True
+        if self.coalescer is not None:
+            order = _current_received_ns.get()
+            return self.coalescer.call(domain, service, entity_id, service_data, order)
+        return await self.ha_call(domain, service, entity_id, service_data)
+    
+    def is_known_room(self, name: str) -> bool:
+        """Nom désignant une lumière ou une pièce connue (gabarits sans objet de la NLU)"""
+        if not len(self.entity_resolver):
+            # Sans index (mode test, HA injoignable) : pièces par défaut
+            return " ".join(normalize(name)) in {" ".join(normalize(room)) for room in DEFAULT_ROOMS}
+        return self.entity_resolver.resolve(name, "light") is not None
+    
+    def resolve_entity(self, domain: str, name: str,
+                       hint: Optional[str] = None) -> Optional[str]:
+        """entity_id d'un nom parlé ; sans index (mode test, HA injoignable)
+        ancien format `domain.nom`"""
+        if not len(self.entity_resolver):
+            suffix = f"{hint}_{name}" if hint else name
+            return f"{domain}.{suffix.replace(' ', '_')}"
+        with self.latency.timer("resolve"):
+            return self.entity_resolver.resolve(name, domain, hint)
     
     # Handlers d'intents
-    def handle_light_on(self, entities: Dict, confidence: float):
+    async def handle_light_on(self, entities: Dict, confidence: float):
         """Allumer une lumière"""
         room = entities.get("room", "salon")
-        entity_id = f"light.{room}"
+        entity_id = self.resolve_entity("light", room)
+        if entity_id is None:
+            self.send_tts_response(TTS_PHRASES["light_not_found"].format(room=room))
+            return
         
-        if self.ha_client.call_service("light", "turn_on", entity_id):
-            self.send_tts_response(f"J'allume la lumière du {room}")
-            self.stats["ha_commands_sent"] += 1
+        if await self.call_service("light", "turn_on", entity_id):
+            self.send_tts_response(TTS_PHRASES["light_on"].format(room=room))
+            self._count("ha_commands_sent")
         else:
-            self.send_tts_response(f"Impossible d'allumer la lumière du {room}")
+            self.send_tts_response(TTS_PHRASES["light_on_failed"].format(room=room))
     
-    def handle_light_off(self, entities: Dict, confidence: float):
+    async def handle_light_off(self, entities: Dict, confidence: float):
         """Éteindre une lumière"""
         room = entities.get("room", "salon")
-        entity_id = f"light.{room}"
+        entity_id = self.resolve_entity("light", room)
+        if entity_id is None:
+            self.send_tts_response(TTS_PHRASES["light_not_found"].format(room=room))
+            return
         
-        if self.ha_client.call_service("light", "turn_off", entity_id):
-            self.send_tts_response(f"J'éteins la lumière du {room}")
-            self.stats["ha_commands_sent"] += 1
+        if await self.call_service("light", "turn_off", entity_id):
+            self.send_tts_response(TTS_PHRASES["light_off"].format(room=room))
+            self._count("ha_commands_sent")
         else:
-            self.send_tts_response(f"Impossible d'éteindre la lumière du {room}")
+            self.send_tts_response(TTS_PHRASES["light_off_failed"].format(room=room))
     
-    def handle_brightness(self, entities: Dict, confidence: float):
+    async def handle_brightness(self, entities: Dict, confidence: float):
         """Régler la luminosité"""
         room = entities.get("room", "salon")
         brightness = entities.get("brightness", 50)
-        entity_id = f"light.{room}"
+        entity_id = self.resolve_entity("light", room)
+        if entity_id is None:
+            self.send_tts_response(TTS_PHRASES["light_not_found"].format(room=room))
+            return
         
         # Conversion pourcentage vers valeur HA (0-255)
         brightness_value = int(brightness * 255 / 100)
         
         service_data = {"brightness": brightness_value}
         
-        if self.ha_client.call_service("light", "turn_on", entity_id, service_data):
-            self.send_tts_response(f"Luminosité du {room} réglée à {brightness}%")
-            self.stats["ha_commands_sent"] += 1
+        ok = await self.call_service("light", "turn_on", entity_id, service_data)
+        if ok is None:
+            return
+        if ok:
+            self.send_tts_response(TTS_PHRASES["brightness_set"].format(room=room, percent=brightness))
+            self._count("ha_commands_sent")
         else:
-            self.send_tts_response(f"Impossible de régler la luminosité du {room}")
+            self.send_tts_response(TTS_PHRASES["brightness_failed"].format(room=room))
     
-    def handle_get_temperature(self, entities: Dict, confidence: float):
+    async def handle_get_temperature(self, entities: Dict, confidence: float):
         """Obtenir la température"""
         room = entities.get("room", "salon")
-        entity_id = f"sensor.temperature_{room}"
+        entity_id = self.resolve_entity("sensor", room, hint="temperature")
+        if entity_id is None:
+            self.send_tts_response(TTS_PHRASES["sensor_not_found"].format(room=room))
+            return
         
-        state = self.ha_client.get_state(entity_id)
+        state = await self.ha_state(entity_id)
         if state:
             temp = state.get("state", "inconnue")
             unit = state.get("attributes", {}).get("unit_of_measurement", "°C")
-            self.send_tts_response(f"La température du {room} est de {temp} {unit}")
+            self.send_tts_response(TTS_PHRASES["temperature"].format(room=room, temp=temp, unit=unit))
         else:
-            self.send_tts_response(f"Impossible d'obtenir la température du {room}")
+            self.send_tts_response(TTS_PHRASES["temperature_failed"].format(room=room))
     
-    def handle_get_status(self, entities: Dict, confidence: float):
+    async def handle_get_status(self, entities: Dict, confidence: float):
         """Obtenir le statut du système"""
-        uptime = time.time() - (self.stats["start_time"] or time.time())
+        stats = self.stats_snapshot()
+        uptime = time.time() - (stats["start_time"] or time.time())
         uptime_str = f"{int(uptime // 3600)}h{int((uptime % 3600) // 60)}m"
         
         response = f"Système opérationnel depuis {uptime_str}. "
-        response += f"{self.stats['intents_processed']} intents traités, "
-        response += f"{self.stats['ha_commands_sent']} commandes envoyées."
+        response += f"{stats['intents_processed']} intents traités, "
+        response += f"{stats['ha_commands_sent']} commandes envoyées."
         
         self.send_tts_response(response)
     
-    def handle_play_music(self, entities: Dict, confidence: float):
+    async def handle_play_music(self, entities: Dict, confidence: float):
         """Lancer la musique"""
-        if self.ha_client.call_service("media_player", "media_play", "media_player.salon"):
-            self.send_tts_response("Je lance la musique")
-            self.stats["ha_commands_sent"] += 1
+        if await self.call_service("media_player", "media_play", "media_player.salon"):
+            self.send_tts_response(TTS_PHRASES["music_play"])
+            self._count("ha_commands_sent")
         else:
-            self.send_tts_response("Impossible de lancer la musique")
+            self.send_tts_response(TTS_PHRASES["music_play_failed"])
     
-    def handle_stop_music(self, entities: Dict, confidence: float):
+    async def handle_stop_music(self, entities: Dict, confidence: float):
         """Arrêter la musique"""
-        if self.ha_client.call_service("media_player", "media_stop", "media_player.salon"):
-            self.send_tts_response("J'arrête la musique")
-            self.stats["ha_commands_sent"] += 1
+        if await self.call_service("media_player", "media_stop", "media_player.salon"):
+            self.send_tts_response(TTS_PHRASES["music_stop"])
+            self._count("ha_commands_sent")
         else:
-            self.send_tts_response("Impossible d'arrêter la musique")
+            self.send_tts_response(TTS_PHRASES["music_stop_failed"])
     
-    def handle_set_volume(self, entities: Dict, confidence: float):
+    async def handle_set_volume(self, entities: Dict, confidence: float):
         """Régler le volume"""
         volume = entities.get("volume", 50)
         volume_level = volume / 100.0
         
         service_data = {"volume_level": volume_level}
         
-        if self.ha_client.call_service("media_player", "volume_set", 
-                                     "media_player.salon", service_data):
-            self.send_tts_response(f"Volume réglé à {volume}%")
-            self.stats["ha_commands_sent"] += 1
+        ok = await self.call_service("media_player", "volume_set", "media_player.salon", service_data)
+        if ok is None:
+            return
+        if ok:
+            self.send_tts_response(TTS_PHRASES["volume_set"].format(percent=volume))
+            self._count("ha_commands_sent")
         else:
-            self.send_tts_response(f"Impossible de régler le volume")
+            self.send_tts_response(TTS_PHRASES["volume_failed"])
     
-    def handle_unknown_intent(self, entities: Dict, confidence: float):
+    async def handle_unknown_intent(self, entities: Dict, confidence: float):
         """Intent non reconnu"""
-        self.send_tts_response("Je ne sais pas comment faire cela")
+        self.send_tts_response(TTS_PHRASES["unknown"])
     
     def send_tts_response(self, text: str):
-        """Envoyer une réponse TTS"""
+        """Envoyer une réponse TTS (mise en file si le broker est injoignable)"""
         if not self.connected:
-            self.logger.warning("MQTT non connecté, impossible d'envoyer TTS")
-            return
+            self.logger.warning("MQTT non connecté, TTS mis en file")
         
         tts_data = {
             "text": text,
-            "timestamp": datetime.now().isoformat(),
+            "ts_ns": now_ns(),
             "source": "intent_router"
         }
         
+        # Indication de cache : lecture immédiate du WAV local sur hit
+        if self.tts_cache is not None:
+            key, path = self.tts_cache.lookup(text)
+            tts_data["cache"] = {"key": key, "hit": path is not None,
+                                 "voice": self.tts_cache.voice_id}
+            if path is not None:
+                tts_data["cache"]["path"] = path
+        
+        # Trace de l'intent en cours : l'action HA est exécutée à ce stade
+        trace = _current_trace.get()
+        if trace:
+            trace.mark("tts_sent")
+            tts_data["trace"] = trace.to_dict()
+        
         try:
-            self.mqtt_client.publish(
-                self.mqtt_config.topic_tts_say,
-                json.dumps(tts_data),
-                qos=0
-            )
+            with self.latency.timer("tts_publish"):
+                self.publish(self.mqtt_config.topic_tts_say, tts_data)
             self.logger.info(f"TTS envoyé: {text}")
             
         except Exception as e:
             self.logger.error(f"Erreur envoi TTS: {e}")
     
+    def publish(self, topic: str, message: Dict):
+        """Publication d'un message (formats du topic, via la file persistante)"""
+        for target, payload in self.codec.outputs(topic, message):
+            self.outbox.publish(target, payload)
+    
     def publish_metrics(self):
         """Publier les métriques système"""
         if not self.connected:
             return
         
-        # Test connectivité HA (seulement si pas en mode test)
+        # Connectivité HA : heartbeat du miroir WebSocket, sinon test REST
         ha_connected = False
-        if not self.test_mode and self.ha_client:
+        if self.state_mirror is not None:
+            ha_connected = self.state_mirror.is_alive()
+        elif not self.test_mode and self.ha_client:
             ha_connected = self.ha_client.test_connection()
-        
+        self._publish_metrics(ha_connected)
+    
+    def _publish_metrics(self, ha_connected: bool):
         metrics = {
-            **self.stats,
-            "timestamp": datetime.now().isoformat(),
+            **self.stats_snapshot(),
+            "ts_ns": now_ns(),
             "ha_connected": ha_connected,
-            "mqtt_connected": self.connected
+            "mqtt_connected": self.connected,
+            "component": "intent_router",
+            "latency": self.latency.snapshot(),
+            "traces": self.trace_collector.snapshot(),
+            "dispatch": self.dispatcher.snapshot()
         }
+        if self.coalescer is not None:
+            metrics["coalescer"] = self.coalescer.snapshot()
+        if self.tts_cache is not None:
+            metrics["tts_cache"] = self.tts_cache.snapshot()
+        metrics["outbox"] = self.outbox.snapshot()
+        if self.state_mirror is not None:
+            metrics["ha_mirror"] = dict(self.state_mirror.stats)
         
         try:
-            self.mqtt_client.publish(
-                self.mqtt_config.topic_sys_metrics,
-                json.dumps(metrics),
-                qos=0
-            )
+            self.publish(self.mqtt_config.topic_sys_metrics, metrics)
             
         except Exception as e:
             self.logger.error(f"Erreur publication métriques: {e}")
     
     def publish_log(self, message: str, level: str = "info"):
         """Publier un log via MQTT"""
-        if not self.connected:
-            return
-        
         log_data = {
             "message": message,
             "level": level,
-            "timestamp": datetime.now().isoformat(),
+            "ts_ns": now_ns(),
             "component": "intent_router"
         }
         
         try:
-            self.mqtt_client.publish(
-                self.mqtt_config.topic_sys_log,
-                json.dumps(log_data),
-                qos=0
-            )
+            self.publish(self.mqtt_config.topic_sys_log, log_data)
             
         except Exception as e:
             self.logger.error(f"Erreur publication log: {e}")
@@ -442,6 +1337,15 @@ def start(self):
         else:
             self.logger.info("Mode test: connexion Home Assistant ignorée")
         
+        # Miroir d'états HA (WebSocket)
+        if self.state_mirror is not None:
+            self.state_mirror.start()
+        
+        # Workers d'exécution des intents (avant réception des messages)
+        if self.coalescer is not None:
+            self.coalescer.start()
+        self.dispatcher.start()
+        
         # Connexion MQTT (seulement si pas en mode test)
         if not self.test_mode:
             try:
@@ -472,7 +1376,12 @@ def start(self):
             self.connected = True  # Simuler la connexion en mode test
         
         self.running = True
-        self.stats["start_time"] = time.time()
+        with self.stats_lock:
+            self.stats["start_time"] = time.time()
+        
+        # Préchauffage du cache TTS (rendu Piper en tâche de fond)
+        if self.tts_cache is not None and self.tts_cache_config.warm_on_start:
+            threading.Thread(target=self._warm_tts_cache, daemon=True).start()
         
         # Thread pour les métriques périodiques
         metrics_thread = threading.Thread(target=self.metrics_loop, daemon=True)
@@ -491,6 +1400,17 @@ def stop(self):
             self.mqtt_client.loop_stop()
             self.mqtt_client.disconnect()
         
+        self.dispatcher.stop()
+        
+        if self.coalescer is not None:
+            self.coalescer.stop()
+        
+        if self.state_mirror is not None:
+            self.state_mirror.stop()
+        
+        # Réponses encore en file : sauvegardées sur disque (si configuré)
+        self.outbox.stop()
+        
         self.logger.info("Router d'intents arrêté")
     
     def metrics_loop(self):
@@ -504,9 +1424,8 @@ def metrics_loop(self):
                 time.sleep(5)
 
 
-def main():
-    """Point d'entrée principal"""
-    # Configuration du logging
+def setup_logging():
+    """Configuration du logging (console + fichier)"""
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -515,10 +1434,10 @@ def main():
             logging.FileHandler('/opt/bender/logs/intent_router.log')
         ]
     )
-    
-    logger = logging.getLogger("bender.intent_router")
-    
-    # Configuration (à terme depuis .env.local)
+
+
+def default_configs() -> Tuple[HAConfig, MQTTConfig, OutboxConfig]:
+    """Configuration (à terme depuis .env.local)"""
     ha_config = HAConfig(
         base_url="http://192.168.1.138:8123",
         token=""  # À configurer
@@ -530,8 +1449,19 @@ def main():
         password=""  # À configurer
     )
     
+    # File de publication : débordement disque, conservée entre redémarrages
+    outbox_config = OutboxConfig(spill_path="/opt/bender/cache/mqtt_outbox.jsonl")
+    return ha_config, mqtt_config, outbox_config
+
+
+def main():
+    """Point d'entrée principal"""
+    setup_logging()
+    logger = logging.getLogger("bender.intent_router")
+    ha_config, mqtt_config, outbox_config = default_configs()
+    
     # Création et démarrage du router
-    router = IntentRouter(ha_config, mqtt_config)
+    router = IntentRouter(ha_config, mqtt_config, outbox_config=outbox_config)
     
     try:
         if router.start():
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Runtime asyncio du router d'intents Bender
+
+Une seule boucle asyncio remplace les threads du mode classique (boucle
+réseau paho, workers du dispatcher, thread du miroir HA, thread des
+métriques, boucle time.sleep du main) :
+
+- MQTT : client paho piloté par la boucle (add_reader/add_writer),
+  reconnexion avec backoff
+- Home Assistant : AsyncHomeAssistantClient (ha_async), miroir d'états
+  exécuté sur la même boucle
+- Intents : tâches asyncio, ordre conservé par ressource, concurrence
+  et délestage selon DispatchConfig
+- Métriques : tâche périodique à cadence fixe, annulée à l'arrêt
+
+Handlers, NLU locale, spéculation et file de publication sont ceux
+d'IntentRouter. Le coalesceur de réglages (thread de fusion) reste
+propre au mode classique.
+
+Usage : python3 intent_router_async.py
+"""
+
+import asyncio
+import logging
+import signal
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set
+
+import paho.mqtt.client as mqtt
+
+from bender_metrics import MetricsRegistry
+from ha_async import AsyncHomeAssistantClient
+from intent_router import (
+    CoalescerConfig, DispatchConfig, HAConfig, IntentRouter, MQTTConfig,
+    SpeculationConfig, TTSCacheConfig, default_configs, setup_logging
+)
+from mqtt_outbox import OutboxConfig
+
+
+class AsyncMQTTClient:
+    """Client paho piloté par une boucle asyncio (pas de thread réseau)
+
+    La socket est surveillée par la boucle (loop_read/loop_write), la
+    maintenance paho (keepalive, PINGREQ) tourne toutes les
+    `misc_interval` s. Les callbacks paho du client (on_connect,
+    on_message...) sont appelés sur la boucle.
+    """
+
+    def __init__(self, client: mqtt.Client, misc_interval: float = 5.0):
+        self.client = client
+        self.misc_interval = misc_interval
+        self.logger = logging.getLogger("bender.mqtt_async")
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: Optional[int] = None
+        self.misc_task: Optional[asyncio.Task] = None
+        self.supervisor: Optional[asyncio.Task] = None
+        self.closed = asyncio.Event()
+
+        client.on_socket_open = self._on_socket_open
+        client.on_socket_close = self._on_socket_close
+        client.on_socket_register_write = self._on_socket_register_write
+        client.on_socket_unregister_write = self._on_socket_unregister_write
+
+    def _on_loop(self, fn: Callable, *args):
+        # connect() s'exécute dans l'exécuteur : callbacks socket rapatriés sur la boucle
+        if threading.get_ident() == self.loop_thread:
+            fn(*args)
+        else:
+            self.loop.call_soon_threadsafe(fn, *args)
+
+    def _on_socket_open(self, client, userdata, sock):
+        self._on_loop(self._socket_opened, sock)
+
+    def _socket_opened(self, sock):
+        self.loop.add_reader(sock, self.client.loop_read)
+        self.misc_task = self.loop.create_task(self._misc_loop())
+
+    def _on_socket_close(self, client, userdata, sock):
+        self._on_loop(self._socket_closed, sock)
+
+    def _socket_closed(self, sock):
+        self.loop.remove_reader(sock)
+        if self.misc_task is not None:
+            self.misc_task.cancel()
+            self.misc_task = None
+        self.closed.set()
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        self._on_loop(self.loop.add_writer, sock, self.client.loop_write)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        self._on_loop(self.loop.remove_writer, sock)
+
+    async def _misc_loop(self):
+        while self.client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+            await asyncio.sleep(self.misc_interval)
+
+    def start(self, host: str, port: int, keepalive: int = 60):
+        """Connexion en tâche de fond, reconnexion tant que non arrêté"""
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self.supervisor = self.loop.create_task(self._run(host, port, keepalive))
+
+    async def _run(self, host: str, port: int, keepalive: int):
+        backoff = 1.0
+        while True:
+            self.closed.clear()
+            try:
+                # Connexion TCP bloquante (délai borné par paho) hors de la boucle
+                await self.loop.run_in_executor(None, self.client.connect, host, port, keepalive)
+            except OSError as e:
+                self.logger.warning(f"Broker MQTT injoignable: {e}")
+            else:
+                await self.closed.wait()
+                backoff = 1.0
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def stop(self, timeout: float = 2.0):
+        """Arrêt de la reconnexion puis DISCONNECT"""
+        if self.supervisor is not None:
+            self.supervisor.cancel()
+            await asyncio.gather(self.supervisor, return_exceptions=True)
+            self.supervisor = None
+        if self.client.is_connected():
+            self.client.disconnect()
+            try:
+                await asyncio.wait_for(self.closed.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning("Déconnexion MQTT non confirmée")
+
+
+class AsyncIntentDispatcher:
+    """Exécution des intents en tâches asyncio
+
+    Même contrat qu'IntentDispatcher : une clé d'ordonnancement sérialise
+    les tâches d'une ressource, `workers` tâches au plus en parallèle,
+    au-delà de workers × queue_size tâches en attente délestage selon
+    `shed_policy`.
+    """
+
+    def __init__(self, config: DispatchConfig, latency: MetricsRegistry):
+        self.config = config
+        self.latency = latency
+        self.logger = logging.getLogger("bender.intent_dispatch")
+        self.limit = config.workers * config.queue_size
+        self.semaphore = asyncio.Semaphore(config.workers)
+        # Dernière tâche par clé, tâches non démarrées par ordre d'arrivée
+        self.tails: Dict[str, asyncio.Task] = {}
+        self.waiting: "OrderedDict[asyncio.Task, None]" = OrderedDict()
+        self.tasks: Set[asyncio.Task] = set()
+        self.stats = {
+            "dispatched": 0,
+            "shed": 0,
+            "queue_depth_max": 0
+        }
+
+    def start(self):
+        """Rien à démarrer : tâches créées à la soumission"""
+
+    def submit(self, key: Optional[str], coro_fn: Callable, *args, merge: bool = False) -> bool:
+        """Crée la tâche d'exécution, False si délestée (`merge` ignoré : pas de coalesceur)"""
+        if len(self.waiting) >= self.limit:
+            self.stats["shed"] += 1
+            if self.config.shed_policy != "drop_oldest":
+                self.logger.warning(f"File intents pleine, intent abandonné ({key})")
+                return False
+            oldest, _ = self.waiting.popitem(last=False)
+            oldest.cancel()
+            self.logger.warning(f"File intents pleine, intent le plus ancien abandonné ({key})")
+
+        previous = self.tails.get(key) if key is not None else None
+        task = asyncio.get_running_loop().create_task(
+            self._run(previous, time.perf_counter_ns(), coro_fn, args))
+        # Nettoyage au rappel de fin : une tâche annulée avant démarrage n'exécute rien
+        task.add_done_callback(lambda done: self._finished(key, done))
+        self.tasks.add(task)
+        self.waiting[task] = None
+        if key is not None:
+            self.tails[key] = task
+
+        self.stats["dispatched"] += 1
+        if len(self.waiting) > self.stats["queue_depth_max"]:
+            self.stats["queue_depth_max"] = len(self.waiting)
+        return True
+
+    async def _run(self, previous: Optional[asyncio.Task], enqueued_ns: int,
+                   coro_fn: Callable, args):
+        if previous is not None:
+            await asyncio.wait((previous,))
+        async with self.semaphore:
+            self.waiting.pop(asyncio.current_task(), None)
+            self.latency.record("dispatch_wait", time.perf_counter_ns() - enqueued_ns)
+            try:
+                await coro_fn(*args)
+            except Exception as e:
+                self.logger.error(f"Erreur tâche intent: {e}")
+
+    def _finished(self, key: Optional[str], task: asyncio.Task):
+        self.waiting.pop(task, None)
+        self.tasks.discard(task)
+        if key is not None and self.tails.get(key) is task:
+            del self.tails[key]
+
+    def queue_depth(self) -> int:
+        """Nombre de tâches en attente"""
+        return len(self.waiting)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Métriques de contre-pression"""
+        return {**self.stats, "queue_depth": self.queue_depth()}
+
+    async def stop(self, timeout: float = 5.0):
+        """Fin des tâches en cours (annulées au-delà de `timeout`)"""
+        if not self.tasks:
+            return
+        _, pending = await asyncio.wait(set(self.tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+class AsyncIntentRouter(IntentRouter):
+    """Router d'intents sur une boucle asyncio unique
+
+    Cycle de vie : `await router.run()` jusqu'à `request_stop()`.
+    """
+
+    def __init__(self, ha_config: HAConfig, mqtt_config: MQTTConfig,
+                 dispatch_config: Optional[DispatchConfig] = None,
+                 speculation_config: Optional[SpeculationConfig] = None,
+                 tts_cache_config: Optional[TTSCacheConfig] = None,
+                 outbox_config: Optional[OutboxConfig] = None,
+                 test_mode: bool = True,
+                 metrics_interval: float = 30.0):
+        super().__init__(ha_config, mqtt_config,
+                         dispatch_config=dispatch_config,
+                         speculation_config=speculation_config,
+                         coalescer_config=CoalescerConfig(enabled=False),
+                         tts_cache_config=tts_cache_config,
+                         outbox_config=outbox_config,
+                         test_mode=test_mode)
+        self.metrics_interval = metrics_interval
+
+        if self.ha_client is not None:
+            self.ha_client = AsyncHomeAssistantClient(ha_config, latency=self.latency)
+        self.dispatcher = AsyncIntentDispatcher(dispatch_config or DispatchConfig(), self.latency)
+        self.mqtt = AsyncMQTTClient(self.mqtt_client)
+
+        self.tasks: List[asyncio.Task] = []
+        self.mqtt_ready = asyncio.Event()
+        self.stop_event = asyncio.Event()
+
+    def _submit(self, key: Optional[str], coro_fn: Callable, *args, merge: bool = False) -> bool:
+        return self.dispatcher.submit(key, coro_fn, *args, merge=merge)
+
+    # Accès HA asynchrone (miroir local d'abord pour les états)
+    async def ha_call(self, domain: str, service: str, entity_id: Optional[str] = None,
+                      service_data: Optional[Dict] = None) -> bool:
+        return await self.ha_client.call_service(domain, service, entity_id, service_data)
+
+    async def ha_state(self, entity_id: str) -> Optional[Dict]:
+        if self.state_mirror is not None:
+            state = self.state_mirror.get_state(entity_id)
+            if state is not None:
+                return state
+        state = await self.ha_client.get_state(entity_id)
+        if state is not None and self.state_mirror is not None:
+            self.state_mirror.update_state(state)
+        return state
+
+    async def ha_ping(self) -> bool:
+        return await self.ha_client.test_connection(log=False)
+
+    def on_mqtt_connect(self, client, userdata, flags, rc):
+        """Callback connexion MQTT (sur la boucle)"""
+        super().on_mqtt_connect(client, userdata, flags, rc)
+        if rc == 0:
+            self.mqtt_ready.set()
+
+    def _spawn(self, coro, name: str):
+        self.tasks.append(asyncio.get_running_loop().create_task(coro, name=f"bender-{name}"))
+
+    async def start_async(self) -> bool:
+        """Démarrer le router sur la boucle courante"""
+        self.logger.info("Démarrage du router d'intents Bender (asyncio)...")
+
+        # Test connexion HA et pool keep-alive (seulement si pas en mode test)
+        if not self.test_mode:
+            if not await self.ha_client.test_connection():
+                self.logger.error("Impossible de se connecter à Home Assistant")
+                return False
+            await self.ha_client.warm_up()
+        else:
+            self.logger.info("Mode test: connexion Home Assistant ignorée")
+
+        # Miroir d'états HA sur la même boucle
+        if self.state_mirror is not None:
+            self._spawn(self.state_mirror.run(), "ha-mirror")
+
+        self.dispatcher.start()
+
+        # Connexion MQTT (seulement si pas en mode test)
+        if not self.test_mode:
+            self.mqtt.start(self.mqtt_config.broker, self.mqtt_config.port,
+                            self.mqtt_config.keepalive)
+            try:
+                await asyncio.wait_for(self.mqtt_ready.wait(), 10)
+            except asyncio.TimeoutError:
+                self.logger.error("Timeout connexion MQTT")
+                return False
+        else:
+            self.logger.info("Mode test: connexion MQTT ignorée")
+            self.connected = True  # Simuler la connexion en mode test
+
+        self.running = True
+        with self.stats_lock:
+            self.stats["start_time"] = time.time()
+
+        # Préchauffage du cache TTS (synthèse Piper hors boucle)
+        if self.tts_cache is not None and self.tts_cache_config.warm_on_start:
+            self._spawn(self._warm_tts_cache_async(), "tts-warm")
+
+        self._spawn(self._metrics_task(), "metrics")
+
+        self.logger.info("Router d'intents démarré avec succès")
+        return True
+
+    async def _warm_tts_cache_async(self):
+        # Pièces du registre HA : attente du chargement par le miroir
+        deadline = time.monotonic() + 10.0
+        while (self.state_mirror is not None and not self.entity_resolver.areas
+               and time.monotonic() < deadline):
+            await asyncio.sleep(0.5)
+        await self.tts_cache.warm_async(self.tts_warm_phrases())
+
+    async def _metrics_task(self):
+        """Publication des métriques à cadence fixe (sans dérive)"""
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
+        while True:
+            try:
+                await self.publish_metrics_async()
+            except Exception as e:
+                self.logger.error(f"Erreur tâche métriques: {e}")
+            next_run += self.metrics_interval
+            await asyncio.sleep(max(0.0, next_run - loop.time()))
+
+    async def publish_metrics_async(self):
+        """Publier les métriques système"""
+        if not self.connected:
+            return
+
+        # Connectivité HA : heartbeat du miroir WebSocket, sinon test REST
+        ha_connected = False
+        if self.state_mirror is not None:
+            ha_connected = self.state_mirror.is_alive()
+        elif not self.test_mode and self.ha_client:
+            ha_connected = await self.ha_client.test_connection(log=False)
+        self._publish_metrics(ha_connected)
+
+    def request_stop(self):
+        """Demande d'arrêt (signal, test)"""
+        self.stop_event.set()
+
+    async def stop_async(self):
+        """Arrêter le router : tâches annulées, intents en cours terminés"""
+        self.logger.info("Arrêt du router d'intents...")
+
+        self.running = False
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+        # Intents en cours terminés avant la déconnexion : réponses publiées
+        await self.dispatcher.stop()
+        await self.mqtt.stop()
+
+        if not self.test_mode:
+            await self.ha_client.close()
+
+        # Réponses encore en file : sauvegardées sur disque (si configuré)
+        self.outbox.stop()
+
+        self.logger.info("Router d'intents arrêté")
+
+    async def run(self) -> bool:
+        """Démarrage, attente de request_stop(), arrêt propre"""
+        try:
+            if not await self.start_async():
+                self.logger.error("Échec démarrage du router")
+                return False
+            self.logger.info("Router d'intents opérationnel")
+            await self.stop_event.wait()
+            return True
+        finally:
+            await self.stop_async()
+
+
+async def _main() -> int:
+    ha_config, mqtt_config, outbox_config = default_configs()
+    router = AsyncIntentRouter(ha_config, mqtt_config, outbox_config=outbox_config)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, router.request_stop)
+
+    return 0 if await router.run() else 1
+
+
+def main():
+    """Point d'entrée du runtime asyncio"""
+    setup_logging()
+    sys.exit(asyncio.run(_main()))
+
+
+if __name__ == "__main__":
+    main()
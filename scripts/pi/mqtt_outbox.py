@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+File de publication MQTT persistante pour le router Bender
+
+Les publications faites pendant une coupure du broker sont conservées
+(mémoire bornée, débordement optionnel sur disque) puis rejouées dans
+l'ordre à la reconnexion. QoS et durée de vie par topic : une réponse
+TTS périmée n'est pas prononcée des minutes plus tard.
+
+Format du fichier de débordement : une ligne JSON par message
+{"topic", "payload" (base64), "qos", "expires" (epoch s)}.
+"""
+
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+
+# (topic, payload, qos, expiration epoch s)
+OutboxItem = Tuple[str, bytes, int, float]
+
+
+@dataclass
+class OutboxConfig:
+    """Configuration de la file de publication"""
+    max_messages: int = 256           # File mémoire
+    spill_path: Optional[str] = None  # Débordement disque (ex. /opt/bender/cache/mqtt_outbox.jsonl)
+    max_spill_messages: int = 4096
+    default_qos: int = 0
+    default_ttl_s: float = 60.0
+    # Préfixe de topic → QoS / durée de vie (le plus long préfixe gagne) ;
+    # durée de vie nulle : jamais mis en file (envoi direct ou abandon)
+    topic_qos: Dict[str, int] = field(default_factory=lambda: {
+        "bender/tts/say": 1,
+        "bender/nlu/request": 1
+    })
+    topic_ttl_s: Dict[str, float] = field(default_factory=lambda: {
+        "bender/tts/say": 5.0,
+        "bender/nlu/request": 5.0,
+        "bender/sys/metrics": 0.0,
+        "bender/sys/log": 300.0
+    })
+
+
+def _by_prefix(table: Dict, topic: str, default):
+    best, best_length = default, -1
+    for prefix, value in table.items():
+        if topic.startswith(prefix) and len(prefix) > best_length:
+            best, best_length = value, len(prefix)
+    return best
+
+
+class MQTTOutbox:
+    """Publication paho tolérante aux coupures (file bornée, rejeu ordonné)"""
+
+    def __init__(self, client: mqtt.Client, config: OutboxConfig):
+        self.client = client
+        self.config = config
+        self.logger = logging.getLogger("bender.mqtt_outbox")
+        self.lock = threading.Lock()
+        self.queue: Deque[OutboxItem] = deque()
+        self.spilled = 0
+        self.connected = False
+        self.stats = {
+            "published": 0,
+            "queued": 0,
+            "replayed": 0,
+            "spilled": 0,
+            "dropped_overflow": 0,
+            "dropped_expired": 0
+        }
+
+        # Messages laissés par une exécution précédente
+        if config.spill_path:
+            os.makedirs(os.path.dirname(config.spill_path) or ".", exist_ok=True)
+        if config.spill_path and os.path.exists(config.spill_path):
+            with open(config.spill_path, "r", encoding="utf-8") as f:
+                self.spilled = sum(1 for line in f if line.strip())
+            if self.spilled:
+                self.logger.info(f"{self.spilled} messages MQTT en attente sur disque")
+
+    def publish(self, topic: str, payload: bytes, qos: Optional[int] = None,
+                ttl_s: Optional[float] = None) -> bool:
+        """Publication immédiate si possible, sinon mise en file (False si abandonné)"""
+        if qos is None:
+            qos = _by_prefix(self.config.topic_qos, topic, self.config.default_qos)
+        if ttl_s is None:
+            ttl_s = _by_prefix(self.config.topic_ttl_s, topic, self.config.default_ttl_s)
+        item = (topic, payload, qos, time.time() + ttl_s)
+
+        with self.lock:
+            if ttl_s <= 0:
+                # Périmé dès l'envoi manqué : ne prend pas la place des réponses TTS
+                if self.connected and self._send(item):
+                    return True
+                self.stats["dropped_expired"] += 1
+                return False
+            # File non vide : passer devant romprait l'ordre
+            if self.connected and not self.queue and not self.spilled and self._send(item):
+                return True
+            return self._enqueue(item)
+
+    def _send(self, item: OutboxItem) -> bool:
+        topic, payload, qos, _ = item
+        # Hors connexion, paho garderait un message QoS ≥ 1 en plus de la file
+        if not self.client.is_connected():
+            return False
+        try:
+            info = self.client.publish(topic, payload, qos=qos)
+        except Exception as e:
+            self.logger.error(f"Erreur publication {topic}: {e}")
+            return False
+        if info.rc == mqtt.MQTT_ERR_NO_CONN and qos > 0:
+            # Coupure pas encore vue (paho 1.6 : is_connected() reste vrai jusqu'à
+            # la reconnexion) : paho renverrait sa copie sans TTL, elle est retirée
+            # et le message reste dans la file (TTL vérifié au rejeu)
+            self._discard_client_copy(info.mid)
+            return False
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            return False
+        self.stats["published"] += 1
+        return True
+
+    def _discard_client_copy(self, mid: int):
+        """Retire un message QoS ≥ 1 non émis de la file de renvoi de paho 1.6"""
+        with self.client._out_message_mutex:
+            self.client._out_messages.pop(mid, None)
+
+    def _enqueue(self, item: OutboxItem) -> bool:
+        self.stats["queued"] += 1
+        if not self.spilled and len(self.queue) < self.config.max_messages:
+            self.queue.append(item)
+            return True
+
+        if self.config.spill_path and self.spilled < self.config.max_spill_messages:
+            self._spill([item])
+            return True
+
+        # Plus de place : le plus ancien en mémoire est abandonné
+        self.stats["dropped_overflow"] += 1
+        if self.spilled:
+            return False  # Ordre imposé par le disque : le nouveau est abandonné
+        self.queue.popleft()
+        self.queue.append(item)
+        return True
+
+    @staticmethod
+    def _format(item: OutboxItem) -> str:
+        topic, payload, qos, expires = item
+        return json.dumps({
+            "topic": topic,
+            "payload": base64.b64encode(payload).decode("ascii"),
+            "qos": qos,
+            "expires": expires
+        }) + "\n"
+
+    def _spill(self, items: List[OutboxItem]):
+        with open(self.config.spill_path, "a", encoding="utf-8") as f:
+            f.writelines(self._format(item) for item in items)
+        self.spilled += len(items)
+        self.stats["spilled"] += len(items)
+
+    def _load_spill(self):
+        """Remonte en mémoire la tête du fichier de débordement"""
+        with open(self.config.spill_path, "r", encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+        head, rest = lines[:self.config.max_messages], lines[self.config.max_messages:]
+        for line in head:
+            try:
+                data = json.loads(line)
+                self.queue.append((data["topic"], base64.b64decode(data["payload"]),
+                                   data["qos"], data["expires"]))
+            except (ValueError, KeyError) as e:
+                self.logger.warning(f"Message MQTT sur disque illisible: {e}")
+
+        tmp_path = f"{self.config.spill_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(rest)
+        os.replace(tmp_path, self.config.spill_path)
+        self.spilled = len(rest)
+
+    def on_connect(self):
+        """Connexion (ré)établie : rejeu de la file dans l'ordre"""
+        with self.lock:
+            self.connected = True
+            self._replay()
+
+    def on_disconnect(self):
+        """Connexion perdue : les publications suivantes sont mises en file"""
+        with self.lock:
+            self.connected = False
+
+    def _replay(self):
+        replayed = expired = 0
+        now = time.time()
+        while True:
+            if not self.queue and self.spilled:
+                self._load_spill()
+            if not self.queue:
+                break
+            item = self.queue[0]
+            if item[3] < now:
+                self.queue.popleft()
+                expired += 1
+                continue
+            if not self._send(item):
+                break
+            self.queue.popleft()
+            replayed += 1
+
+        self.stats["replayed"] += replayed
+        self.stats["dropped_expired"] += expired
+        if replayed or expired:
+            self.logger.info(f"File MQTT rejouée: {replayed} envoyés, {expired} expirés")
+
+    def depth(self) -> int:
+        """Messages en attente (mémoire + disque)"""
+        return len(self.queue) + self.spilled
+
+    def snapshot(self) -> Dict[str, int]:
+        """Profondeur et compteurs"""
+        with self.lock:
+            return {**self.stats, "depth": self.depth(), "spill_depth": self.spilled}
+
+    def stop(self):
+        """Arrêt : la file mémoire est sauvegardée sur disque (si configuré)"""
+        with self.lock:
+            if not self.config.spill_path or not self.queue:
+                return
+            # Mémoire (plus ancien) puis disque : ordre conservé
+            lines = [self._format(item) for item in self.queue]
+            if self.spilled:
+                with open(self.config.spill_path, "r", encoding="utf-8") as f:
+                    lines += [line for line in f if line.strip()]
+            tmp_path = f"{self.config.spill_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+            os.replace(tmp_path, self.config.spill_path)
+            self.queue.clear()
+            self.spilled = len(lines)
+            self.logger.info(f"{self.depth()} messages MQTT sauvegardés sur disque")
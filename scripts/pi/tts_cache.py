@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Cache des réponses TTS pré-rendues pour Bender
+
+Les réponses du router sont presque toutes fixes ou issues de gabarits
+("J'allume la lumière du {room}") : rendues une fois par Piper (T630,
+protocole Wyoming), conservées en WAV sur le Pi, rejouées sans synthèse.
+
+- Clé : texte normalisé + identifiant de voix (SHA-1)
+- Disque borné en taille, éviction LRU : ordre d'accès tenu en mémoire,
+  aucune écriture sur la carte SD lors d'un hit ; au démarrage, ordre
+  repris de la date d'écriture des fichiers
+- Préchauffage en tâche de fond depuis une liste de phrases (thread
+  dédié, ou warm_async() depuis une boucle asyncio)
+
+Limite : seules les phrases préchauffées sont en cache. Un miss n'est
+pas réinjecté (la synthèse est faite par le service TTS, pas ici) :
+température, pourcentages hors liste et réponses du LLM sont toujours
+synthétisés à la demande.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import unicodedata
+import wave
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Texte canonique de la clé : NFC, minuscules, espaces et apostrophes uniformisés"""
+    text = unicodedata.normalize("NFC", text).replace("’", "'").lower()
+    return _SPACES.sub(" ", text).strip()
+
+
+def cache_key(text: str, voice_id: str) -> str:
+    """Clé de cache d'une phrase pour une voix"""
+    digest = hashlib.sha1(f"{voice_id}\0{normalize_text(text)}".encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+class WyomingPiperClient:
+    """Synthèse Piper via le protocole Wyoming (une connexion par phrase)"""
+
+    def __init__(self, host: str, port: int = 10200, voice: Optional[str] = None,
+                 timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.voice = voice
+        self.timeout = timeout
+
+    def _send_event(self, sock: socket.socket, event_type: str, data: Dict):
+        body = json.dumps(data).encode("utf-8")
+        header = {"type": event_type, "data_length": len(body)}
+        sock.sendall(json.dumps(header).encode("utf-8") + b"\n" + body)
+
+    def _read_event(self, reader) -> Tuple[str, Dict, bytes]:
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connexion Wyoming fermée")
+        header = json.loads(line)
+        data = header.get("data") or {}
+        if header.get("data_length"):
+            data.update(json.loads(reader.read(header["data_length"])))
+        payload = reader.read(header["payload_length"]) if header.get("payload_length") else b""
+        return header["type"], data, payload
+
+    def synthesize(self, text: str) -> bytes:
+        """WAV mono 16 bits d'une phrase"""
+        data = {"text": text}
+        if self.voice:
+            data["voice"] = {"name": self.voice}
+
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            self._send_event(sock, "synthesize", data)
+            reader = sock.makefile("rb")
+            audio = io.BytesIO()
+            fmt = None
+            while True:
+                event_type, data, payload = self._read_event(reader)
+                if event_type in ("audio-start", "audio-chunk") and fmt is None:
+                    fmt = (data.get("rate", 22050), data.get("width", 2), data.get("channels", 1))
+                if event_type == "audio-chunk":
+                    audio.write(payload)
+                elif event_type == "audio-stop":
+                    break
+                elif event_type == "error":
+                    raise RuntimeError(data.get("text", "erreur Wyoming"))
+
+        rate, width, channels = fmt or (22050, 2, 1)
+        output = io.BytesIO()
+        with wave.open(output, "wb") as wav:
+            wav.setnchannels(channels)
+            wav.setsampwidth(width)
+            wav.setframerate(rate)
+            wav.writeframes(audio.getvalue())
+        return output.getvalue()
+
+
+class TTSPhraseCache:
+    """Cache disque LRU borné des phrases rendues"""
+
+    def __init__(self, cache_dir: str, voice_id: str, max_bytes: int = 64 * 1024 * 1024,
+                 render: Optional[Callable[[str], bytes]] = None):
+        self.cache_dir = cache_dir
+        self.voice_id = voice_id
+        self.max_bytes = max_bytes
+        self.render = render
+        self.logger = logging.getLogger("bender.tts_cache")
+        self.lock = threading.Lock()
+        # clé → taille, du moins au plus récemment utilisé
+        self.entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self.warm_thread: Optional[threading.Thread] = None
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "rendered": 0,
+            "render_errors": 0,
+            "evictions": 0
+        }
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def _load(self):
+        """Index depuis le disque, ordre LRU initial d'après mtime (date d'écriture)"""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".wav"):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            files.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+            self.total_bytes += size
+        self.logger.info(f"Cache TTS: {len(self.entries)} phrases, "
+                         f"{self.total_bytes / 1024 / 1024:.1f} Mo")
+
+    def lookup(self, text: str) -> Tuple[str, Optional[str]]:
+        """(clé, chemin du WAV) ; chemin None si absent"""
+        key = cache_key(text, self.voice_id)
+        with self.lock:
+            if key not in self.entries:
+                self.stats["misses"] += 1
+                return key, None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+        path = self._path(key)
+        if not os.path.isfile(path):
+            # Supprimé hors du cache
+            with self.lock:
+                self.total_bytes -= self.entries.pop(key, 0)
+            return key, None
+        return key, path
+
+    def contains(self, text: str) -> bool:
+        """Phrase présente (sans effet sur les stats ni l'ordre LRU)"""
+        with self.lock:
+            return cache_key(text, self.voice_id) in self.entries
+
+    def put(self, text: str, audio: bytes) -> str:
+        """Ajout d'une phrase rendue, éviction LRU au-delà de max_bytes"""
+        key = cache_key(text, self.voice_id)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+
+        evicted = []
+        with self.lock:
+            self.total_bytes += len(audio) - self.entries.pop(key, 0)
+            self.entries[key] = len(audio)
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                old_key, size = self.entries.popitem(last=False)
+                self.total_bytes -= size
+                self.stats["evictions"] += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+        return path
+
+    def _missing(self, phrases: Iterable[str]):
+        if self.render is None:
+            return []
+        return [phrase for phrase in dict.fromkeys(phrases) if not self.contains(phrase)]
+
+    def warm(self, phrases: Iterable[str]):
+        """Rendu en tâche de fond des phrases absentes"""
+        phrases = self._missing(phrases)
+        if not phrases:
+            return
+        self.warm_thread = threading.Thread(target=self._warm, args=(phrases,),
+                                            name="bender-tts-warm", daemon=True)
+        self.warm_thread.start()
+
+    async def warm_async(self, phrases: Iterable[str]):
+        """Rendu des phrases absentes depuis une boucle asyncio : synthèse
+        (socket bloquante) dans l'exécuteur, annulable entre deux phrases"""
+        phrases = self._missing(phrases)
+        if not phrases:
+            return
+        self.logger.info(f"Préchauffage cache TTS: {len(phrases)} phrases")
+        for phrase in phrases:
+            if not await asyncio.to_thread(self._render_one, phrase):
+                break
+        self.logger.info(f"Cache TTS préchauffé: {len(self.entries)} phrases")
+
+    def _warm(self, phrases):
+        self.logger.info(f"Préchauffage cache TTS: {len(phrases)} phrases")
+        for phrase in phrases:
+            if not self._render_one(phrase):
+                break
+        self.logger.info(f"Cache TTS préchauffé: {len(self.entries)} phrases")
+
+    def _render_one(self, phrase: str) -> bool:
+        """Rendu d'une phrase, False si Piper est injoignable"""
+        try:
+            self.put(phrase, self.render(phrase))
+            self.stats["rendered"] += 1
+        except Exception as e:
+            self.stats["render_errors"] += 1
+            self.logger.warning(f"Rendu TTS impossible ({phrase!r}): {e}")
+            if isinstance(e, OSError):
+                return False  # Piper injoignable : inutile d'insister
+        return True
+
+    def snapshot(self) -> Dict:
+        """Compteurs et occupation"""
+        with self.lock:
+            return {**self.stats, "phrases": len(self.entries),
+                    "bytes": self.total_bytes, "max_bytes": self.max_bytes}